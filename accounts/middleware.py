@@ -0,0 +1,63 @@
+"""`request.employee`: the Employee linked to the logged-in user.
+
+Employee pages all need the same lookup (Employee by user, usually with its
+SalaryProfile). EmployeeMiddleware attaches it lazily, so it costs nothing on
+pages that don't touch it and at most one query on pages that do. It is None
+for anonymous users and for accounts with no linked Employee.
+
+With EMPLOYEE_CACHE_TIMEOUT > 0 the lookup is also kept in the Django cache
+per user, so repeat page views skip the query entirely. employees/signals.py
+drops the entry whenever the Employee or its SalaryProfile is saved or
+deleted. That only reaches other workers through a shared cache backend, so
+the timeout defaults to 0.
+"""
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+
+from employees.models import Employee
+
+# Cached in place of None so "no employee linked" is remembered too.
+_NO_EMPLOYEE = 0
+_MISSING = object()
+
+def employee_cache_key(user_id: int) -> str:
+    return f"accounts:employee-for-user:{user_id}"
+
+def employee_cache_timeout() -> int:
+    return getattr(settings, "EMPLOYEE_CACHE_TIMEOUT", 0)
+
+def forget_employee(*user_ids) -> None:
+    """Drop the cached lookup for these users (None entries are ignored)."""
+    if not employee_cache_timeout():
+        return
+    keys = [employee_cache_key(uid) for uid in user_ids if uid is not None]
+    if keys:
+        cache.delete_many(keys)
+
+def employee_for_user(user) -> Employee | None:
+    """The user's Employee (salary_profile preloaded), or None."""
+    if not user.is_authenticated:
+        return None
+    timeout = employee_cache_timeout()
+    key = employee_cache_key(user.pk)
+    if timeout:
+        cached = cache.get(key, _MISSING)
+        if cached is not _MISSING:
+            return cached or None
+    employee = Employee.objects.select_related("salary_profile").filter(user=user).first()
+    if timeout:
+        cache.set(key, employee or _NO_EMPLOYEE, timeout)
+    return employee
+
+class EmployeeMiddleware:
+    """Sets `request.employee`; must come after AuthenticationMiddleware."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.employee = SimpleLazyObject(lambda: employee_for_user(request.user))
+        return self.get_response(request)
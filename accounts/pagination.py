@@ -0,0 +1,168 @@
+"""Keyset (cursor) pagination.
+
+OFFSET pagination makes the database walk and discard every earlier row, so
+deep pages get slower linearly, and each page also pays for a COUNT(*). A
+keyset page instead continues from the last row seen:
+
+    WHERE (work_date, id) < (:last_date, :last_id) ORDER BY work_date DESC, id DESC LIMIT n
+
+which an index on the ordering columns answers in constant time at any depth.
+
+Cursors are opaque URL-safe strings encoding the boundary row's ordering
+values and a direction. The special cursor "last" jumps to the final page.
+The ordering columns must be non-null and end in a unique column (normally
+"id"/"-id").
+"""
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import dataclass
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import Http404
+
+LAST = "last"
+
+class InvalidCursor(ValueError):
+    pass
+
+@dataclass
+class KeysetPage:
+    object_list: list
+    next_cursor: str | None
+    previous_cursor: str | None
+    count: int | None = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+class KeysetPaginator:
+    def __init__(self, queryset, ordering, per_page: int):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        self._fields = [o.lstrip("-") for o in self.ordering]
+        self._model_fields = [queryset.model._meta.get_field(f) for f in self._fields]
+
+    # --- cursors -------------------------------------------------------
+
+    def _encode(self, obj, direction: str) -> str:
+        values = [getattr(obj, f.attname) for f in self._model_fields]
+        raw = json.dumps([direction, values], cls=DjangoJSONEncoder, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def _decode(self, cursor: str):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            direction, values = json.loads(raw)
+            if direction not in ("n", "p") or len(values) != len(self._fields):
+                raise ValueError
+            return direction, [f.to_python(v) for f, v in zip(self._model_fields, values)]
+        except Exception:
+            raise InvalidCursor(cursor)
+
+    def _after(self, values, reverse: bool) -> Q:
+        """Rows strictly after `values` in the ordering (before, if reverse).
+
+        (a > x) OR (a = x AND b > y) OR ..., plus a plain range bound on the
+        leading column so the database can seek the index instead of scanning.
+        """
+        cond = Q()
+        for i, order in enumerate(self.ordering):
+            descending = order.startswith("-") != reverse
+            step = Q(**{f"{self._fields[i]}__{'lt' if descending else 'gt'}": values[i]})
+            for j in range(i):
+                step &= Q(**{self._fields[j]: values[j]})
+            cond |= step
+        lead_descending = self.ordering[0].startswith("-") != reverse
+        return Q(**{f"{self._fields[0]}__{'lte' if lead_descending else 'gte'}": values[0]}) & cond
+
+    def _reversed_ordering(self):
+        return [o[1:] if o.startswith("-") else f"-{o}" for o in self.ordering]
+
+    # --- pages ---------------------------------------------------------
+
+    def page(self, cursor: str | None = None, count: bool = False) -> KeysetPage:
+        """The page after (or before) `cursor`; the first page when it is empty.
+
+        Raises InvalidCursor for a cursor this paginator didn't produce.
+        """
+        n = self.per_page
+        total = self.queryset.count() if count else None
+
+        if cursor == LAST:
+            rows = list(self.queryset.order_by(*self._reversed_ordering())[:n + 1])
+            more = len(rows) > n
+            rows = rows[:n]
+            rows.reverse()
+            return KeysetPage(rows, None, self._encode(rows[0], "p") if more else None, total)
+
+        if not cursor:
+            rows = list(self.queryset.order_by(*self.ordering)[:n + 1])
+            return KeysetPage(rows[:n], self._encode(rows[n - 1], "n") if len(rows) > n else None, None, total)
+
+        direction, values = self._decode(cursor)
+        if direction == "n":
+            rows = list(self.queryset.filter(self._after(values, False)).order_by(*self.ordering)[:n + 1])
+            more = len(rows) > n
+            rows = rows[:n]
+            return KeysetPage(
+                rows,
+                self._encode(rows[-1], "n") if more else None,
+                self._encode(rows[0], "p") if rows else None,
+                total,
+            )
+
+        rows = list(self.queryset.filter(self._after(values, True)).order_by(*self._reversed_ordering())[:n + 1])
+        more = len(rows) > n
+        rows = rows[:n]
+        rows.reverse()
+        return KeysetPage(
+            rows,
+            self._encode(rows[-1], "n") if rows else None,
+            self._encode(rows[0], "p") if more else None,
+            total,
+        )
+
+class KeysetPaginationMixin:
+    """ListView mixin: keyset pages instead of OFFSET pages.
+
+    Reads ?cursor= (and ?count=1/0 to force or skip the total count) and
+    exposes `page_obj` (a KeysetPage) and `filter_query` (the other GET
+    parameters, for building pager links).
+    """
+    keyset_ordering = ("-id",)
+    count_total = True
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, self.keyset_ordering, page_size)
+        count = self.request.GET.get("count", "1" if self.count_total else "0") == "1"
+        try:
+            page = paginator.page(self.request.GET.get("cursor"), count=count)
+        except InvalidCursor:
+            raise Http404("Invalid page cursor.")
+        return paginator, page, page.object_list, page.has_other_pages
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        params = self.request.GET.copy()
+        params.pop("cursor", None)
+        ctx["filter_query"] = params.urlencode()
+        return ctx
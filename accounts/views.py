@@ -5,10 +5,11 @@ from django.contrib.auth import logout
 from django.contrib.auth.views import LoginView
 from django.shortcuts import redirect, render
 from django.urls import reverse_lazy
+from django.utils import timezone
 from django.contrib.auth.decorators import login_required
 
 from .forms import LoginForm
-from employees.models import Employee
+from payroll.ytd import ytd_for
 
 class TokyoNightLoginView(LoginView):
     template_name = "accounts/login.html"
@@ -32,7 +33,9 @@ def dashboard(request):
     HR users (is_staff) get quick links to admin actions.
     Employees get quick links to time entry + paycheck preview.
     """
-    employee = None
+    employee = ytd = None
     if not request.user.is_staff:
-        employee = Employee.objects.filter(user=request.user).first()
-    return render(request, "accounts/dashboard.html", {"employee": employee})
+        employee = request.employee or None
+        if employee:
+            ytd = ytd_for(employee.pk, timezone.localdate().year)
+    return render(request, "accounts/dashboard.html", {"employee": employee, "ytd": ytd})
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.synthetic import delete_synthetic, generate_synthetic
+
+class Command(BaseCommand):
+    help = "Bulk-generate a synthetic workforce (1k-100k employees) with salary profiles and time entries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employees", type=int, default=1000, help="Number of employees to create.")
+        parser.add_argument("--weeks", type=int, default=2, help="Weeks of time entries per employee.")
+        parser.add_argument("--first-week", default="2001-01-01", help="Monday of the first week (YYYY-MM-DD).")
+        parser.add_argument("--prefix", default="S", help="employee_id prefix that tags the generated rows.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Employees per transaction.")
+        parser.add_argument("--seed", type=int, default=268)
+        parser.add_argument("--delete", action="store_true", help="Delete previously generated rows with this prefix first.")
+
+    def handle(self, *args, **opts):
+        try:
+            first_week = date.fromisoformat(opts["first_week"])
+        except ValueError as ex:
+            raise CommandError(str(ex))
+
+        if opts["delete"]:
+            removed = delete_synthetic(opts["prefix"])
+            self.stdout.write(self.style.WARNING(f"Deleted {removed} synthetic employees."))
+
+        t0 = time.perf_counter()
+        try:
+            stats = generate_synthetic(
+                opts["employees"], opts["weeks"], first_week,
+                prefix=opts["prefix"], batch_size=opts["batch_size"], seed=opts["seed"],
+                log=self.stdout.write,
+            )
+        except ValueError as ex:
+            raise CommandError(str(ex))
+        seconds = time.perf_counter() - t0
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {stats.employees} employees, {stats.time_entries} time entries and "
+            f"{stats.rollup_rows} rollup rows in {seconds:.1f}s."
+        ))
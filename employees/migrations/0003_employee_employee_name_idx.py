@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0002_alter_employee_first_name_alter_employee_last_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['last_name', 'first_name'], name='employee_name_idx'),
+        ),
+    ]
@@ -72,6 +72,13 @@ class Employee(models.Model):
 
     picture = models.ImageField(upload_to="employee_pics/", blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # Employee list keyset pagination, unfiltered and by department.
+            models.Index(fields=["last_name", "first_name", "id"], name="employee_name_id_idx"),
+            models.Index(fields=["department", "last_name", "first_name", "id"], name="employee_dept_name_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"{self.employee_id} - {self.last_name}, {self.first_name}"
 
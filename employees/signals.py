@@ -1,6 +1,7 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
+from accounts.middleware import employee_cache_timeout, forget_employee
 from .models import Employee, SalaryProfile
 
 
@@ -15,3 +16,32 @@ def create_salary_profile_for_employee(sender, instance, created, **kwargs):
     """
     if created:
         SalaryProfile.objects.get_or_create(employee=instance)
+
+
+@receiver(pre_save, sender=Employee)
+def remember_previous_user(sender, instance, **kwargs):
+    """Note the user the Employee was linked to before this save, if any."""
+    instance._previous_user_id = None
+    if instance.pk and employee_cache_timeout() and not kwargs.get("raw"):
+        instance._previous_user_id = (
+            Employee.objects.filter(pk=instance.pk).values_list("user_id", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def forget_cached_employee(sender, instance, **kwargs):
+    """Drop the cached request.employee lookup for the old and new linked users."""
+    forget_employee(instance.user_id, getattr(instance, "_previous_user_id", None))
+
+
+@receiver(post_save, sender=SalaryProfile)
+@receiver(post_delete, sender=SalaryProfile)
+def forget_cached_employee_for_profile(sender, instance, **kwargs):
+    if not employee_cache_timeout():
+        return
+    if SalaryProfile.employee.is_cached(instance):
+        user_id = instance.employee.user_id
+    else:
+        user_id = Employee.objects.filter(pk=instance.employee_id).values_list("user_id", flat=True).first()
+    forget_employee(user_id)
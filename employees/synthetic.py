@@ -0,0 +1,192 @@
+"""Synthetic workforce generator for load testing and benchmarks.
+
+Unlike `seed_demo_data` (12 hand-shaped employees, one save at a time), this
+builds thousands of employees with bulk_create:
+
+- password hashes are computed once per distinct date of birth and reused
+  (credentials follow the same "password = YYYYMMDD of DOB" rule),
+- employees, salary profiles, time entries, the WeeklyHours rollup and the
+  payroll change journal are inserted in batches, one transaction per batch.
+
+Generated rows are tagged by an `employee_id` prefix so they can be removed
+again with `delete_synthetic`.
+"""
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+
+from payroll.recalculation import record_pay_input_changes
+from timeentry.models import TimeEntry, WeeklyHours
+from timeentry.rollup import week_totals
+from .models import Employee, SalaryProfile, EmployeeStatus, Gender, PayType, MedicalCoverage
+
+User = get_user_model()
+
+FIRST = ["Ava","Noah","Mia","Liam","Emma","Olivia","Elijah","Sophia","Amelia","James","Lucas","Isabella"]
+LAST = ["Johnson","Smith","Miller","Davis","Brown","Wilson","Moore","Taylor","Anderson","Thomas","Jackson","White"]
+DEPTS = ["HR","Accounting","Operations","Engineering","Sales"]
+JOBS = ["Coordinator","Analyst","Technician","Specialist","Manager"]
+
+SALARIES = [Decimal(s) for s in ("42000", "52000", "64000", "78000", "91000", "115000")]
+HOURLY_RATES = [Decimal(s) for s in ("15.25", "18.50", "21.75", "24.00", "28.50", "33.10")]
+
+@dataclass
+class GenerationStats:
+    employees: int = 0
+    time_entries: int = 0
+    rollup_rows: int = 0
+
+def _email_domain(prefix: str) -> str:
+    return f"{prefix.lower()}.synthetic.abc-company.local"
+
+def _day_entry(rng: random.Random, pay_type: str, d: date):
+    """(hours_worked, pto_hours) for one day, or None for no entry."""
+    weekday = d.weekday()
+    if pay_type == PayType.SALARY:
+        # Salary employees only record PTO.
+        if weekday < 5 and rng.random() < 0.03:
+            return Decimal("0"), Decimal("8")
+        return None
+    if weekday == 6:
+        return None
+    if weekday == 5:
+        # Occasional Saturday shift (all overtime).
+        return (Decimal(rng.choice(["4", "5.5", "6"])), Decimal("0")) if rng.random() < 0.15 else None
+    if rng.random() < 0.03:
+        return Decimal("0"), Decimal("8")
+    return Decimal(rng.choice(["7.5", "8", "8", "8", "8.25", "9", "9.5", "10"])), Decimal("0")
+
+def generate_synthetic(
+    count: int,
+    weeks: int,
+    first_week: date,
+    prefix: str = "S",
+    batch_size: int = 1000,
+    seed: int = 268,
+    dob_pool: int = 8,
+    log=None,
+) -> GenerationStats:
+    """Create `count` employees with `weeks` weeks of time entries from `first_week` (a Monday)."""
+    if first_week.weekday() != 0:
+        raise ValueError("first_week must be a Monday.")
+    rng = random.Random(seed)
+    today = date.today()
+
+    # PBKDF2 is deliberately slow; hash each distinct DOB password once.
+    dobs = [date(today.year - 22 - 4 * i, 1 + i % 12, 15) for i in range(dob_pool)]
+    hashes = {dob: make_password(dob.strftime("%Y%m%d")) for dob in dobs}
+
+    days = [first_week + timedelta(days=i) for i in range(7 * weeks)]
+    domain = _email_domain(prefix)
+    stats = GenerationStats()
+
+    for start in range(0, count, batch_size):
+        stop = min(start + batch_size, count)
+        with transaction.atomic():
+            users, employees, plans = [], [], []
+            for i in range(start, stop):
+                emp_id = f"{prefix}{i + 1:07d}"
+                email = f"{emp_id.lower()}@{domain}"
+                dob = dobs[i % len(dobs)]
+                pay_type = PayType.SALARY if rng.random() < 0.4 else PayType.HOURLY
+                users.append(User(username=email, email=email, is_active=True, password=hashes[dob]))
+                employees.append(Employee(
+                    employee_id=emp_id,
+                    department=rng.choice(DEPTS),
+                    job_title=rng.choice(JOBS),
+                    first_name=FIRST[i % len(FIRST)],
+                    last_name=LAST[(i // len(FIRST)) % len(LAST)],
+                    status=EmployeeStatus.ACTIVE,
+                    date_of_birth=dob,
+                    gender=rng.choice([Gender.MALE, Gender.FEMALE]),
+                    pay_type=pay_type,
+                    company_email=email,
+                    address_line_1=f"{100 + i % 900} Main St",
+                    city="Indianapolis",
+                    state="IN",
+                    zip_code="46204",
+                ))
+                plans.append(pay_type)
+
+            User.objects.bulk_create(users, batch_size=batch_size)
+            user_ids = dict(User.objects.filter(username__in=[u.username for u in users]).values_list("username", "pk"))
+            for emp in employees:
+                emp.user_id = user_ids[emp.company_email]
+            Employee.objects.bulk_create(employees, batch_size=batch_size)
+
+            # Re-read pks: not every backend returns them from bulk_create.
+            pks = dict(
+                Employee.objects.filter(
+                    employee_id__gte=employees[0].employee_id, employee_id__lte=employees[-1].employee_id
+                ).values_list("employee_id", "pk")
+            )
+
+            profiles, entries = [], []
+            for emp, pay_type in zip(employees, plans):
+                pk = pks[emp.employee_id]
+                profiles.append(SalaryProfile(
+                    employee_id=pk,
+                    date_hire=today - timedelta(days=rng.randint(90, 4000)),
+                    salary_type=pay_type,
+                    base_pay=rng.choice(SALARIES if pay_type == PayType.SALARY else HOURLY_RATES),
+                    medical=rng.choice([MedicalCoverage.SINGLE, MedicalCoverage.FAMILY]),
+                    dependents=rng.randint(0, 4),
+                ))
+                for d in days:
+                    day = _day_entry(rng, pay_type, d)
+                    if day:
+                        entries.append(TimeEntry(
+                            employee_id=pk, work_date=d, hours_worked=day[0], pto_hours=day[1], submitted=True
+                        ))
+
+            SalaryProfile.objects.bulk_create(profiles, batch_size=batch_size)
+            TimeEntry.objects.bulk_create(entries, batch_size=batch_size * 5)
+
+            # bulk_create skips the TimeEntry signals, so write the rollup directly.
+            totals = week_totals((e.employee_id, e.work_date, e.hours_worked, e.pto_hours) for e in entries)
+            WeeklyHours.objects.bulk_create(
+                [
+                    WeeklyHours(employee_id=e, week_start=ws, regular_hours=r, overtime_hours=o, pto_hours=p)
+                    for (e, ws), (r, o, p) in totals.items()
+                ],
+                batch_size=batch_size * 2,
+            )
+            # New employees are dirty for every draft payroll run.
+            record_pay_input_changes((pk, None) for pk in pks.values())
+
+        stats.employees += len(employees)
+        stats.time_entries += len(entries)
+        stats.rollup_rows += len(totals)
+        if log:
+            log(f"  {stats.employees}/{count} employees, {stats.time_entries} time entries")
+    return stats
+
+def delete_synthetic(prefix: str = "S") -> int:
+    """Delete employees generated with `prefix` (and their login users). Returns employees deleted.
+
+    Paychecks protect employees, so payroll runs that include them must be
+    deleted first.
+    """
+    employees = Employee.objects.filter(company_email__endswith=f"@{_email_domain(prefix)}")
+    with transaction.atomic():
+        count = employees.count()
+        user_ids = list(employees.exclude(user=None).values_list("user_id", flat=True))
+        # Time entries go in one statement; deleting them through the ORM would
+        # fire the per-entry rollup signal (the rollup rows cascade anyway).
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {TimeEntry._meta.db_table} WHERE employee_id IN "
+                f"(SELECT id FROM {Employee._meta.db_table} WHERE company_email LIKE %s)",
+                [f"%@{_email_domain(prefix)}"],
+            )
+        employees.delete()
+        for i in range(0, len(user_ids), 5000):
+            User.objects.filter(pk__in=user_ids[i:i + 5000]).delete()
+    return count
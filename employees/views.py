@@ -9,6 +9,7 @@ from django.shortcuts import get_object_or_404, render
 from .models import Employee, SalaryProfile
 from .models import Employee, SalaryProfile
 from accounts.decorators import is_hr
+from accounts.pagination import KeysetPaginationMixin
 
 
 class HRRequiredMixin(LoginRequiredMixin, UserPassesTestMixin):
@@ -62,12 +63,25 @@ class SalaryProfileUpsertView(HRRequiredMixin, FormView):
         form.save()
         return redirect("employee_list")
     
-class EmployeeListView(HRRequiredMixin, ListView):
+class EmployeeListView(HRRequiredMixin, KeysetPaginationMixin, ListView):
     model = Employee
     template_name = "employees/employee_list.html"
     context_object_name = "employees"
     paginate_by = 25
-    ordering = ["last_name", "first_name"]
+    keyset_ordering = ("last_name", "first_name", "id")
+
+    def get_queryset(self):
+        qs = Employee.objects.all()
+        department = self.request.GET.get("department", "").strip()
+        if department:
+            qs = qs.filter(department=department)
+        return qs
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["department"] = self.request.GET.get("department", "")
+        ctx["departments"] = Employee.objects.order_by("department").values_list("department", flat=True).distinct()
+        return ctx
 
 class EmployeeCreateView(HRRequiredMixin, CreateView):
     model = Employee
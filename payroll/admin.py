@@ -0,0 +1,12 @@
+from django.contrib import admin
+from .models import TaxBracket, TaxRule
+
+class TaxBracketInline(admin.TabularInline):
+    model = TaxBracket
+    extra = 1
+
+@admin.register(TaxRule)
+class TaxRuleAdmin(admin.ModelAdmin):
+    list_display = ("kind", "effective_from", "wage_base", "employer_matches")
+    list_filter = ("kind",)
+    inlines = [TaxBracketInline]
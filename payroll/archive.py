@@ -0,0 +1,297 @@
+"""Cold archive for old locked payroll runs.
+
+Locked runs never change, so once they are old enough (PAYROLL_ARCHIVE_AFTER_DAYS
+after the period ends) their paychecks can leave the database. `archive_run`
+writes them to one file per run in PAYROLL_ARCHIVE_DIR and deletes the rows.
+Run totals stay in PayrollRunSummary and year-to-date figures stay in the
+YearToDate ledger, so the usual pages don't read paychecks at all.
+
+File layout (`run-<pk>.pca`):
+
+    b"PAYARC01"                  magic
+    uint32 little-endian         header length
+    header (JSON)                {"run", "rows", "columns": {name: [offset, length, encoding]},
+                                  "dictionaries": {name: [value, ...]}}
+    column blocks                zlib-compressed little-endian int64 arrays
+
+The columns are the paycheck pk, the employee pk, every money column in
+integer cents, and the paycheck's department and pay type. Rows are in
+paycheck pk order. The two pk columns are stored as deltas, which compress to
+almost nothing. Department and pay type are stored as codes into a list of
+their values kept in the header ("dictionaries"). `index.json` in the same directory
+records each archived run's file, row count and SHA-256.
+
+Reads memory-map the file and decompress only the columns they need.
+`ArchivedPaychecks` is a lazy sequence of unsaved Paycheck objects, and
+`run_paychecks(run)` returns it for archived runs and `run.paychecks` for the
+rest. The run detail page, CSV export, pay stubs and YTD rebuild read through
+these, so they work the same for hot and archived runs.
+`restore_run` puts the rows back.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import zlib
+from collections.abc import Sequence
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from employees.models import Employee
+from .models import PAYCHECK_MONEY_FIELDS, Paycheck, PayrollRun
+
+MAGIC = b"PAYARC01"
+INDEX = "index.json"
+DICT_COLUMNS = ("department", "pay_type")
+COLUMNS = ("paycheck", "employee", *PAYCHECK_MONEY_FIELDS, *DICT_COLUMNS)
+DELTA_COLUMNS = ("paycheck", "employee")
+ARCHIVE_BATCH = 5000
+
+def archive_dir() -> Path:
+    return Path(settings.PAYROLL_ARCHIVE_DIR)
+
+def archive_path(run_id: int) -> Path:
+    return archive_dir() / f"run-{run_id}.pca"
+
+def runs_due(days: int | None = None):
+    """Locked, not yet archived runs whose period ended more than `days` ago."""
+    if days is None:
+        days = settings.PAYROLL_ARCHIVE_AFTER_DAYS
+    cutoff = timezone.localdate() - timedelta(days=days)
+    return PayrollRun.objects.filter(locked=True, archived_at__isnull=True, period_end__lt=cutoff)
+
+# --- File format ----------------------------------------------------------
+
+def _encode(run_id: int, columns: dict[str, np.ndarray]) -> bytes:
+    header, dictionaries, blocks, offset = {}, {}, [], 0
+    for name in COLUMNS:
+        values = columns[name]
+        encoding = "plain"
+        if name in DELTA_COLUMNS:
+            values = np.diff(values, prepend=0)
+            encoding = "delta"
+        elif name in DICT_COLUMNS:
+            words, values = np.unique(values.astype(str), return_inverse=True)
+            dictionaries[name] = words.tolist()
+            encoding = "dict"
+        values = values.astype("<i8")
+        block = zlib.compress(values.tobytes(), 9)
+        header[name] = [offset, len(block), encoding]
+        blocks.append(block)
+        offset += len(block)
+    head = json.dumps({
+        "run": run_id, "rows": len(columns["paycheck"]), "columns": header, "dictionaries": dictionaries,
+    }).encode()
+    return b"".join([MAGIC, struct.pack("<I", len(head)), head, *blocks])
+
+def read_columns(run_id: int, names=COLUMNS) -> dict[str, np.ndarray]:
+    """Decode the given columns of an archived run through a memory map.
+
+    Dictionary columns come back as arrays of strings.
+    """
+    with open(archive_path(run_id), "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if mm[:8] != MAGIC:
+            raise ValueError(f"{archive_path(run_id)} is not a payroll archive.")
+        (head_len,) = struct.unpack("<I", mm[8:12])
+        header = json.loads(mm[12:12 + head_len])
+        start = 12 + head_len
+        out = {}
+        with memoryview(mm) as view:
+            for name in names:
+                offset, length, encoding = header["columns"][name]
+                block = view[start + offset:start + offset + length]
+                values = np.frombuffer(zlib.decompress(block), dtype="<i8")
+                if encoding == "delta":
+                    values = np.cumsum(values)
+                elif encoding == "dict":
+                    values = np.array(header["dictionaries"][name], dtype=object)[values]
+                out[name] = values
+                block.release()
+        return out
+
+def _load_index() -> dict:
+    path = archive_dir() / INDEX
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+def _save_index(index: dict) -> None:
+    path = archive_dir() / INDEX
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(index, indent=1, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+def _cents(column: np.ndarray, i: int) -> Decimal:
+    return Decimal(int(column[i])).scaleb(-2)
+
+# --- Reads ----------------------------------------------------------------
+
+class ArchivedPaychecks(Sequence):
+    """An archived run's paychecks as unsaved Paycheck objects, built a slice at a time.
+
+    `department` and `pay_type` restrict the rows to paychecks with those values.
+    """
+
+    def __init__(self, run: PayrollRun, department: str = "", pay_type: str = ""):
+        self.run = run
+        self.columns = read_columns(run.pk)
+        keep = np.ones(len(self.columns["paycheck"]), dtype=bool)
+        if department:
+            keep &= self.columns["department"] == department
+        if pay_type:
+            keep &= self.columns["pay_type"] == pay_type
+        self.rows = np.flatnonzero(keep)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._build(self.rows[index])
+        return self._build(self.rows[[index]])[0]
+
+    def __iter__(self):
+        for start in range(0, len(self), ARCHIVE_BATCH):
+            yield from self[start:start + ARCHIVE_BATCH]
+
+    def get(self, paycheck_id: int) -> Paycheck | None:
+        i = np.searchsorted(self.columns["paycheck"], paycheck_id)
+        if i < len(self.columns["paycheck"]) and self.columns["paycheck"][i] == paycheck_id:
+            return self._build([i])[0]
+        return None
+
+    def _build(self, rows) -> list[Paycheck]:
+        cols = self.columns
+        employees = Employee.objects.in_bulk({int(cols["employee"][i]) for i in rows})
+        out = []
+        for i in rows:
+            employee_id = int(cols["employee"][i])
+            p = Paycheck(
+                pk=int(cols["paycheck"][i]),
+                payroll_run=self.run,
+                employee_id=employee_id,
+                **{f: _cents(cols[f], i) for f in PAYCHECK_MONEY_FIELDS},
+                **{f: cols[f][i] for f in DICT_COLUMNS},
+            )
+            # Paychecks no longer protect archived employees; show a deleted one by pk.
+            p.employee = employees.get(employee_id) or Employee(pk=employee_id, employee_id=f"#{employee_id}")
+            out.append(p)
+        return out
+
+def run_paychecks(run: PayrollRun):
+    """The run's paychecks: a queryset for hot runs, an ArchivedPaychecks for archived ones."""
+    return ArchivedPaychecks(run) if run.archived_at else run.paychecks.all()
+
+def archived_totals(runs, employee_ids=None) -> dict[int, dict]:
+    """{employee pk: {"paychecks": n, money field: sum}} over the archived runs among `runs`.
+
+    Sums are accumulated in integer cents in an array indexed by employee pk.
+    """
+    wanted = None if employee_ids is None else np.fromiter(employee_ids, dtype="<i8")
+    sums = np.zeros((0, 1 + len(PAYCHECK_MONEY_FIELDS)), dtype="<i8")
+    for run_id in runs.filter(archived_at__isnull=False).values_list("pk", flat=True):
+        cols = read_columns(run_id, ("employee", *PAYCHECK_MONEY_FIELDS))
+        keep = np.ones(len(cols["employee"]), dtype=bool) if wanted is None else np.isin(cols["employee"], wanted)
+        employees = cols["employee"][keep]
+        if not len(employees):
+            continue
+        if employees.max() >= len(sums):
+            sums = np.vstack([sums, np.zeros((employees.max() + 1 - len(sums), sums.shape[1]), dtype="<i8")])
+        amounts = np.column_stack([np.ones(len(employees), dtype="<i8")] + [cols[f][keep] for f in PAYCHECK_MONEY_FIELDS])
+        np.add.at(sums, employees, amounts)
+    return {
+        int(e): {
+            "paychecks": int(sums[e, 0]),
+            **{f: Decimal(int(c)).scaleb(-2) for f, c in zip(PAYCHECK_MONEY_FIELDS, sums[e, 1:])},
+        }
+        for e in np.flatnonzero(sums[:, 0])
+    }
+
+# --- Archive / restore -----------------------------------------------------
+
+def archive_run(run: PayrollRun) -> dict:
+    """Move a locked run's paychecks into its archive file. Returns its index entry."""
+    if not run.locked or run.archived_at:
+        raise ValueError(f"{run} is not a locked, unarchived run.")
+    if run.summary is None:
+        # Run totals are read from the summary once the paychecks are gone.
+        raise ValueError(f"{run} has no PayrollRunSummary; run summarize_payroll_runs first.")
+
+    rows = list(run.paychecks.order_by("pk").values_list("pk", "employee_id", *PAYCHECK_MONEY_FIELDS, *DICT_COLUMNS))
+    n = 2 + len(PAYCHECK_MONEY_FIELDS)
+    matrix = np.array(
+        [(r[0], r[1], *(int(v * 100) for v in r[2:n])) for r in rows], dtype="<i8"
+    ).reshape(len(rows), n)
+    columns = {name: matrix[:, i] for i, name in enumerate(COLUMNS[:n])}
+    for i, name in enumerate(DICT_COLUMNS, start=n):
+        columns[name] = np.array([r[i] for r in rows], dtype=object)
+    data = _encode(run.pk, columns)
+
+    path = archive_path(run.pk)
+    archive_dir().mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+    # Read the file back before anything is deleted.
+    stored = read_columns(run.pk)
+    if any(not np.array_equal(stored[name], columns[name]) for name in COLUMNS):
+        path.unlink()
+        raise ValueError(f"{path} did not read back correctly; run {run.pk} was not archived.")
+
+    entry = {"file": path.name, "rows": len(rows), "bytes": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+    index = _load_index()
+    index[str(run.pk)] = entry
+    _save_index(index)
+
+    with transaction.atomic():
+        run.paychecks.all().delete()
+        run.archived_at = timezone.now()
+        run.save(update_fields=["archived_at"])
+    return entry
+
+def restore_run(run: PayrollRun) -> int:
+    """Put an archived run's paychecks back in the database. Returns rows restored."""
+    if not run.archived_at:
+        raise ValueError(f"{run} is not archived.")
+    cols = read_columns(run.pk)
+    paychecks = (
+        Paycheck(
+            pk=int(cols["paycheck"][i]),
+            payroll_run=run,
+            employee_id=int(cols["employee"][i]),
+            **{f: _cents(cols[f], i) for f in PAYCHECK_MONEY_FIELDS},
+            **{f: cols[f][i] for f in DICT_COLUMNS},
+        )
+        for i in range(len(cols["paycheck"]))
+    )
+    with transaction.atomic():
+        restored = len(Paycheck.objects.bulk_create(paychecks, batch_size=ARCHIVE_BATCH))
+        run.archived_at = None
+        run.save(update_fields=["archived_at"])
+
+    index = _load_index()
+    index.pop(str(run.pk), None)
+    _save_index(index)
+    archive_path(run.pk).unlink(missing_ok=True)
+    return restored
+
+def verify_archive(run: PayrollRun) -> bool:
+    """True when the run's archive file matches the checksum recorded in the index."""
+    entry = _load_index().get(str(run.pk))
+    path = archive_path(run.pk)
+    if entry is None or not path.exists():
+        return False
+    return hashlib.sha256(path.read_bytes()).hexdigest() == entry["sha256"]
@@ -0,0 +1,240 @@
+"""Columnar (Parquet / Arrow IPC) export for analytics tools.
+
+Layout under the output directory (Hive-style partitions, so most tools can
+read the whole tree as one table and prune by partition):
+
+    paychecks/run=<pk>/part-0.parquet          one file per locked run
+    time_entries/month=YYYY-MM/part-0.parquet  one file per calendar month
+
+Money is stored as int64 cents (`*_cents` columns) and hours as int32
+hundredths (`*_hundredths`), so nothing has to parse decimal text. Rows are
+read from the database in chunks and written as record batches, so memory
+stays flat however large the run or month is. Files are written to a
+temporary name and renamed into place, so readers never see half a file.
+
+Requires pyarrow.
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from datetime import date
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from timeentry.models import TimeEntry
+from .archive import ArchivedPaychecks
+from .models import PAYCHECK_MONEY_FIELDS, PayrollRun
+
+EXPORT_BATCH_SIZE = 50_000
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+PAYCHECK_SCHEMA = pa.schema(
+    [
+        ("run_id", pa.int64()),
+        ("period_start", pa.date32()),
+        ("period_end", pa.date32()),
+        ("employee_id", pa.string()),
+        ("last_name", pa.string()),
+        ("first_name", pa.string()),
+        ("department", pa.string()),
+        ("job_title", pa.string()),
+        ("pay_type", pa.string()),
+        ("state", pa.string()),
+    ]
+    + [(f"{name}_cents", pa.int64()) for name in PAYCHECK_MONEY_FIELDS],
+    metadata={"money_unit": "cents"},
+)
+
+TIME_ENTRY_SCHEMA = pa.schema(
+    [
+        ("entry_id", pa.int64()),
+        ("work_date", pa.date32()),
+        ("employee_id", pa.string()),
+        ("department", pa.string()),
+        ("pay_type", pa.string()),
+        ("hours_worked_hundredths", pa.int32()),
+        ("pto_hours_hundredths", pa.int32()),
+        ("submitted", pa.bool_()),
+        ("locked", pa.bool_()),
+    ],
+    metadata={"hours_unit": "hundredths"},
+)
+
+@dataclass
+class ExportResult:
+    files: list[str] = field(default_factory=list)
+    rows: int = 0
+    skipped: list[str] = field(default_factory=list)
+
+def to_cents(value) -> int:
+    """Decimal with at most 2 places -> exact integer hundredths."""
+    return int(value * 100)
+
+class _BatchWriter:
+    """Buffers rows and writes them as record batches to a Parquet or Arrow file."""
+
+    def __init__(self, path: str, schema: pa.Schema, fmt: str, batch_size: int):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.schema = schema
+        self.batch_size = batch_size
+        self.columns = [[] for _ in schema]
+        self.rows = 0
+        self.closed = False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if fmt == "parquet":
+            self._writer = pq.ParquetWriter(self.tmp_path, schema, compression="zstd")
+        else:
+            self._sink = pa.OSFile(self.tmp_path, "wb")
+            self._writer = pa.ipc.new_file(
+                self._sink, schema, options=pa.ipc.IpcWriteOptions(compression="zstd")
+            )
+
+    def append(self, row) -> None:
+        for column, value in zip(self.columns, row):
+            column.append(value)
+        if len(self.columns[0]) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.columns[0]:
+            return
+        batch = pa.record_batch(
+            [pa.array(values, type=f.type) for values, f in zip(self.columns, self.schema)],
+            schema=self.schema,
+        )
+        self._writer.write_batch(batch)
+        self.rows += batch.num_rows
+        self.columns = [[] for _ in self.schema]
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+        if hasattr(self, "_sink"):
+            self._sink.close()
+        os.replace(self.tmp_path, self.path)
+        self.closed = True
+
+    def abort(self) -> None:
+        if self.closed:
+            return
+        try:
+            self._writer.close()
+            if hasattr(self, "_sink"):
+                self._sink.close()
+        finally:
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+
+def _write(path: str, schema: pa.Schema, rows, fmt: str, batch_size: int) -> int:
+    writer = _BatchWriter(path, schema, fmt, batch_size)
+    try:
+        for row in rows:
+            writer.append(row)
+        writer.close()
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.rows
+
+def paycheck_path(out_dir: str, run_id: int, fmt: str = "parquet") -> str:
+    return os.path.join(out_dir, "paychecks", f"run={run_id}", f"part-0{FORMATS[fmt]}")
+
+def time_entry_path(out_dir: str, month: date, fmt: str = "parquet") -> str:
+    return os.path.join(out_dir, "time_entries", f"month={month:%Y-%m}", f"part-0{FORMATS[fmt]}")
+
+def _paycheck_rows(run: PayrollRun, chunk_size: int):
+    # Department and pay type are the ones stored on the paycheck, as in the
+    # run summaries; the rest is the employee's current record.
+    head = (run.pk, run.period_start, run.period_end)
+    if run.archived_at:
+        for p in ArchivedPaychecks(run):
+            e = p.employee
+            yield (*head, e.employee_id, e.last_name, e.first_name, p.department, e.job_title, p.pay_type, e.state,
+                   *(to_cents(getattr(p, f)) for f in PAYCHECK_MONEY_FIELDS))
+        return
+    rows = run.paychecks.order_by("pk").values_list(
+        "employee__employee_id", "employee__last_name", "employee__first_name",
+        "department", "employee__job_title", "pay_type", "employee__state",
+        *PAYCHECK_MONEY_FIELDS,
+    ).iterator(chunk_size=chunk_size)
+    for row in rows:
+        yield (*head, *row[:7], *(to_cents(v) for v in row[7:]))
+
+def export_runs(runs, out_dir: str, fmt: str = "parquet", batch_size: int = EXPORT_BATCH_SIZE,
+                overwrite: bool = False) -> ExportResult:
+    """Write one paycheck file per locked run.
+
+    Locked runs never change, so a run whose file already exists is skipped
+    unless `overwrite`. Unlocked runs are skipped.
+    """
+    result = ExportResult()
+    for run in runs:
+        path = paycheck_path(out_dir, run.pk, fmt)
+        if not run.locked or (os.path.exists(path) and not overwrite):
+            result.skipped.append(path)
+            continue
+        result.rows += _write(path, PAYCHECK_SCHEMA, _paycheck_rows(run, batch_size), fmt, batch_size)
+        result.files.append(path)
+    return result
+
+def _month_start(d: date) -> date:
+    return d.replace(day=1)
+
+def _next_month(d: date) -> date:
+    return date(d.year + d.month // 12, d.month % 12 + 1, 1)
+
+def export_time_entries(out_dir: str, start: date | None = None, end: date | None = None,
+                        fmt: str = "parquet", batch_size: int = EXPORT_BATCH_SIZE) -> ExportResult:
+    """Rewrite the month partitions covering start..end (whole months; all when unset).
+
+    Entries are streamed once in (work_date, id) order, which the
+    timeentry_work_date_id_idx index serves, and a new file is started at
+    each month boundary.
+    """
+    qs = TimeEntry.objects.all()
+    if start:
+        qs = qs.filter(work_date__gte=_month_start(start))
+    if end:
+        qs = qs.filter(work_date__lt=_next_month(end))
+    rows = qs.order_by("work_date", "id").values_list(
+        "id", "work_date", "employee__employee_id", "employee__department", "employee__pay_type",
+        "hours_worked", "pto_hours", "submitted", "locked",
+    ).iterator(chunk_size=batch_size)
+
+    result = ExportResult()
+    writer = month = None
+    try:
+        for entry_id, work_date, *attrs, hours, pto, submitted, locked in rows:
+            if month != _month_start(work_date):
+                if writer:
+                    writer.close()
+                    result.rows += writer.rows
+                month = _month_start(work_date)
+                writer = _BatchWriter(time_entry_path(out_dir, month, fmt), TIME_ENTRY_SCHEMA, fmt, batch_size)
+                result.files.append(writer.path)
+            writer.append((entry_id, work_date, *attrs, to_cents(hours), to_cents(pto), submitted, locked))
+        if writer:
+            writer.close()
+            result.rows += writer.rows
+    except BaseException:
+        if writer:
+            writer.abort()
+        raise
+
+    # A month in the range that no longer has entries must not keep an old file.
+    # An open end of the range reaches every partition already on disk.
+    root = os.path.join(out_dir, "time_entries")
+    for name in sorted(os.listdir(root)) if os.path.isdir(root) else []:
+        try:
+            month = date.fromisoformat(f"{name.removeprefix('month=')}-01")
+        except ValueError:
+            continue
+        if (start and month < _month_start(start)) or (end and month > end):
+            continue
+        path = time_entry_path(out_dir, month, fmt)
+        if path not in result.files and os.path.exists(path):
+            os.remove(path)
+    return result
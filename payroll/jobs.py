@@ -0,0 +1,287 @@
+"""Background payroll run jobs.
+
+Creating a run from the web UI only queues a PayrollJob; the computation
+happens outside the request, in one of two ways (settings.PAYROLL_JOB_RUNNER):
+
+- "thread" (default): a single background thread inside the web process.
+  Nothing else to run, which suits a one-box deployment. The thread drains
+  the same database queue as the command, so jobs queued before a restart
+  are picked up again (the run detail page restarts the thread when it sees
+  a queued job and the thread is idle).
+- "command": jobs wait in the database until `python manage.py run_payroll_jobs`
+  (a long-running worker process) claims them.
+
+Both runners first fail RUNNING jobs whose heartbeat went stale (their worker
+died) so they show up as failed and can be resumed, rather than looking busy
+forever.
+
+Regular runs lock the period's time entries and the run itself; draft runs
+leave both unlocked so corrections can be recalculated incrementally.
+
+Progress (processed/total) is committed after every chunk so the run detail
+page can poll it through the JSON progress endpoint. Each chunk's paychecks,
+the progress counters and the run's checkpoint (the last employee_id in the
+chunk) are committed in one transaction, so a job that failed or whose
+process was killed can be resumed with `resume_job`: it continues after the
+checkpoint instead of recomputing finished chunks. Every committed chunk or
+shard also touches the job's heartbeat; a RUNNING job is only resumed once
+its heartbeat is older than PAYROLL_JOB_STALE_AFTER (or when forced), so a
+job whose worker is still alive is never computed twice.
+"""
+from __future__ import annotations
+
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from employees.models import Employee, EmployeeStatus
+from .models import JobState, PayrollJob, PayrollRun
+from .profiling import RunProfile
+from .recalculation import prune_pay_input_changes, tax_inputs_key
+from .services import (
+    compute_payroll_batch,
+    iter_active_employee_chunks,
+    lock_period_entries,
+    lock_run,
+    write_paychecks,
+)
+from .sharding import compute_payroll_sharded
+from .taxes import clear_tax_tables
+
+logger = logging.getLogger(__name__)
+
+JOB_CHUNK_SIZE = 1000
+
+_executor: ThreadPoolExecutor | None = None
+_drain: Future | None = None
+
+def _thread_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        # One worker: runs are processed one at a time, in order.
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="payroll-job")
+    return _executor
+
+def enqueue_payroll_run(
+    period_start: date, period_end: date, user=None, sharded: bool = False, draft: bool = False
+) -> PayrollJob:
+    """Create an (unlocked) PayrollRun plus a queued job for it.
+
+    Draft runs stay unlocked when the job finishes; see payroll/recalculation.py.
+    """
+    with transaction.atomic():
+        run = PayrollRun.objects.create(
+            period_start=period_start,
+            period_end=period_end,
+            calculated_by=user,
+            locked=False,
+        )
+        job = PayrollJob.objects.create(payroll_run=run, sharded=sharded, draft=draft)
+        if getattr(settings, "PAYROLL_JOB_RUNNER", "thread") == "thread":
+            transaction.on_commit(lambda: start_thread_runner(force=True))
+    return job
+
+def start_thread_runner(force: bool = False) -> None:
+    """Have the in-process thread drain the job queue.
+
+    Without `force` nothing is submitted while a drain is pending or running.
+    Enqueueing forces one: a drain that is just finishing may already have
+    found the queue empty.
+    """
+    global _drain
+    if force or _drain is None or _drain.done():
+        _drain = _thread_executor().submit(_drain_queue)
+
+def _drain_queue() -> None:
+    try:
+        while job := claim_next_job():
+            execute_job(job)
+    finally:
+        # Connections are per-thread; don't leak this one.
+        connections.close_all()
+
+def claim_job(job_id: int) -> PayrollJob | None:
+    """Atomically move a queued job to RUNNING. Returns None if someone else got it."""
+    now = timezone.now()
+    claimed = PayrollJob.objects.filter(pk=job_id, state=JobState.QUEUED).update(
+        state=JobState.RUNNING, started_at=now, heartbeat_at=now
+    )
+    if not claimed:
+        return None
+    return PayrollJob.objects.select_related("payroll_run").get(pk=job_id)
+
+def fail_stale_jobs() -> int:
+    """Mark RUNNING jobs whose worker stopped sending heartbeats as FAILED.
+
+    Their runs keep their checkpoint and can be continued with `resume_job`.
+    Returns the number of jobs failed.
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=settings.PAYROLL_JOB_STALE_AFTER)
+    stale = PayrollJob.objects.filter(state=JobState.RUNNING).filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+    failed = 0
+    for job in stale.select_related("payroll_run"):
+        failed += PayrollJob.objects.filter(pk=job.pk, state=JobState.RUNNING, heartbeat_at=job.heartbeat_at).update(
+            state=JobState.FAILED,
+            finished_at=now,
+            error=f"Worker stopped (no progress since {job.heartbeat_at or job.started_at}). "
+                  f"Continue with: manage.py run_payroll --resume {job.payroll_run_id}",
+        )
+    if failed:
+        logger.warning("Failed %s payroll job(s) abandoned by their worker", failed)
+    return failed
+
+def claim_next_job() -> PayrollJob | None:
+    """Fail abandoned jobs, then claim the oldest queued job, if any."""
+    fail_stale_jobs()
+    for job_id in PayrollJob.objects.filter(state=JobState.QUEUED).order_by("created_at").values_list("pk", flat=True):
+        job = claim_job(job_id)
+        if job:
+            return job
+    return None
+
+def resume_job(run: PayrollRun, force: bool = False) -> PayrollJob:
+    """Prepare the job of a failed or interrupted run to continue after its checkpoint.
+
+    A RUNNING job is refused while its heartbeat is fresh (its worker may still
+    be computing it) unless `force` is given. Paychecks past the checkpoint
+    (left by runs computed before checkpoints existed) are deleted so they are
+    computed again. The progress counters are committed together with the
+    checkpoint, so they are kept, except with no checkpoint, where the job
+    starts over.
+    """
+    job = PayrollJob.objects.select_related("payroll_run").get(payroll_run=run)
+    if job.state == JobState.DONE:
+        raise ValueError(f"{run} already finished.")
+    if job.state == JobState.RUNNING and not job.is_stale and not force:
+        raise ValueError(
+            f"{run} is still running (last progress at {job.heartbeat_at or job.started_at}); "
+            "wait for it, or resume with force (run_payroll --force) if its worker is gone."
+        )
+    with transaction.atomic():
+        now = timezone.now()
+        # Take the job over only if nobody claimed or touched it since it was read.
+        taken = PayrollJob.objects.filter(pk=job.pk, state=job.state, heartbeat_at=job.heartbeat_at).update(
+            state=JobState.RUNNING, heartbeat_at=now
+        )
+        if not taken:
+            raise ValueError(f"{run}'s job changed while resuming it; try again.")
+        run.paychecks.filter(employee__employee_id__gt=run.checkpoint_employee_id).delete()
+        if not run.checkpoint_employee_id:
+            job.processed = job.skipped = 0
+            job.skipped_detail = ""
+        job.state = JobState.RUNNING
+        job.heartbeat_at = now
+        job.error = ""
+        job.finished_at = None
+        job.started_at = job.started_at or now
+        job.save(update_fields=["processed", "skipped", "skipped_detail", "state", "error", "finished_at", "started_at"])
+    return job
+
+def execute_job(job: PayrollJob, chunk_size: int = JOB_CHUNK_SIZE, on_progress=None) -> None:
+    """Compute the job's run. Failures are recorded on the job, not raised.
+
+    A job with a checkpoint on its run (see `resume_job`) continues after it.
+    `on_progress(job)` is called after each committed chunk or shard.
+    Per-phase timings and query counts are stored on the run (run.profile).
+    """
+    run = job.payroll_run
+    profile = RunProfile()
+    skipped_lines = job.skipped_detail.splitlines()
+    # The compiled-rule cache is per process; rules edited in another worker
+    # only clear that worker's copy, so each run reads them afresh.
+    clear_tax_tables()
+
+    def record_skipped(skipped):
+        job.skipped += len(skipped)
+        skipped_lines.extend(f"{emp.employee_id}: {reason}" for emp, reason in skipped)
+
+    try:
+        if not job.draft:
+            with profile.phase("lock_entries"):
+                lock_period_entries(run.period_start, run.period_end)
+        with profile.phase("progress"):
+            if not run.checkpoint_employee_id:
+                # Changes journaled after this point make employees dirty (recalculation.py).
+                run.inputs_as_of = timezone.now()
+                run.tax_inputs_key = tax_inputs_key(run)
+                run.save(update_fields=["inputs_as_of", "tax_inputs_key"])
+            job.total = Employee.objects.filter(status=EmployeeStatus.ACTIVE).count()
+            job.save(update_fields=["total"])
+
+        if job.sharded:
+            def on_shard_done(timing):
+                job.processed += timing.employees + timing.skipped
+                job.heartbeat_at = timezone.now()
+                job.save(update_fields=["processed", "heartbeat_at"])
+                if on_progress:
+                    on_progress(job)
+
+            with profile.phase("compute_sharded"):
+                result, timings = compute_payroll_sharded(run.period_start, run.period_end, on_shard_done=on_shard_done)
+            if timings:
+                # Shown on the run page next to the phase timings.
+                slowest = max(timings, key=lambda t: t.seconds)
+                profile.extra["shards"] = {"count": len(timings), "slowest": asdict(slowest)}
+            with profile.phase("write_paychecks"):
+                write_paychecks(run, result.breakdowns)
+            record_skipped(result.skipped)
+        else:
+            chunks = iter_active_employee_chunks(chunk_size, run.checkpoint_employee_id)
+            while True:
+                with profile.phase("load_employees"):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                result = compute_payroll_batch(chunk, run.period_start, run.period_end, profile=profile)
+                lines = [f"{emp.employee_id}: {reason}" for emp, reason in result.skipped]
+                checkpoint = chunk[-1].employee_id
+                beat = timezone.now()
+                with profile.phase("write_paychecks"), transaction.atomic():
+                    write_paychecks(run, result.breakdowns)
+                    # Written with the paychecks; in-memory values follow only once committed.
+                    PayrollJob.objects.filter(pk=job.pk).update(
+                        processed=job.processed + len(chunk),
+                        skipped=job.skipped + len(result.skipped),
+                        skipped_detail="\n".join(skipped_lines + lines),
+                        heartbeat_at=beat,
+                    )
+                    PayrollRun.objects.filter(pk=run.pk).update(checkpoint_employee_id=checkpoint)
+                record_skipped(result.skipped)
+                job.processed += len(chunk)
+                job.heartbeat_at = beat
+                run.checkpoint_employee_id = checkpoint
+                if on_progress:
+                    on_progress(job)
+
+        if not job.draft:
+            with profile.phase("lock_run"):
+                lock_run(run)
+        prune_pay_input_changes()
+        job.state = JobState.DONE
+    except Exception as ex:
+        logger.exception("Payroll job %s failed", job.pk)
+        job.state = JobState.FAILED
+        job.error = str(ex)
+    except BaseException as ex:
+        # Ctrl-C or process shutdown: record it so the run can be resumed at
+        # once instead of looking busy until the heartbeat goes stale.
+        job.state = JobState.FAILED
+        job.error = f"Interrupted ({type(ex).__name__})."
+        raise
+    finally:
+        job.skipped_detail = "\n".join(skipped_lines)
+        job.finished_at = timezone.now()
+        job.save(update_fields=["state", "error", "processed", "skipped", "skipped_detail", "finished_at"])
+        run.employees_skipped = job.skipped
+        run.employees_processed = job.processed - job.skipped
+        run.profile = profile.as_dict()
+        run.save(update_fields=["employees_processed", "employees_skipped", "profile"])
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from payroll.archive import archive_run, restore_run, runs_due, verify_archive
+from payroll.models import PayrollRun
+from payroll.services import summarize_run
+
+class Command(BaseCommand):
+    help = (
+        "Move the paychecks of old locked payroll runs into compressed archive files "
+        "(payroll/archive.py), or restore or verify archived runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int, default=None,
+                            help=f"Archive runs whose period ended more than this many days ago "
+                                 f"(default PAYROLL_ARCHIVE_AFTER_DAYS = {settings.PAYROLL_ARCHIVE_AFTER_DAYS}).")
+        parser.add_argument("--run", type=int, action="append", default=[],
+                            help="Archive this locked run regardless of age (repeatable).")
+        parser.add_argument("--restore", type=int, action="append", default=[],
+                            help="Put this archived run's paychecks back in the database (repeatable).")
+        parser.add_argument("--verify", action="store_true", help="Check every archive file against its checksum.")
+        parser.add_argument("--dry-run", action="store_true", help="List the runs that would be archived.")
+        parser.add_argument("--vacuum", action="store_true", help="VACUUM afterwards to shrink an SQLite file.")
+
+    def handle(self, *args, **opts):
+        if opts["restore"]:
+            for run in self._runs(opts["restore"]):
+                try:
+                    restored = restore_run(run)
+                except ValueError as ex:
+                    raise CommandError(str(ex))
+                self.stdout.write(self.style.SUCCESS(f"{run}: {restored} paychecks restored."))
+            return
+
+        if opts["verify"]:
+            bad = 0
+            for run in PayrollRun.objects.filter(archived_at__isnull=False).order_by("pk"):
+                ok = verify_archive(run)
+                bad += not ok
+                self.stdout.write(f"{run}: {'ok' if ok else 'MISSING OR CORRUPT'}")
+            if bad:
+                raise CommandError(f"{bad} archived runs failed verification.")
+            self.stdout.write(self.style.SUCCESS("All archives verified."))
+            return
+
+        runs = self._runs(opts["run"]) if opts["run"] else list(runs_due(opts["older_than_days"]).order_by("period_end"))
+        if opts["dry_run"]:
+            for run in runs:
+                self.stdout.write(f"would archive {run}")
+            self.stdout.write(f"{len(runs)} runs.")
+            return
+
+        paychecks = size = 0
+        for run in runs:
+            if run.locked and not run.archived_at and run.summary is None:
+                summarize_run(run)
+            try:
+                entry = archive_run(run)
+            except ValueError as ex:
+                raise CommandError(str(ex))
+            paychecks += entry["rows"]
+            size += entry["bytes"]
+            per = entry["bytes"] / entry["rows"] if entry["rows"] else 0
+            self.stdout.write(f"{run}: {entry['rows']} paychecks -> {entry['file']} ({entry['bytes']} bytes, {per:.1f}/paycheck)")
+
+        if opts["vacuum"] and connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute("VACUUM")
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {len(runs)} runs ({paychecks} paychecks, {size / 1024:.0f} KiB of archive files)."
+        ))
+
+    def _runs(self, ids) -> list[PayrollRun]:
+        runs = PayrollRun.objects.in_bulk(ids)
+        missing = [pk for pk in ids if pk not in runs]
+        if missing:
+            raise CommandError(f"No payroll run {missing[0]}.")
+        return [runs[pk] for pk in ids]
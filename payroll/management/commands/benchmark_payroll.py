@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import json
+import os
+import platform
+import time
+from datetime import date, timedelta
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.utils import timezone
+
+from employees.synthetic import delete_synthetic, generate_synthetic
+from payroll.jobs import claim_job, execute_job
+from payroll.models import JobState, PayrollJob, PayrollRun
+from payroll.profiling import QueryCounter
+from payroll.views import PayrollRunDetailView, export_payroll_csv
+from timeentry.views import MyTimeEntryListView
+
+User = get_user_model()
+
+BENCH_HR_USERNAME = "BENCH-HR"
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark payroll run creation, CSV export, run detail rendering and the time entry list "
+        "at several workforce sizes. Generates (and removes) synthetic data, so point it at a "
+        "scratch database. Results are written as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scales", default="1000,10000,100000", help="Comma-separated employee counts.")
+        parser.add_argument("--weeks", type=int, default=1, help="Weeks in the benchmark pay period.")
+        parser.add_argument("--first-week", default="2001-01-01", help="Monday of the benchmark period.")
+        parser.add_argument("--prefix", default="BENCH", help="employee_id prefix for generated data.")
+        parser.add_argument("--output", help="Write JSON results to this file (default: stdout).")
+        parser.add_argument("--baseline", help="Previous JSON results to compare against.")
+        parser.add_argument("--tolerance", type=float, default=0.25,
+                            help="Allowed slowdown vs. baseline before failing (0.25 = 25%%).")
+        parser.add_argument("--min-delta", type=float, default=0.05,
+                            help="Ignore slowdowns smaller than this many seconds (timer noise).")
+        parser.add_argument("--keep", action="store_true", help="Keep the data of the last scale.")
+
+    def handle(self, *args, **opts):
+        scales = [int(s) for s in opts["scales"].split(",") if s.strip()]
+        first_week = date.fromisoformat(opts["first_week"])
+        period_end = first_week + timedelta(days=7 * opts["weeks"] - 1)
+        prefix = opts["prefix"]
+
+        hr, _ = User.objects.get_or_create(username=BENCH_HR_USERNAME, defaults={"is_staff": True})
+        factory = RequestFactory()
+
+        def get(path, **params):
+            request = factory.get(path, params)
+            request.user = hr
+            return request
+
+        results = []
+
+        def measure(scale, operation, fn):
+            with QueryCounter() as qc:
+                t0 = time.perf_counter()
+                rows = fn()
+                seconds = time.perf_counter() - t0
+            results.append({
+                "scale": scale,
+                "operation": operation,
+                "seconds": round(seconds, 4),
+                "queries": qc.count,
+                "query_seconds": round(qc.seconds, 4),
+                "rows": rows,
+            })
+            self.stderr.write(f"  {operation:<28} {seconds:9.3f}s  {qc.count:6d} queries")
+
+        for n, scale in enumerate(scales):
+            self.stderr.write(f"Scale {scale}:")
+            self._cleanup(prefix, first_week, period_end)
+
+            def generate():
+                return generate_synthetic(scale, opts["weeks"], first_week, prefix=prefix).time_entries
+
+            measure(scale, "generate_data", generate)
+
+            run = None
+
+            def create_run():
+                nonlocal run
+                run = PayrollRun.objects.create(period_start=first_week, period_end=period_end, calculated_by=hr)
+                job = claim_job(PayrollJob.objects.create(payroll_run=run).pk)
+                execute_job(job)
+                if job.state != JobState.DONE:
+                    raise CommandError(f"Benchmark run failed: {job.error}")
+                return job.processed
+
+            measure(scale, "create_run", create_run)
+
+            def csv_export():
+                resp = export_payroll_csv(get(f"/payroll/{run.pk}/export.csv"), pk=run.pk)
+                return sum(chunk.count(b"\n") for chunk in resp.streaming_content) - 1
+
+            measure(scale, "csv_export", csv_export)
+
+            def run_detail():
+                resp = PayrollRunDetailView.as_view()(get(f"/payroll/{run.pk}/"), pk=run.pk)
+                resp.render()
+                return len(resp.content)
+
+            measure(scale, "run_detail", run_detail)
+
+            def time_entries(**params):
+                def view():
+                    resp = MyTimeEntryListView.as_view()(get("/time/", **params))
+                    resp.render()
+                    return len(resp.content)
+                return view
+
+            measure(scale, "time_entry_list_first", time_entries())
+            measure(scale, "time_entry_list_last", time_entries(cursor="last"))
+
+            if not (opts["keep"] and n == len(scales) - 1):
+                self._cleanup(prefix, first_week, period_end)
+
+        report = {
+            "meta": {
+                "timestamp": timezone.now().isoformat(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "weeks": opts["weeks"],
+            },
+            "results": results,
+        }
+        text = json.dumps(report, indent=2)
+        if opts["output"]:
+            with open(opts["output"], "w", encoding="utf-8") as fh:
+                fh.write(text + "\n")
+            self.stderr.write(f"Wrote {opts['output']}")
+        else:
+            self.stdout.write(text)
+
+        if opts["baseline"]:
+            self._compare(results, opts["baseline"], opts["tolerance"], opts["min_delta"])
+
+    def _cleanup(self, prefix, period_start, period_end):
+        PayrollRun.objects.filter(
+            period_start=period_start, period_end=period_end, calculated_by__username=BENCH_HR_USERNAME
+        ).delete()
+        delete_synthetic(prefix)
+
+    def _compare(self, results, baseline_path, tolerance, min_delta):
+        with open(baseline_path, encoding="utf-8") as fh:
+            baseline = {(r["scale"], r["operation"]): r for r in json.load(fh)["results"]}
+        regressions = []
+        for r in results:
+            base = baseline.get((r["scale"], r["operation"]))
+            if not base:
+                continue
+            slower = r["seconds"] - base["seconds"]
+            if slower > min_delta and r["seconds"] > base["seconds"] * (1 + tolerance):
+                regressions.append(
+                    f"{r['operation']} @ {r['scale']}: {r['seconds']:.3f}s vs {base['seconds']:.3f}s"
+                )
+        if regressions:
+            raise CommandError("Performance regressions:\n  " + "\n  ".join(regressions))
+        self.stderr.write(self.style.SUCCESS("No regressions against baseline."))
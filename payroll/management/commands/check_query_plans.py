@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import re
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+from django.db.models.sql import UpdateQuery
+
+from employees.models import Employee
+from payroll.models import PayrollRun
+from timeentry.models import TimeEntry, WeeklyHours
+
+# A full table scan: SQLite "SCAN <table>" without an index, PostgreSQL "Seq Scan".
+FULL_SCAN_RE = {
+    "sqlite": re.compile(r"\bSCAN (\w+)(?!.*\bUSING\b.*\bINDEX\b)"),
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+}
+
+def _select_sql(qs):
+    return qs.query.sql_with_params()
+
+def _update_sql(qs, values):
+    query = qs.query.chain(UpdateQuery)
+    query.add_update_values(values)
+    return query.get_compiler(qs.db).as_sql()
+
+def hot_path_queries():
+    """(label, sql, params) for every query the indexes are meant to serve."""
+    start, end = date(2025, 1, 6), date(2025, 1, 12)
+    return [
+        ("time entry lock UPDATE", *_update_sql(
+            TimeEntry.objects.filter(work_date__gte=start, work_date__lte=end), {"locked": True})),
+        ("period time entries", *_select_sql(
+            TimeEntry.objects.filter(work_date__gte=start, work_date__lte=end)
+            .order_by().values_list("employee_id", "work_date", "hours_worked", "pto_hours"))),
+        ("time entry list", *_select_sql(
+            TimeEntry.objects.select_related("employee").order_by("-work_date", "-id")[:32])),
+        ("time entry list, keyset page", *_select_sql(
+            TimeEntry.objects.select_related("employee")
+            .filter(Q(work_date__lte=end), Q(work_date__lt=end) | Q(work_date=end, id__lt=1000))
+            .order_by("-work_date", "-id")[:32])),
+        ("weekly hours for period", *_select_sql(
+            WeeklyHours.objects.filter(week_start__gte=start, week_start__lte=end).order_by())),
+        ("payroll run list", *_select_sql(PayrollRun.objects.all()[:20])),
+        ("paychecks of a run", *_select_sql(
+            PayrollRun(pk=1).paychecks.select_related("employee"))),
+        ("CSV export", *_select_sql(
+            PayrollRun(pk=1).paychecks.order_by("pk").values_list("employee__employee_id", "net_pay"))),
+        ("employee list", *_select_sql(Employee.objects.order_by("last_name", "first_name", "id")[:26])),
+        ("employee list by department, keyset page", *_select_sql(
+            Employee.objects.filter(department="HR", last_name__gte="M")
+            .filter(Q(last_name__gt="M") | Q(last_name="M", first_name__gt="A") | Q(last_name="M", first_name="A", id__gt=1))
+            .order_by("last_name", "first_name", "id")[:26])),
+    ]
+
+class Command(BaseCommand):
+    help = "EXPLAIN the payroll hot-path queries and fail if any falls back to a full table scan."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verbose-plans", action="store_true", help="Print every plan, not just failures.")
+
+    def handle(self, *args, **opts):
+        vendor = connection.vendor
+        if vendor not in FULL_SCAN_RE:
+            raise CommandError(f"Don't know how to read {vendor} query plans.")
+        prefix = "EXPLAIN QUERY PLAN " if vendor == "sqlite" else "EXPLAIN "
+
+        failures = []
+        with connection.cursor() as cursor:
+            for label, sql, params in hot_path_queries():
+                cursor.execute(prefix + sql, params)
+                plan = "\n".join(" ".join(str(c) for c in row) for row in cursor.fetchall())
+                scans = FULL_SCAN_RE[vendor].findall(plan)
+                if scans:
+                    failures.append(label)
+                    self.stdout.write(self.style.ERROR(f"FULL SCAN ({', '.join(scans)}): {label}"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"ok: {label}"))
+                if scans or opts["verbose_plans"]:
+                    self.stdout.write(f"    {sql}\n    " + plan.replace("\n", "\n    "))
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot-path queries use a full table scan.")
+        self.stdout.write(self.style.SUCCESS("All hot-path queries use indexes."))
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.models import Employee, SalaryProfile, PayType, MedicalCoverage
+from payroll.services import compute_breakdown
+from payroll.vectorized import COLUMNS, compute_payroll_vectorized, to_fixed
+
+def random_inputs(rng: random.Random, n: int) -> list[dict]:
+    """Random employees, including edge cases (zero hours, taxable floored at 0)."""
+    rows = []
+    for _ in range(n):
+        pay_type = rng.choice([PayType.SALARY, PayType.HOURLY])
+        if pay_type == PayType.SALARY:
+            base = Decimal(rng.randint(0, 50_000_000)).scaleb(-2)  # up to $500k/yr
+            regular, overtime = Decimal("0"), Decimal("0")
+        else:
+            base = Decimal(rng.randint(0, 25_000)).scaleb(-2)  # up to $250/h
+            regular = Decimal(rng.choice([0, rng.randint(0, 8000)])).scaleb(-2)
+            overtime = Decimal(rng.choice([0, rng.randint(0, 4000)])).scaleb(-2)
+        rows.append({
+            "pay_type": pay_type,
+            "base_pay": base,
+            "regular": regular,
+            "overtime": overtime,
+            "dependents": rng.randint(0, 6),
+            "medical": rng.choice([MedicalCoverage.SINGLE, MedicalCoverage.FAMILY]),
+        })
+    return rows
+
+def decimal_breakdown(row: dict):
+    """Run the Decimal path on unsaved model instances (no database access)."""
+    emp = Employee(employee_id="PARITY", pay_type=row["pay_type"])
+    SalaryProfile(
+        employee=emp,
+        salary_type=row["pay_type"],
+        base_pay=row["base_pay"],
+        dependents=row["dependents"],
+        medical=row["medical"],
+    )
+    return compute_breakdown(emp, row["regular"], row["overtime"])
+
+class Command(BaseCommand):
+    help = "Compare the NumPy payroll calculator against the Decimal path on random inputs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--samples", type=int, default=100_000, help="Number of random employees.")
+        parser.add_argument("--seed", type=int, default=None, help="Random seed (printed if omitted).")
+        parser.add_argument("--show", type=int, default=10, help="Mismatches to print.")
+
+    def handle(self, *args, **opts):
+        seed = opts["seed"] if opts["seed"] is not None else random.randrange(2 ** 32)
+        rng = random.Random(seed)
+        rows = random_inputs(rng, opts["samples"])
+        self.stdout.write(f"Seed {seed}, {len(rows)} samples.")
+
+        t0 = time.perf_counter()
+        cols = compute_payroll_vectorized(
+            to_fixed([r["base_pay"] for r in rows]),
+            [r["pay_type"] for r in rows],
+            to_fixed([r["regular"] for r in rows]),
+            to_fixed([r["overtime"] for r in rows]),
+            [r["dependents"] for r in rows],
+            [r["medical"] for r in rows],
+        )
+        vec_seconds = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        expected = [decimal_breakdown(r) for r in rows]
+        dec_seconds = time.perf_counter() - t0
+
+        mismatches = 0
+        for i, exp in enumerate(expected):
+            got = cols.breakdown(i)
+            bad = [c for c in COLUMNS if getattr(got, c) != getattr(exp, c)]
+            if bad:
+                mismatches += 1
+                if mismatches <= opts["show"]:
+                    detail = ", ".join(f"{c}: {getattr(got, c)} != {getattr(exp, c)}" for c in bad)
+                    self.stdout.write(self.style.ERROR(f"Row {i} {rows[i]}: {detail}"))
+
+        self.stdout.write(f"Vectorized: {vec_seconds:.3f}s, Decimal: {dec_seconds:.3f}s")
+        if mismatches:
+            raise CommandError(f"{mismatches} of {len(rows)} rows differ (seed {seed}).")
+        self.stdout.write(self.style.SUCCESS("All rows match to the cent."))
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import csv
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payroll.models import PAYCHECK_MONEY_FIELDS, PayrollRun
+from payroll.run_diff import COLUMN_LABELS, diff_rows, diff_totals, row_status
+from payroll.services import money
+
+class Command(BaseCommand):
+    help = (
+        "Compare two payroll runs: totals, then every employee added, removed or changed by more "
+        "than --threshold in some money column (deltas are OTHER minus BASE)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("base", type=int, help="Base run id.")
+        parser.add_argument("other", type=int, help="Run id to compare with the base.")
+        parser.add_argument("--threshold", default="0", help="Ignore changes up to this amount (default 0).")
+        parser.add_argument("--csv", help="Write every differing employee, with base/other/delta per column, here.")
+        parser.add_argument("--limit", type=int, default=50, help="Employees to print (default 50).")
+
+    def handle(self, *args, **opts):
+        runs = PayrollRun.objects.in_bulk([opts["base"], opts["other"]])
+        for pk in (opts["base"], opts["other"]):
+            if pk not in runs:
+                raise CommandError(f"No payroll run {pk}.")
+        base, other = runs[opts["base"]], runs[opts["other"]]
+        for run in (base, other):
+            if run.archived_at:
+                raise CommandError(f"Run {run.pk} is archived; restore it with archive_payroll_runs --restore {run.pk}.")
+        try:
+            threshold = Decimal(opts["threshold"])
+        except InvalidOperation:
+            raise CommandError(f"Invalid --threshold {opts['threshold']!r}.")
+
+        totals = diff_totals(base, other)
+        self.stdout.write(f"Base  {base}: {totals['in_base']} paychecks")
+        self.stdout.write(f"Other {other}: {totals['in_other']} paychecks")
+        self.stdout.write(f"{'':<14}{'base':>14}{'other':>14}{'change':>14}")
+        for f, label in COLUMN_LABELS.items():
+            self.stdout.write(
+                f"{label:<14}{money(totals[f + '_base']):>14}{money(totals[f + '_other']):>14}"
+                f"{money(totals[f + '_delta']):>14}"
+            )
+
+        rows = diff_rows(base, other, threshold)
+        writer = None
+        if opts["csv"]:
+            fh = open(opts["csv"], "w", newline="", encoding="utf-8")
+            writer = csv.writer(fh)
+            writer.writerow(["employee_id", "name", "status"] + [
+                f"{f}_{side}" for f in PAYCHECK_MONEY_FIELDS for side in ("base", "other", "delta")
+            ])
+        counts = {"added": 0, "removed": 0, "changed": 0}
+        self.stdout.write("")
+        try:
+            for r in rows.iterator(chunk_size=2000):
+                status = row_status(r)
+                counts[status] += 1
+                name = f"{r['employee__last_name']}, {r['employee__first_name']}"
+                if writer:
+                    writer.writerow([r["employee__employee_id"], name, status] + [
+                        money(r[f"{f}_{side}"]) for f in PAYCHECK_MONEY_FIELDS for side in ("base", "other", "delta")
+                    ])
+                if sum(counts.values()) <= opts["limit"]:
+                    self.stdout.write(
+                        f"{r['employee__employee_id']:<10}{status:<9}"
+                        f"gross {money(r['gross_pay_delta']):>+10}  net {money(r['net_pay_delta']):>+10}  {name}"
+                    )
+        finally:
+            if writer:
+                fh.close()
+        self.stdout.write(self.style.SUCCESS(
+            f"{counts['changed']} changed, {counts['added']} added, {counts['removed']} removed "
+            f"(threshold {threshold})."
+        ))
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payroll.arrow_export import EXPORT_BATCH_SIZE, FORMATS, export_runs, export_time_entries
+from payroll.models import PayrollRun
+
+def _date(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date {value!r} (use YYYY-MM-DD).")
+
+class Command(BaseCommand):
+    help = (
+        "Export locked payroll runs (paychecks joined with employee attributes) and, optionally, "
+        "time entries to a directory of Parquet or Arrow files partitioned by run and by month. "
+        "Money is int cents. Runs already exported are skipped, so re-running only adds new runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("out_dir")
+        parser.add_argument("--format", choices=sorted(FORMATS), default="parquet")
+        parser.add_argument("--run", type=int, action="append", dest="runs",
+                            help="Only this run id (repeatable). Default: every locked run.")
+        parser.add_argument("--overwrite", action="store_true", help="Rewrite runs that were already exported.")
+        parser.add_argument("--time-entries", action="store_true", help="Also export time entries by month.")
+        parser.add_argument("--entries-from", help="First month to export (YYYY-MM-DD, any day in it).")
+        parser.add_argument("--entries-to", help="Last month to export (YYYY-MM-DD, any day in it).")
+        parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+
+    def handle(self, *args, **opts):
+        fmt, out_dir, batch_size = opts["format"], opts["out_dir"], opts["batch_size"]
+
+        runs = PayrollRun.objects.filter(locked=True).order_by("pk")
+        if opts["runs"]:
+            runs = PayrollRun.objects.filter(pk__in=opts["runs"]).order_by("pk")
+        t0 = time.perf_counter()
+        result = export_runs(runs, out_dir, fmt, batch_size, overwrite=opts["overwrite"])
+        self.stdout.write(
+            f"Paychecks: {result.rows} rows in {len(result.files)} files "
+            f"({len(result.skipped)} runs skipped: already exported or not locked) "
+            f"in {time.perf_counter() - t0:.1f}s."
+        )
+
+        if opts["time_entries"]:
+            start = _date(opts["entries_from"]) if opts["entries_from"] else None
+            end = _date(opts["entries_to"]) if opts["entries_to"] else None
+            t0 = time.perf_counter()
+            result = export_time_entries(out_dir, start, end, fmt, batch_size)
+            self.stdout.write(
+                f"Time entries: {result.rows} rows in {len(result.files)} month files "
+                f"in {time.perf_counter() - t0:.1f}s."
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Export written to {out_dir}."))
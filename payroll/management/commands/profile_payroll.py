@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from employees.synthetic import delete_synthetic, generate_synthetic
+from payroll.jobs import claim_job, execute_job
+from payroll.models import JobState, PayrollJob, PayrollRun
+
+class _Rollback(Exception):
+    pass
+
+class Command(BaseCommand):
+    help = (
+        "Compute one payroll run and print where the time went: per-phase wall-clock time and "
+        "query counts, and optionally a cProfile report. The run (including locking) is rolled "
+        "back afterwards. Use --synthetic N to profile a generated workforce instead of the "
+        "current data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="Period start (YYYY-MM-DD).")
+        parser.add_argument("--end", help="Period end (YYYY-MM-DD).")
+        parser.add_argument("--synthetic", type=int, default=0,
+                            help="Generate this many employees for the period, and delete them afterwards.")
+        parser.add_argument("--weeks", type=int, default=2, help="Weeks of synthetic time entries.")
+        parser.add_argument("--first-week", default="2001-01-01", help="Monday of the synthetic period.")
+        parser.add_argument("--prefix", default="PROF", help="employee_id prefix for synthetic data.")
+        parser.add_argument("--sharded", action="store_true", help="Profile the sharded (process pool) mode.")
+        parser.add_argument("--cprofile", metavar="FILE", help="Write cProfile stats here (open with pstats/snakeviz).")
+        parser.add_argument("--top", type=int, default=25, help="Functions to print from the cProfile report.")
+
+    def handle(self, *args, **opts):
+        if opts["synthetic"]:
+            start = date.fromisoformat(opts["first_week"])
+            end = start + timedelta(days=7 * opts["weeks"] - 1)
+            self.stdout.write(f"Generating {opts['synthetic']} synthetic employees...")
+            delete_synthetic(opts["prefix"])
+            generate_synthetic(opts["synthetic"], opts["weeks"], start, prefix=opts["prefix"])
+        elif opts["start"] and opts["end"]:
+            start, end = date.fromisoformat(opts["start"]), date.fromisoformat(opts["end"])
+        else:
+            raise CommandError("Give --start and --end, or --synthetic N.")
+
+        try:
+            run = self._profile(start, end, opts)
+        finally:
+            if opts["synthetic"]:
+                delete_synthetic(opts["prefix"])
+
+        profile = run.profile
+        self.stdout.write(
+            f"\n{run.employees_processed} employees paid, {run.employees_skipped} skipped, "
+            f"{profile['total_seconds']:.3f}s total\n"
+        )
+        self.stdout.write(f"{'phase':<18}{'seconds':>10}{'%':>7}{'calls':>8}{'queries':>9}{'query s':>10}")
+        for p in run.profile_rows():
+            self.stdout.write(
+                f"{p['name']:<18}{p['seconds']:>10.3f}{p['percent']:>7.1f}{p['calls']:>8}"
+                f"{p['queries']:>9}{p['query_seconds']:>10.3f}"
+            )
+        self.stdout.write(self.style.SUCCESS("Profile complete; the run was rolled back."))
+
+    def _profile(self, start, end, opts) -> PayrollRun:
+        """Run a payroll job for the period inside a transaction that is then rolled back."""
+        profiler = cProfile.Profile() if opts["cprofile"] else None
+        try:
+            with transaction.atomic():
+                run = PayrollRun.objects.create(period_start=start, period_end=end)
+                job = claim_job(PayrollJob.objects.create(payroll_run=run, sharded=opts["sharded"]).pk)
+                if profiler:
+                    profiler.enable()
+                try:
+                    execute_job(job)
+                finally:
+                    if profiler:
+                        profiler.disable()
+                if job.state != JobState.DONE:
+                    raise CommandError(f"Payroll job failed: {job.error}")
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        if profiler:
+            profiler.dump_stats(opts["cprofile"])
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(opts["top"])
+            self.stdout.write(out.getvalue())
+            self.stdout.write(f"cProfile stats written to {opts['cprofile']}")
+        # The in-memory run still carries the profile the job recorded.
+        return job.payroll_run
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from payroll.ytd import rebuild_ytd
+
+class Command(BaseCommand):
+    help = "Recreate the YearToDate ledger from the paychecks of locked payroll runs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int, help="Only rebuild this year (default: all years).")
+
+    def handle(self, *args, **opts):
+        t0 = time.perf_counter()
+        written = rebuild_ytd(opts["year"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written} year-to-date rows in {time.perf_counter() - t0:.1f}s."
+        ))
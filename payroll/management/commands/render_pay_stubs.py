@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payroll.models import PayrollRun
+from payroll.paystubs import render_run_stubs
+
+class Command(BaseCommand):
+    help = (
+        "Render a PDF pay stub for every paycheck of a locked payroll run into OUT_DIR/run-<id>/ "
+        "(or OUT_DIR/run-<id>.zip with --zip), across a process pool. Stubs whose content is "
+        "unchanged since the last render are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("run_id", type=int)
+        parser.add_argument("--out", default="paystubs", help="Output directory (default: ./paystubs).")
+        parser.add_argument("--zip", action="store_true", help="Write one ZIP per run instead of a directory.")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="Rendering processes (0 = render in this process).")
+        parser.add_argument("--force", action="store_true", help="Re-render stubs even if unchanged.")
+
+    def handle(self, *args, **opts):
+        run = PayrollRun.objects.filter(pk=opts["run_id"]).first()
+        if run is None:
+            raise CommandError(f"No payroll run {opts['run_id']}.")
+        try:
+            report = render_run_stubs(
+                run, opts["out"], as_zip=opts["zip"], workers=opts["workers"], force=opts["force"],
+                log=self.stdout.write,
+            )
+        except ValueError as ex:
+            raise CommandError(str(ex))
+        self.stdout.write(self.style.SUCCESS(
+            f"{report.rendered} stubs rendered ({report.bytes / 1024:.0f} KiB), {report.unchanged} unchanged, "
+            f"in {report.seconds:.1f}s ({report.per_second:.0f} stubs/s) -> {report.path}"
+        ))
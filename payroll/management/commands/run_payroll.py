@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payroll.jobs import JOB_CHUNK_SIZE, claim_job, execute_job, resume_job
+from payroll.models import JobState, PayrollJob, PayrollRun
+
+class Command(BaseCommand):
+    help = (
+        "Compute a payroll run from the command line, committing paychecks one chunk of "
+        "employees at a time. Each chunk records a checkpoint on the run, so a run that failed "
+        "or was killed can be continued with --resume RUN_ID."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="Period start (YYYY-MM-DD).")
+        parser.add_argument("--end", help="Period end (YYYY-MM-DD).")
+        parser.add_argument("--resume", type=int, metavar="RUN_ID",
+                            help="Continue this run after its checkpoint instead of starting a new one.")
+        parser.add_argument("--force", action="store_true",
+                            help="With --resume: take over a RUNNING job even though its heartbeat is recent.")
+        parser.add_argument("--chunk-size", type=int, default=JOB_CHUNK_SIZE,
+                            help=f"Employees per committed chunk (default {JOB_CHUNK_SIZE}).")
+        parser.add_argument("--draft", action="store_true", help="Leave time entries and the run unlocked.")
+
+    def handle(self, *args, **opts):
+        if opts["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+        if opts["resume"]:
+            run = PayrollRun.objects.filter(pk=opts["resume"]).first()
+            if run is None:
+                raise CommandError(f"No payroll run {opts['resume']}.")
+            try:
+                job = resume_job(run, force=opts["force"])
+            except (ValueError, PayrollJob.DoesNotExist) as ex:
+                raise CommandError(f"Can't resume run {run.pk}: {ex}")
+            self.stdout.write(
+                f"Resuming run {run.pk} ({run.period_start}..{run.period_end}) after "
+                f"{run.checkpoint_employee_id or 'the start'}; {job.processed} employees already done."
+            )
+        elif opts["start"] and opts["end"]:
+            start, end = date.fromisoformat(opts["start"]), date.fromisoformat(opts["end"])
+            if start > end:
+                raise CommandError("--start must not be after --end.")
+            run = PayrollRun.objects.create(period_start=start, period_end=end)
+            job = claim_job(PayrollJob.objects.create(payroll_run=run, draft=opts["draft"]).pk)
+            self.stdout.write(f"Run {run.pk} ({start}..{end}), {opts['chunk_size']} employees per chunk.")
+        else:
+            raise CommandError("Give --start and --end, or --resume RUN_ID.")
+
+        done_before = job.processed
+        t0 = time.perf_counter()
+
+        def on_progress(job):
+            elapsed = time.perf_counter() - t0
+            rate = (job.processed - done_before) / elapsed if elapsed else 0
+            self.stdout.write(
+                f"  {job.processed}/{job.total} employees ({job.percent}%), {job.skipped} skipped, "
+                f"checkpoint {job.payroll_run.checkpoint_employee_id}, {rate:.0f}/s"
+            )
+
+        try:
+            execute_job(job, chunk_size=opts["chunk_size"], on_progress=on_progress)
+        except KeyboardInterrupt:
+            raise CommandError(f"Interrupted. Continue with: manage.py run_payroll --resume {run.pk}")
+        elapsed = time.perf_counter() - t0
+        if job.state != JobState.DONE:
+            raise CommandError(f"Run {run.pk} failed: {job.error}\nContinue with: manage.py run_payroll --resume {run.pk}")
+
+        computed = job.processed - done_before
+        self.stdout.write(self.style.SUCCESS(
+            f"Run {run.pk} done: {job.processed - job.skipped} paid, {job.skipped} skipped; "
+            f"{computed} employees in {elapsed:.1f}s ({computed / elapsed if elapsed else 0:.0f} employees/s)."
+        ))
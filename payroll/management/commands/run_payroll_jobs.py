@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from payroll.jobs import claim_next_job, execute_job
+from payroll.models import JobState
+
+class Command(BaseCommand):
+    help = "Process queued payroll run jobs (use with PAYROLL_JOB_RUNNER=command)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain the queue and exit instead of polling.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds between polls when idle.")
+
+    def handle(self, *args, **opts):
+        self.stdout.write("Waiting for payroll jobs..." if not opts["once"] else "Draining payroll job queue...")
+        while True:
+            job = claim_next_job()
+            if job is None:
+                if opts["once"]:
+                    break
+                time.sleep(opts["interval"])
+                continue
+
+            run = job.payroll_run
+            self.stdout.write(f"Job {job.pk}: run {run.pk} ({run.period_start}..{run.period_end})")
+            execute_job(job)
+            if job.state == JobState.DONE:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Job {job.pk} done: {job.processed}/{job.total} employees, {job.skipped} skipped, {job.seconds:.1f}s"
+                ))
+            else:
+                self.stdout.write(self.style.ERROR(f"Job {job.pk} failed: {job.error}"))
+
+        self.stdout.write(self.style.SUCCESS("Done."))
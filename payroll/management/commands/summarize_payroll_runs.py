@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from payroll.models import PayrollRun
+from payroll.services import summarize_run
+
+class Command(BaseCommand):
+    help = "Write PayrollRunSummary rows for locked runs that don't have them (or for all locked runs)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Recompute summaries that already exist.")
+
+    def handle(self, *args, **opts):
+        # Archived runs have no paychecks left to summarize; their summaries stay as they are.
+        runs = PayrollRun.objects.filter(locked=True, archived_at__isnull=True)
+        if not opts["all"]:
+            runs = runs.filter(summaries__isnull=True)
+        done = 0
+        for run in runs.distinct().iterator():
+            rows = summarize_run(run)
+            done += 1
+            self.stdout.write(f"{run}: {rows[0].employees} paychecks, {len(rows) - 1} department/pay type groups")
+        self.stdout.write(self.style.SUCCESS(f"Summarized {done} payroll runs."))
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0003_employee_employee_name_idx'),
+        ('payroll', '0002_payrolljob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='paycheck',
+            index=models.Index(fields=['payroll_run', 'employee'], name='paycheck_run_employee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payrollrun',
+            index=models.Index(fields=['-calculated_at'], name='payrollrun_calculated_at_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0003_paycheck_paycheck_run_employee_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayrollRunSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('department', models.CharField(blank=True, default='', max_length=80)),
+                ('pay_type', models.CharField(blank=True, default='', max_length=10)),
+                ('employees', models.PositiveIntegerField(default=0)),
+                ('gross_pay', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('pretax_deductions', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('taxable_wages', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('state_tax_employee', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('federal_tax_employee', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('social_security_employee', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('medicare_employee', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('federal_tax_employer', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('social_security_employer', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('medicare_employer', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('net_pay', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('payroll_run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='summaries', to='payroll.payrollrun')),
+            ],
+            options={
+                'ordering': ['department', 'pay_type'],
+                'unique_together': {('payroll_run', 'department', 'pay_type')},
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:11
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0003_employee_employee_name_idx'),
+        ('payroll', '0004_payrollrunsummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payrolljob',
+            name='draft',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='payrollrun',
+            name='inputs_as_of',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='PayInputChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('work_date', models.DateField(blank=True, null=True)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pay_input_changes', to='employees.employee')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['changed_at'], name='payinputchange_changed_at_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of payroll.models.PAYCHECK_MONEY_FIELDS as of this migration.
+PAYCHECK_MONEY_FIELDS = (
+    "gross_pay", "pretax_deductions", "taxable_wages",
+    "state_tax_employee", "federal_tax_employee", "social_security_employee", "medicare_employee",
+    "federal_tax_employer", "social_security_employer", "medicare_employer",
+    "net_pay",
+)
+
+
+def backfill_ytd(apps, schema_editor):
+    Paycheck = apps.get_model("payroll", "Paycheck")
+    YearToDate = apps.get_model("payroll", "YearToDate")
+    ledger = {}
+    rows = (
+        Paycheck.objects.filter(payroll_run__locked=True).order_by()
+        .values_list("employee_id", "payroll_run__period_end", *PAYCHECK_MONEY_FIELDS)
+    )
+    for employee_id, period_end, *amounts in rows.iterator():
+        y = ledger.get((employee_id, period_end.year))
+        if y is None:
+            y = ledger[(employee_id, period_end.year)] = YearToDate(employee_id=employee_id, year=period_end.year)
+        y.paychecks += 1
+        for f, amount in zip(PAYCHECK_MONEY_FIELDS, amounts):
+            setattr(y, f, getattr(y, f) + amount)
+    YearToDate.objects.bulk_create(ledger.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0003_employee_employee_name_idx'),
+        ('payroll', '0005_payinputchange_draft_runs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='YearToDate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('paychecks', models.PositiveIntegerField(default=0)),
+                ('gross_pay', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('pretax_deductions', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('taxable_wages', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('state_tax_employee', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('federal_tax_employee', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('social_security_employee', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('medicare_employee', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('federal_tax_employer', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('social_security_employer', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('medicare_employer', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('net_pay', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ytd', to='employees.employee')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['year'], name='ytd_year_idx')],
+                'unique_together': {('employee', 'year')},
+            },
+        ),
+        migrations.RunPython(backfill_ytd, migrations.RunPython.noop),
+    ]
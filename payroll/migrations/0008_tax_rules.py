@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0007_run_profile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaxRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('STATE', 'State income tax'), ('FEDERAL', 'Federal income tax'), ('SOCIAL_SECURITY', 'Social Security'), ('MEDICARE', 'Medicare')], max_length=20)),
+                ('effective_from', models.DateField()),
+                ('wage_base', models.DecimalField(blank=True, decimal_places=2, help_text='Annual cap on taxable wages subject to this tax (e.g. the Social Security wage base). Blank = no cap.', max_digits=12, null=True)),
+                ('employer_matches', models.BooleanField(default=False, help_text='The employer pays the same amount again.')),
+            ],
+            options={
+                'ordering': ['kind', '-effective_from'],
+                'unique_together': {('kind', 'effective_from')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TaxBracket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lower_bound', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('rate', models.DecimalField(decimal_places=5, max_digits=7)),
+                ('rule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='brackets', to='payroll.taxrule')),
+            ],
+            options={
+                'ordering': ['lower_bound'],
+                'unique_together': {('rule', 'lower_bound')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0008_tax_rules'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payrollrun',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0009_run_archived_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payrollrun',
+            name='checkpoint_employee_id',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0010_run_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payrollrun',
+            name='tax_inputs_key',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:53
+
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def drop_duplicate_paychecks(apps, schema_editor):
+    # A run resumed while its job was still running could pay an employee
+    # twice; keep the first paycheck so the unique constraint can be added.
+    Paycheck = apps.get_model("payroll", "Paycheck")
+    earlier = Paycheck.objects.filter(
+        payroll_run=OuterRef("payroll_run"), employee=OuterRef("employee"), pk__lt=OuterRef("pk")
+    )
+    Paycheck.objects.filter(Exists(earlier)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0004_keyset_indexes'),
+        ('payroll', '0011_run_tax_inputs_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payrolljob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(drop_duplicate_paychecks, migrations.RunPython.noop),
+        # The unique constraint's index replaces the plain one on the same columns.
+        migrations.AddConstraint(
+            model_name='paycheck',
+            constraint=models.UniqueConstraint(fields=('payroll_run', 'employee'), name='paycheck_run_employee_uniq'),
+        ),
+        migrations.RemoveIndex(
+            model_name='paycheck',
+            name='paycheck_run_employee_idx',
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:56
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_department_pay_type(apps, schema_editor):
+    # Existing paychecks never recorded them; the employee's current values are
+    # the best there is.
+    Employee = apps.get_model("employees", "Employee")
+    Paycheck = apps.get_model("payroll", "Paycheck")
+    employee = Employee.objects.filter(pk=OuterRef("employee_id"))
+    Paycheck.objects.update(
+        department=Subquery(employee.values("department")[:1]),
+        pay_type=Subquery(employee.values("pay_type")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0004_keyset_indexes'),
+        ('payroll', '0012_paycheck_unique_job_heartbeat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paycheck',
+            name='department',
+            field=models.CharField(blank=True, default='', max_length=80),
+        ),
+        migrations.AddField(
+            model_name='paycheck',
+            name='pay_type',
+            field=models.CharField(blank=True, default='', max_length=10),
+        ),
+        migrations.RunPython(backfill_department_pay_type, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='paycheck',
+            index=models.Index(fields=['payroll_run', 'department'], name='paycheck_run_department_idx'),
+        ),
+    ]
@@ -6,10 +6,25 @@ Paycheck stores the results for an employee for that run.
 The assignment also requires showing taxes/deductions for both employee and employer.
 Those are stored separately to support reporting.
 
+PayrollJob tracks the background computation of a run (state + progress).
+
+PayInputChange is a journal of edits to pay inputs (time entries, salary
+profiles, employee records). A draft run only recomputes the employees that
+changed after its `inputs_as_of` (see payroll/recalculation.py).
+
+PayrollRunSummary holds a locked run's totals, computed once at lock time, so
+reports never have to re-aggregate paychecks.
+
+YearToDate is each employee's running total for a calendar year, updated as
+runs are locked (see payroll/ytd.py).
+
 """
 from __future__ import annotations
+from datetime import timedelta
+from django.conf import settings
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from employees.models import Employee
 
 User = get_user_model()
@@ -20,13 +35,64 @@ class PayrollRun(models.Model):
     calculated_at = models.DateTimeField(auto_now_add=True)
     calculated_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     locked = models.BooleanField(default=False)
+    # When pay inputs were last read for this run; later changes make employees dirty.
+    inputs_as_of = models.DateTimeField(null=True, blank=True)
+    # Fingerprint of the tax rules and year-to-date ledger the paychecks were
+    # computed against (recalculation.tax_inputs_key); a change makes everyone dirty.
+    tax_inputs_key = models.CharField(max_length=64, blank=True, default="")
+    # Filled in by the payroll job: employees paid and skipped, and per-phase
+    # timings and query counts (profiling.RunProfile.as_dict()).
+    employees_processed = models.PositiveIntegerField(default=0)
+    employees_skipped = models.PositiveIntegerField(default=0)
+    profile = models.JSONField(default=dict, blank=True)
+    # employee_id of the last employee whose chunk of paychecks is committed;
+    # a failed or killed job resumes after it (payroll/jobs.py).
+    checkpoint_employee_id = models.CharField(max_length=20, blank=True, default="")
+    # Set when the run's paychecks were moved to the cold archive (payroll/archive.py).
+    archived_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ["-calculated_at"]
+        indexes = [
+            models.Index(fields=["-calculated_at"], name="payrollrun_calculated_at_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"PayrollRun({self.period_start}..{self.period_end})"
 
+    @property
+    def is_draft(self) -> bool:
+        """Computed by a finished draft job and not locked yet."""
+        job = getattr(self, "job", None)
+        return bool(job and job.draft and job.state == JobState.DONE and not self.locked)
+
+    def profile_rows(self) -> list[dict]:
+        """Profile phases in recorded order, each with its share of the total time."""
+        total = self.profile.get("total_seconds") or 0
+        return [
+            {"name": name, **stats, "percent": 100 * stats["seconds"] / total if total else 0}
+            for name, stats in self.profile.get("phases", {}).items()
+        ]
+
+    @property
+    def summary(self):
+        """Whole-run PayrollRunSummary, or None if the run hasn't been summarized.
+
+        List views prefetch it into `overall_summary` (see services.with_summary).
+        """
+        rows = getattr(self, "overall_summary", None)
+        if rows is None:
+            rows = list(self.summaries.filter(department="", pay_type=""))
+        return rows[0] if rows else None
+
+# Paycheck amount columns, in display order.
+PAYCHECK_MONEY_FIELDS = (
+    "gross_pay", "pretax_deductions", "taxable_wages",
+    "state_tax_employee", "federal_tax_employee", "social_security_employee", "medicare_employee",
+    "federal_tax_employer", "social_security_employer", "medicare_employer",
+    "net_pay",
+)
+
 class Paycheck(models.Model):
     payroll_run = models.ForeignKey(PayrollRun, on_delete=models.CASCADE, related_name="paychecks")
     employee = models.ForeignKey(Employee, on_delete=models.PROTECT)
@@ -48,5 +114,213 @@ class Paycheck(models.Model):
 
     net_pay = models.DecimalField(max_digits=12, decimal_places=2, default=0)
 
+    # The employee's department and pay type when the paycheck was computed.
+    # Run pages filter and total by these, so a later transfer doesn't move
+    # pay between departments of a past run.
+    department = models.CharField(max_length=80, blank=True, default="")
+    pay_type = models.CharField(max_length=10, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["payroll_run", "department"], name="paycheck_run_department_idx"),
+        ]
+        constraints = [
+            # One paycheck per employee per run; also the index for paychecks of
+            # one run joined to (or filtered by) employee.
+            models.UniqueConstraint(fields=["payroll_run", "employee"], name="paycheck_run_employee_uniq"),
+        ]
+
     def __str__(self) -> str:
         return f"Paycheck({self.employee.employee_id} {self.payroll_run_id})"
+
+class JobState(models.TextChoices):
+    QUEUED = "QUEUED", "Queued"
+    RUNNING = "RUNNING", "Running"
+    DONE = "DONE", "Done"
+    FAILED = "FAILED", "Failed"
+
+class PayrollJob(models.Model):
+    """Background computation of a PayrollRun (see payroll/jobs.py)."""
+    payroll_run = models.OneToOneField(PayrollRun, on_delete=models.CASCADE, related_name="job")
+    state = models.CharField(max_length=10, choices=JobState.choices, default=JobState.QUEUED)
+    sharded = models.BooleanField(default=False)
+    # Draft runs leave time entries editable and the run unlocked until HR locks it.
+    draft = models.BooleanField(default=False)
+
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    skipped_detail = models.TextField(blank=True, default="")
+    error = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Touched by the worker with every committed chunk or shard; a RUNNING job
+    # whose heartbeat is older than PAYROLL_JOB_STALE_AFTER lost its worker.
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+
+    @property
+    def is_active(self) -> bool:
+        return self.state in (JobState.QUEUED, JobState.RUNNING)
+
+    @property
+    def is_stale(self) -> bool:
+        """RUNNING, but no progress committed for PAYROLL_JOB_STALE_AFTER seconds."""
+        last = self.heartbeat_at or self.started_at
+        if self.state != JobState.RUNNING or last is None:
+            return False
+        return timezone.now() - last > timedelta(seconds=settings.PAYROLL_JOB_STALE_AFTER)
+
+    @property
+    def percent(self) -> int:
+        if not self.total:
+            return 100 if self.state == JobState.DONE else 0
+        return int(100 * self.processed / self.total)
+
+    @property
+    def seconds(self) -> float | None:
+        if not self.started_at:
+            return None
+        end = self.finished_at or timezone.now()
+        return (end - self.started_at).total_seconds()
+
+    def __str__(self) -> str:
+        return f"PayrollJob({self.payroll_run_id} {self.state})"
+
+class PayInputChange(models.Model):
+    """An employee's pay inputs changed.
+
+    `work_date` is the day of a changed time entry; it is null for changes that
+    affect every period (salary profile, status, pay type, department).
+    """
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="pay_input_changes")
+    work_date = models.DateField(null=True, blank=True)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["changed_at"], name="payinputchange_changed_at_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"PayInputChange({self.employee_id} {self.work_date or '*'} {self.changed_at})"
+
+class PayrollRunSummary(models.Model):
+    """Totals of a locked run's paychecks.
+
+    One row per (department, pay type) present in the run, plus an overall row
+    where both are blank. Written by services.summarize_run.
+    """
+    payroll_run = models.ForeignKey(PayrollRun, on_delete=models.CASCADE, related_name="summaries")
+    department = models.CharField(max_length=80, blank=True, default="")
+    pay_type = models.CharField(max_length=10, blank=True, default="")
+
+    employees = models.PositiveIntegerField(default=0)
+
+    gross_pay = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    pretax_deductions = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    taxable_wages = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    state_tax_employee = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    federal_tax_employee = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    social_security_employee = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    medicare_employee = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    federal_tax_employer = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    social_security_employer = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    medicare_employer = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    net_pay = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ("payroll_run", "department", "pay_type")
+        ordering = ["department", "pay_type"]
+
+    @property
+    def is_overall(self) -> bool:
+        return not self.department and not self.pay_type
+
+    def totals(self) -> dict:
+        """Same shape as services.paycheck_totals."""
+        return {"employees": self.employees, **{f: getattr(self, f) for f in PAYCHECK_MONEY_FIELDS}}
+
+    def __str__(self) -> str:
+        return f"PayrollRunSummary({self.payroll_run_id} {self.department or '*'} {self.pay_type or '*'})"
+
+class YearToDate(models.Model):
+    """Cumulative paycheck amounts of one employee for one year.
+
+    A run counts toward the year its period ends in. Updated incrementally
+    when a run is locked; `python manage.py rebuild_ytd` recreates it.
+    """
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="ytd")
+    year = models.PositiveSmallIntegerField()
+    paychecks = models.PositiveIntegerField(default=0)
+
+    gross_pay = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    pretax_deductions = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    taxable_wages = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    state_tax_employee = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    federal_tax_employee = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    social_security_employee = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    medicare_employee = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    federal_tax_employer = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    social_security_employer = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    medicare_employer = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    net_pay = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ("employee", "year")
+        indexes = [
+            models.Index(fields=["year"], name="ytd_year_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"YearToDate({self.employee_id} {self.year})"
+
+class TaxKind(models.TextChoices):
+    STATE = "STATE", "State income tax"
+    FEDERAL = "FEDERAL", "Federal income tax"
+    SOCIAL_SECURITY = "SOCIAL_SECURITY", "Social Security"
+    MEDICARE = "MEDICARE", "Medicare"
+
+class TaxRule(models.Model):
+    """One tax as in effect from `effective_from` until the next rule of the same kind.
+
+    The rates are the rule's brackets. A kind with no rule in effect uses the
+    built-in rate (see payroll/taxes.py).
+    """
+    kind = models.CharField(max_length=20, choices=TaxKind.choices)
+    effective_from = models.DateField()
+    wage_base = models.DecimalField(
+        max_digits=12, decimal_places=2, null=True, blank=True,
+        help_text="Annual cap on taxable wages subject to this tax (e.g. the Social Security wage base). Blank = no cap.",
+    )
+    employer_matches = models.BooleanField(default=False, help_text="The employer pays the same amount again.")
+
+    class Meta:
+        unique_together = ("kind", "effective_from")
+        ordering = ["kind", "-effective_from"]
+
+    def __str__(self) -> str:
+        return f"{self.get_kind_display()} from {self.effective_from}"
+
+class TaxBracket(models.Model):
+    """`rate` applies to the part of a pay period's taxable wages above `lower_bound`."""
+    rule = models.ForeignKey(TaxRule, on_delete=models.CASCADE, related_name="brackets")
+    lower_bound = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    rate = models.DecimalField(max_digits=7, decimal_places=5)
+
+    class Meta:
+        unique_together = ("rule", "lower_bound")
+        ordering = ["lower_bound"]
+
+    def __str__(self) -> str:
+        return f"{self.rate} over {self.lower_bound}"
@@ -0,0 +1,139 @@
+"""Pay stub PDF renderer.
+
+A minimal, dependency-free PDF 1.4 writer: one Letter page, the standard
+Helvetica fonts (no embedding) and a Flate-compressed content stream. Output
+is deterministic (no timestamps or IDs), so identical stub data always gives
+identical bytes.
+
+This module does not touch Django, so process-pool workers only need to import
+it, not set up the app registry. payroll/paystubs.py loads the data and runs
+the batch.
+"""
+from __future__ import annotations
+
+import hashlib
+import zlib
+from dataclasses import dataclass
+from decimal import Decimal
+
+# Bump when the layout changes so existing stubs are re-rendered.
+RENDERER_VERSION = "1"
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+LEFT, RIGHT = 50, 562
+
+@dataclass(frozen=True)
+class StubData:
+    company: str
+    run_id: int
+    period_start: str
+    period_end: str
+    employee_id: str
+    name: str
+    department: str
+    pay_type: str
+    # (label, this period, year to date)
+    rows: tuple[tuple[str, Decimal, Decimal], ...]
+    employer_rows: tuple[tuple[str, Decimal, Decimal], ...]
+
+    @property
+    def filename(self) -> str:
+        return f"{self.employee_id}.pdf"
+
+    def content_hash(self) -> str:
+        """Hash of everything that goes on the stub (and the layout version)."""
+        return hashlib.sha256(f"{RENDERER_VERSION}|{self!r}".encode()).hexdigest()
+
+# Helvetica advance widths (1/1000 em) for the characters in amounts; others
+# are approximated. Only used to right-align numbers.
+_WIDTHS = {**{d: 556 for d in "0123456789"}, ",": 278, ".": 278, "-": 333, " ": 278, "$": 556}
+
+def _text_width(text: str, size: float) -> float:
+    return sum(_WIDTHS.get(ch, 556) for ch in text) * size / 1000
+
+def _escape(text: str) -> bytes:
+    raw = text.encode("cp1252", errors="replace")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+class _Page:
+    def __init__(self):
+        self.ops: list[bytes] = []
+
+    def text(self, x: float, y: float, text: str, size: float = 10, bold: bool = False, align: str = "left"):
+        if align == "right":
+            x -= _text_width(text, size)
+        font = b"F2" if bold else b"F1"
+        self.ops.append(b"BT /%s %g Tf %g %g Td (%s) Tj ET" % (font, size, x, y, _escape(text)))
+
+    def rule(self, y: float, width: float = 0.5):
+        self.ops.append(b"%g w %d %g m %d %g l S" % (width, LEFT, y, RIGHT, y))
+
+    def pdf(self) -> bytes:
+        stream = zlib.compress(b"\n".join(self.ops), 6)
+        objects = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 4 0 R /F2 5 0 R >> >> /Contents 6 0 R >>" % (PAGE_WIDTH, PAGE_HEIGHT),
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+            b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(stream), stream),
+        ]
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+        xref = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        for offset in offsets:
+            out += b"%010d 00000 n \n" % offset
+        out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+        return bytes(out)
+
+def _money(value: Decimal) -> str:
+    return f"{value:,.2f}"
+
+def render_stub(stub: StubData) -> bytes:
+    page = _Page()
+    y = 742
+    page.text(LEFT, y, stub.company, size=16, bold=True)
+    page.text(RIGHT, y, "Pay Stub", size=16, bold=True, align="right")
+    y -= 22
+    page.text(LEFT, y, f"Pay period {stub.period_start} to {stub.period_end}")
+    page.text(RIGHT, y, f"Payroll run {stub.run_id}", align="right")
+    y -= 10
+    page.rule(y, 1)
+
+    y -= 24
+    page.text(LEFT, y, stub.name, size=12, bold=True)
+    y -= 16
+    page.text(LEFT, y, f"Employee ID {stub.employee_id}")
+    y -= 14
+    page.text(LEFT, y, f"{stub.department} - {stub.pay_type.title()}")
+
+    def table(y: float, title: str, rows, bold_last: bool) -> float:
+        page.text(LEFT, y, title, bold=True)
+        page.text(420, y, "This period", bold=True, align="right")
+        page.text(RIGHT, y, "Year to date", bold=True, align="right")
+        y -= 6
+        page.rule(y)
+        for i, (label, current, ytd) in enumerate(rows):
+            y -= 16
+            bold = bold_last and i == len(rows) - 1
+            if bold:
+                page.rule(y + 12)
+            page.text(LEFT, y, label, bold=bold)
+            page.text(420, y, _money(current), bold=bold, align="right")
+            page.text(RIGHT, y, _money(ytd), bold=bold, align="right")
+        return y
+
+    y = table(y - 36, "Earnings, deductions and taxes", stub.rows, bold_last=True)
+    y = table(y - 36, "Employer taxes (not deducted)", stub.employer_rows, bold_last=False)
+
+    page.text(LEFT, 60, f"Year to date covers locked payroll runs through {stub.period_end}.", size=8)
+    return page.pdf()
+
+def render_batch(stubs: list[StubData]) -> list[tuple[str, str, bytes]]:
+    """[(filename, content hash, pdf bytes)]. Module-level so a process pool can call it."""
+    return [(s.filename, s.content_hash(), render_stub(s)) for s in stubs]
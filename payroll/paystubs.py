@@ -0,0 +1,268 @@
+"""Pay stubs for every paycheck of a locked run, rendered across a process pool.
+
+Paychecks are read in chunks together with each employee's year-to-date
+figures: from the YearToDate ledger when this is the newest locked run of its
+year, otherwise summed from the paychecks of locked runs up to this one
+(archived runs included), so a reprinted stub shows the same totals as the
+original. Each chunk becomes StubData batches for the pool; finished PDFs are
+written as they arrive, with a bounded number of batches in flight, so memory
+stays flat.
+
+Output is either a directory (`run-<id>/<employee_id>.pdf`) or a ZIP
+(`run-<id>.zip`). Both carry a `manifest.json` of content hashes. A stub whose
+hash is unchanged is not rendered again: in a directory it is left alone, and
+in a ZIP it is copied from the previous archive.
+"""
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db.models import Q, Sum
+
+from .archive import ArchivedPaychecks, archived_totals
+from .models import PAYCHECK_MONEY_FIELDS, Paycheck, PayrollRun
+from .paystub_pdf import StubData, render_batch
+from .services import money
+from .ytd import pay_year, ytd_many
+
+STUB_CHUNK_SIZE = 500
+STUB_BATCH_SIZE = 50
+MANIFEST = "manifest.json"
+
+STUB_ROWS = (
+    ("Gross pay", "gross_pay"),
+    ("Pretax deductions", "pretax_deductions"),
+    ("Taxable wages", "taxable_wages"),
+    ("State income tax", "state_tax_employee"),
+    ("Federal income tax", "federal_tax_employee"),
+    ("Social Security", "social_security_employee"),
+    ("Medicare", "medicare_employee"),
+    ("Net pay", "net_pay"),
+)
+EMPLOYER_ROWS = (
+    ("Federal", "federal_tax_employer"),
+    ("Social Security", "social_security_employer"),
+    ("Medicare", "medicare_employer"),
+)
+
+@dataclass
+class StubReport:
+    rendered: int = 0
+    unchanged: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    path: str = ""
+
+    @property
+    def per_second(self) -> float:
+        return self.rendered / self.seconds if self.seconds else 0.0
+
+def _runs_through(run: PayrollRun):
+    """Locked runs of the same pay year up to and including `run`."""
+    year = pay_year(run)
+    return PayrollRun.objects.filter(locked=True, period_end__year=year).filter(
+        Q(period_end__lt=run.period_end) | Q(period_end=run.period_end, pk__lte=run.pk)
+    )
+
+def ledger_is_current(run: PayrollRun) -> bool:
+    """True when no locked run of the same year comes after `run`, so the ledger is its YTD."""
+    return not PayrollRun.objects.filter(locked=True, period_end__year=pay_year(run)).exclude(
+        pk__in=_runs_through(run).values("pk")
+    ).exists()
+
+def ytd_through(run: PayrollRun, employee_ids, ledger_current: bool | None = None) -> dict[int, dict]:
+    """{employee pk: {money field: year to date through `run`}} with one query."""
+    employee_ids = list(employee_ids)
+    year = pay_year(run)
+    if ledger_current is None:
+        ledger_current = ledger_is_current(run)
+    if ledger_current:
+        return {
+            e: {f: getattr(y, f) for f in PAYCHECK_MONEY_FIELDS}
+            for e, y in ytd_many(employee_ids, year).items()
+        }
+    runs = _runs_through(run)
+    rows = (
+        Paycheck.objects.filter(payroll_run__in=runs, employee_id__in=employee_ids)
+        .values("employee_id")
+        .annotate(**{f: Sum(f) for f in PAYCHECK_MONEY_FIELDS})
+    )
+    ytd = {r["employee_id"]: {f: money(r[f]) for f in PAYCHECK_MONEY_FIELDS} for r in rows}
+    for e, archived in archived_totals(runs, employee_ids).items():
+        hot = ytd.get(e)
+        ytd[e] = {f: archived[f] + hot[f] if hot else archived[f] for f in PAYCHECK_MONEY_FIELDS}
+    return ytd
+
+def _stub(run: PayrollRun, paycheck: Paycheck, ytd: dict) -> StubData:
+    emp = paycheck.employee
+    return StubData(
+        company=getattr(settings, "PAYSTUB_COMPANY_NAME", "ABC Company"),
+        run_id=run.pk,
+        period_start=run.period_start.isoformat(),
+        period_end=run.period_end.isoformat(),
+        employee_id=emp.employee_id,
+        name=f"{emp.first_name} {emp.last_name}",
+        # As paid, not the employee's current record, so reprints don't change.
+        department=paycheck.department,
+        pay_type=paycheck.pay_type,
+        rows=tuple((label, getattr(paycheck, f), ytd[f]) for label, f in STUB_ROWS),
+        employer_rows=tuple((label, getattr(paycheck, f), ytd[f]) for label, f in EMPLOYER_ROWS),
+    )
+
+def _paycheck_chunks(run: PayrollRun, chunk_size: int):
+    if run.archived_at:
+        archived = ArchivedPaychecks(run)
+        for start in range(0, len(archived), chunk_size):
+            yield archived[start:start + chunk_size]
+        return
+    qs = run.paychecks.select_related("employee").order_by("pk")
+    last_pk = 0
+    while True:
+        paychecks = list(qs.filter(pk__gt=last_pk)[:chunk_size])
+        if not paychecks:
+            return
+        last_pk = paychecks[-1].pk
+        yield paychecks
+
+def iter_stub_chunks(run: PayrollRun, chunk_size: int = STUB_CHUNK_SIZE):
+    """Yield lists of StubData for the run's paychecks, in pk order (two queries per chunk)."""
+    ledger_current = ledger_is_current(run)
+    for paychecks in _paycheck_chunks(run, chunk_size):
+        ytd = ytd_through(run, [p.employee_id for p in paychecks], ledger_current)
+        yield [_stub(run, p, ytd[p.employee_id]) for p in paychecks]
+
+def stub_for_paycheck(paycheck: Paycheck) -> StubData:
+    run = paycheck.payroll_run
+    return _stub(run, paycheck, ytd_through(run, [paycheck.employee_id])[paycheck.employee_id])
+
+class _DirectoryOutput:
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.manifest = {}
+        manifest_path = os.path.join(path, MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as fh:
+                self.manifest = json.load(fh)
+        self._previous = dict(self.manifest)
+
+    def reuse(self, filename: str, digest: str) -> bool:
+        return self._previous.get(filename) == digest and os.path.exists(os.path.join(self.path, filename))
+
+    def write(self, filename: str, digest: str, data: bytes) -> None:
+        tmp = os.path.join(self.path, f".{filename}.tmp")
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, os.path.join(self.path, filename))
+        self.manifest[filename] = digest
+
+    def close(self) -> None:
+        with open(os.path.join(self.path, MANIFEST), "w", encoding="utf-8") as fh:
+            json.dump(self.manifest, fh, indent=0, sort_keys=True)
+
+    def abort(self) -> None:
+        # Files written so far are complete; record them so a rerun skips them.
+        self.close()
+
+class _ZipOutput:
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._old = None
+        self._previous = {}
+        if os.path.exists(path):
+            self._old = zipfile.ZipFile(path)
+            if MANIFEST in self._old.namelist():
+                self._previous = json.loads(self._old.read(MANIFEST))
+        # PDFs are already compressed; store them as-is.
+        self._zip = zipfile.ZipFile(self.tmp_path, "w", compression=zipfile.ZIP_STORED)
+        self.manifest = {}
+
+    def reuse(self, filename: str, digest: str) -> bool:
+        if self._previous.get(filename) != digest:
+            return False
+        self._zip.writestr(filename, self._old.read(filename))
+        self.manifest[filename] = digest
+        return True
+
+    def write(self, filename: str, digest: str, data: bytes) -> None:
+        self._zip.writestr(filename, data)
+        self.manifest[filename] = digest
+
+    def close(self) -> None:
+        self._zip.writestr(MANIFEST, json.dumps(self.manifest, indent=0, sort_keys=True))
+        self._zip.close()
+        if self._old:
+            self._old.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self) -> None:
+        self._zip.close()
+        if self._old:
+            self._old.close()
+        os.remove(self.tmp_path)
+
+def render_run_stubs(
+    run: PayrollRun,
+    out_dir: str,
+    as_zip: bool = False,
+    workers: int = 0,
+    force: bool = False,
+    log=None,
+) -> StubReport:
+    """Render a stub for every paycheck of the (locked) run into `out_dir`.
+
+    `workers` > 0 renders in a process pool of that size; 0 renders in-process.
+    `force` re-renders stubs whose content hash is unchanged.
+    """
+    if not run.locked:
+        raise ValueError("Pay stubs are only issued for locked payroll runs.")
+    name = f"run-{run.pk}"
+    output = _ZipOutput(os.path.join(out_dir, f"{name}.zip")) if as_zip else _DirectoryOutput(os.path.join(out_dir, name))
+    report = StubReport(path=output.path)
+    t0 = time.perf_counter()
+
+    def batches():
+        for chunk in iter_stub_chunks(run):
+            todo = [s for s in chunk if force or not output.reuse(s.filename, s.content_hash())]
+            report.unchanged += len(chunk) - len(todo)
+            for i in range(0, len(todo), STUB_BATCH_SIZE):
+                yield todo[i:i + STUB_BATCH_SIZE]
+
+    def write(results):
+        for filename, digest, data in results:
+            output.write(filename, digest, data)
+            report.rendered += 1
+            report.bytes += len(data)
+        if log:
+            log(f"  {report.rendered} rendered, {report.unchanged} unchanged")
+
+    try:
+        if workers > 0:
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                pending = deque()
+                for batch in batches():
+                    pending.append(pool.submit(render_batch, batch))
+                    if len(pending) >= 2 * workers:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+        else:
+            for batch in batches():
+                write(render_batch(batch))
+    except BaseException:
+        output.abort()
+        raise
+    output.close()
+    report.seconds = time.perf_counter() - t0
+    return report
@@ -0,0 +1,84 @@
+"""Lightweight timing and query-count instrumentation."""
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager, nullcontext
+
+from django.db import connection
+
+class QueryCounter:
+    """Count queries (and time spent in them) on the default connection.
+
+    Uses a connection execute_wrapper, so unlike CaptureQueriesContext it does
+    not keep SQL text around and works with DEBUG off.
+
+        with QueryCounter() as qc:
+            ...
+        qc.count, qc.seconds
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self._cm = None
+
+    def __call__(self, execute, sql, params, many, context):
+        t0 = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - t0
+            self.count += 1
+
+    def __enter__(self):
+        self._cm = connection.execute_wrapper(self)
+        self._cm.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._cm.__exit__(*exc)
+
+class RunProfile:
+    """Wall-clock time and database queries per named phase.
+
+        profile = RunProfile()
+        with profile.phase("hours"):
+            ...
+        profile.as_dict()  # JSON-serialisable, stored on PayrollRun.profile
+
+    A phase can be entered many times (once per chunk); its numbers add up.
+    Phases should not be nested, or the inner one's queries count twice.
+    """
+
+    def __init__(self):
+        self.phases: dict[str, dict] = {}
+        # Extra JSON-serialisable facts about the run (e.g. "shards"), stored alongside.
+        self.extra: dict = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        stats = self.phases.setdefault(name, {"seconds": 0.0, "queries": 0, "query_seconds": 0.0, "calls": 0})
+        t0 = time.perf_counter()
+        with QueryCounter() as qc:
+            try:
+                yield
+            finally:
+                stats["seconds"] += time.perf_counter() - t0
+                stats["queries"] += qc.count
+                stats["query_seconds"] += qc.seconds
+                stats["calls"] += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "total_seconds": round(time.perf_counter() - self._started, 4),
+            "phases": {
+                name: {k: round(v, 4) if isinstance(v, float) else v for k, v in stats.items()}
+                for name, stats in self.phases.items()
+            },
+            **self.extra,
+        }
+
+def phase(profile: RunProfile | None, name: str):
+    """profile.phase(name), or a no-op when there is no profile."""
+    return profile.phase(name) if profile is not None else nullcontext()
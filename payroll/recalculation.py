@@ -0,0 +1,121 @@
+"""Incremental recalculation of draft payroll runs.
+
+Every edit to a pay input is journaled as a PayInputChange (see
+payroll/signals.py; bulk writers call `record_pay_input_changes` themselves).
+A draft run remembers when it last read its inputs (`inputs_as_of`), so the
+employees whose paychecks may be stale are exactly those with a journal entry
+after that time that touches the run's period.
+
+`recalculate_run` recomputes and replaces only those employees' paychecks, so
+a late correction costs work proportional to the number of changes rather
+than to headcount. `finalize_run` brings a draft up to date and locks it.
+Journal rows no unlocked run can still need (older than the oldest unlocked
+run's `inputs_as_of`) are deleted by `prune_pay_input_changes`, which runs
+after every recalculation, lock and finished job.
+
+Taxes also depend on inputs that aren't journaled per employee: the tax rules
+in effect for the period and, when a tax has an annual wage base, the
+year-to-date ledger, which moves whenever another run of the year is locked.
+A run stores a fingerprint of both (`tax_inputs_key`) when it reads its
+inputs; if the fingerprint no longer matches, every employee is dirty.
+"""
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from employees.models import Employee, EmployeeStatus
+from .models import PayInputChange, PayrollRun
+from .services import ENTRY_FILTER_MAX_IDS, compute_payroll_batch, lock_period_entries, lock_run, write_paychecks
+from .taxes import clear_tax_tables, tax_table_for
+from .ytd import pay_year
+
+@dataclass
+class RecalcResult:
+    employees: int = 0      # dirty employees looked at
+    written: int = 0        # paychecks (re)written
+    deleted: int = 0        # old paychecks of dirty employees
+    skipped: list[tuple[Employee, str]] | None = None
+
+def record_pay_input_changes(changes) -> int:
+    """Journal (employee pk, work_date or None) pairs in one bulk insert."""
+    now = timezone.now()
+    rows = [PayInputChange(employee_id=e, work_date=d, changed_at=now) for e, d in set(changes)]
+    PayInputChange.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+def tax_inputs_key(run: PayrollRun) -> str:
+    """Fingerprint of the tax rules for `run`'s period and, if a tax has a wage
+    base, of which other runs of its pay year are locked into the YTD ledger."""
+    table = tax_table_for(run.period_end)
+    parts = [repr(table)]
+    if table.has_wage_base:
+        locked = (
+            PayrollRun.objects.filter(locked=True, period_end__year=pay_year(run))
+            .exclude(pk=run.pk).order_by("pk").values_list("pk", flat=True)
+        )
+        parts.append(",".join(map(str, locked)))
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+def prune_pay_input_changes() -> int:
+    """Delete journal rows older than every unlocked run's inputs. Returns rows deleted.
+
+    Runs that haven't read their inputs yet treat every employee as dirty, so
+    they need no journal at all.
+    """
+    oldest = PayrollRun.objects.filter(locked=False).aggregate(oldest=Min("inputs_as_of"))["oldest"]
+    return PayInputChange.objects.filter(changed_at__lte=oldest or timezone.now()).delete()[0]
+
+def dirty_employee_ids(run: PayrollRun) -> set[int]:
+    """Employees with input changes affecting `run`'s period since it was computed."""
+    if run.inputs_as_of is None or run.tax_inputs_key != tax_inputs_key(run):
+        # Never computed, or computed with other rates or YTD wages: everything
+        # is dirty; callers should do a full run.
+        return set(Employee.objects.values_list("pk", flat=True))
+    return set(
+        PayInputChange.objects.filter(changed_at__gt=run.inputs_as_of)
+        .filter(Q(work_date__isnull=True) | Q(work_date__gte=run.period_start, work_date__lte=run.period_end))
+        .values_list("employee_id", flat=True)
+        .distinct()
+    )
+
+def recalculate_run(run: PayrollRun) -> RecalcResult:
+    """Replace the paychecks of dirty employees in a draft run."""
+    if run.locked:
+        raise ValueError("Locked payroll runs can't be recalculated.")
+
+    # Read the clock before the inputs: anything changed from here on is
+    # picked up by the next recalculation.
+    as_of = timezone.now()
+    clear_tax_tables()
+    key = tax_inputs_key(run)
+    dirty = sorted(dirty_employee_ids(run))
+    result = RecalcResult(employees=len(dirty), skipped=[])
+
+    with transaction.atomic():
+        for i in range(0, len(dirty), ENTRY_FILTER_MAX_IDS):
+            ids = dirty[i:i + ENTRY_FILTER_MAX_IDS]
+            result.deleted += run.paychecks.filter(employee_id__in=ids).delete()[0]
+            active = Employee.objects.filter(pk__in=ids, status=EmployeeStatus.ACTIVE).select_related("salary_profile")
+            batch = compute_payroll_batch(active, run.period_start, run.period_end)
+            result.written += write_paychecks(run, batch.breakdowns)
+            result.skipped.extend(batch.skipped)
+        run.inputs_as_of = as_of
+        run.tax_inputs_key = key
+        run.save(update_fields=["inputs_as_of", "tax_inputs_key"])
+    prune_pay_input_changes()
+    return result
+
+def finalize_run(run: PayrollRun) -> RecalcResult:
+    """Recalculate a draft one last time, lock its time entries and lock the run."""
+    with transaction.atomic():
+        # Lock entries first so nothing can change between the recalculation and the lock.
+        lock_period_entries(run.period_start, run.period_end)
+        result = recalculate_run(run)
+        lock_run(run)
+    prune_pay_input_changes()
+    return result
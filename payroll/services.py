@@ -14,15 +14,16 @@ from dataclasses import dataclass
 from datetime import date, timedelta
 from decimal import Decimal, ROUND_HALF_UP
 
-from employees.models import Employee, PayType
-from timeentry.models import TimeEntry
-
-# Rates from prompt
-STATE_TAX_IN = Decimal("0.0315")
+from django.db import transaction
+from django.db.models import Count, Prefetch, Sum
 
-FEDERAL_TAX = Decimal("0.0765")  # as specified in prompt
-SOCIAL_SECURITY = Decimal("0.062")
-MEDICARE = Decimal("0.0145")
+from employees.models import Employee, EmployeeStatus, PayType
+from timeentry.models import TimeEntry
+from timeentry.rollup import is_whole_weeks, period_hours, split_day_hours
+from .models import PAYCHECK_MONEY_FIELDS, PayrollRun, PayrollRunSummary, Paycheck
+from .profiling import RunProfile, phase
+from .taxes import DEFAULT_TAX_TABLE, TaxTable, tax_table_for
+from .ytd import apply_run_to_ytd, ytd_for, ytd_many
 
 OVERTIME_MULTIPLIER = Decimal("1.5")
 
@@ -43,59 +44,67 @@ class PayrollBreakdown:
     med_er: Decimal
     net: Decimal
 
-def _is_saturday(d: date) -> bool:
-    return d.weekday() == 5  # Mon=0 ... Sat=5
+def _hours_from_entries(pay_type: str, by_day: dict, period_start: date, period_end: date):
+    """Apply the day-by-day hour rules to pre-loaded entries.
 
-def compute_weekly_hours(employee: Employee, period_start: date, period_end: date):
-    """Return (regular_hours, overtime_hours, pto_hours).
-
-    Overtime rules:
-    - > 8 hours in a day is overtime
-    - any hours on Saturday are overtime
+    `by_day` maps work_date -> (hours_worked, pto_hours). Shared by the
+    per-employee and batch paths so both produce identical results.
     """
     regular = Decimal("0")
     overtime = Decimal("0")
     pto = Decimal("0")
 
-    entries = TimeEntry.objects.filter(employee=employee, work_date__gte=period_start, work_date__lte=period_end)
-    by_day = {e.work_date: e for e in entries}
-
     # iterate day-by-day to allow salary auto-pay rules
     d = period_start
     while d <= period_end:
         e = by_day.get(d)
-        if employee.pay_type == PayType.SALARY:
+        if pay_type == PayType.SALARY:
             # Salary employees are paid 8 hours Mon-Fri automatically (conceptually),
             # and PTO is tracked separately for reporting.
             if d.weekday() < 5:  # Mon-Fri
                 regular += Decimal("8")
             if e:
-                pto += e.pto_hours
+                pto += e[1]
         else:
             if e:
-                pto += e.pto_hours
-                hrs = e.hours_worked
-                if _is_saturday(d):
-                    overtime += hrs
-                else:
-                    if hrs > 8:
-                        regular += Decimal("8")
-                        overtime += (hrs - Decimal("8"))
-                    else:
-                        regular += hrs
+                hrs, pto_hrs = e
+                pto += pto_hrs
+                day_regular, day_overtime = split_day_hours(d, hrs)
+                regular += day_regular
+                overtime += day_overtime
         d += timedelta(days=1)
 
     return regular, overtime, pto
 
-def compute_payroll_for_employee(employee: Employee, period_start: date, period_end: date) -> PayrollBreakdown:
-    """Compute gross/net/taxes for one employee for the given period."""
+def compute_weekly_hours(employee: Employee, period_start: date, period_end: date):
+    """Return (regular_hours, overtime_hours, pto_hours).
+
+    Overtime rules:
+    - > 8 hours in a day is overtime
+    - any hours on Saturday are overtime
+    """
+    entries = TimeEntry.objects.filter(employee=employee, work_date__gte=period_start, work_date__lte=period_end)
+    by_day = {e.work_date: (e.hours_worked, e.pto_hours) for e in entries}
+    return _hours_from_entries(employee.pay_type, by_day, period_start, period_end)
+
+def compute_breakdown(
+    employee: Employee,
+    regular_hours: Decimal,
+    overtime_hours: Decimal,
+    table: TaxTable = DEFAULT_TAX_TABLE,
+    ytd_taxable: Decimal = Decimal("0"),
+) -> PayrollBreakdown:
+    """Compute gross/net/taxes from already-known hours (no database access).
+
+    `table` is the period's compiled tax rules (taxes.tax_table_for);
+    `ytd_taxable` is the employee's taxable wages earlier in the year, which
+    only matters for taxes with a wage base.
+    """
     if not hasattr(employee, "salary_profile"):
         raise ValueError(f"Employee {employee.employee_id} is missing a SalaryProfile.")
 
     sp = employee.salary_profile
 
-    regular_hours, overtime_hours, _pto_hours = compute_weekly_hours(employee, period_start, period_end)
-
     rate = Decimal(sp.base_pay)
 
     if employee.pay_type == PayType.SALARY:
@@ -113,16 +122,16 @@ def compute_payroll_for_employee(employee: Employee, period_start: date, period_
     if taxable < 0:
         taxable = Decimal("0")
 
-    # Employee taxes
-    state_emp = taxable * STATE_TAX_IN
-    federal_emp = taxable * FEDERAL_TAX
-    ss_emp = taxable * SOCIAL_SECURITY
-    med_emp = taxable * MEDICARE
+    def taxes(rule):
+        """(employee, employer) tax for one rule."""
+        amount = rule.tax(rule.subject_wages(taxable, ytd_taxable))
+        return amount, amount if rule.employer_matches else Decimal("0")
 
-    # Employer taxes (mirrors prompt)
-    federal_er = taxable * FEDERAL_TAX
-    ss_er = taxable * SOCIAL_SECURITY
-    med_er = taxable * MEDICARE
+    # Employee taxes; the employer matches federal, SS and Medicare (mirrors prompt)
+    state_emp, _state_er = taxes(table.state)
+    federal_emp, federal_er = taxes(table.federal)
+    ss_emp, ss_er = taxes(table.social_security)
+    med_emp, med_er = taxes(table.medicare)
 
     total_emp_taxes = state_emp + federal_emp + ss_emp + med_emp
 
@@ -141,3 +150,254 @@ def compute_payroll_for_employee(employee: Employee, period_start: date, period_
         med_er=money(med_er),
         net=money(net),
     )
+
+def compute_payroll_for_employee(
+    employee: Employee, period_start: date, period_end: date, profile: RunProfile | None = None
+) -> PayrollBreakdown:
+    """Compute gross/net/taxes for one employee for the given period."""
+    if not hasattr(employee, "salary_profile"):
+        raise ValueError(f"Employee {employee.employee_id} is missing a SalaryProfile.")
+
+    with phase(profile, "hours"):
+        regular_hours, overtime_hours, _pto_hours = compute_weekly_hours(employee, period_start, period_end)
+    with phase(profile, "tax_table"):
+        table = tax_table_for(period_end)
+        ytd_taxable = ytd_for(employee.pk, period_end.year).taxable_wages if table.has_wage_base else Decimal("0")
+    with phase(profile, "compute"):
+        return compute_breakdown(employee, regular_hours, overtime_hours, table, ytd_taxable)
+
+# ---------------------------------------------------------------------------
+# Batch engine
+#
+# The per-employee functions above issue one TimeEntry query per employee and
+# the caller then inserts one Paycheck at a time. For a full payroll run the
+# batch functions below load the whole period's hours in a single query (from
+# the WeeklyHours rollup when possible), compute every breakdown in memory and
+# write paychecks with bulk_create.
+# ---------------------------------------------------------------------------
+
+# Above this many employees it is cheaper to read the whole period than to
+# send a large IN (...) list (and SQLite caps the number of bound parameters).
+ENTRY_FILTER_MAX_IDS = 2000
+
+PAYCHECK_BATCH_SIZE = 500
+
+@dataclass
+class BatchResult:
+    breakdowns: list[tuple[Employee, PayrollBreakdown]]
+    skipped: list[tuple[Employee, str]]
+
+def load_period_entries(period_start: date, period_end: date, employee_pks=None) -> dict[int, dict]:
+    """Load every time entry in the period with one query.
+
+    Returns {employee pk: {work_date: (hours_worked, pto_hours)}}.
+    """
+    qs = TimeEntry.objects.filter(work_date__gte=period_start, work_date__lte=period_end)
+    if employee_pks is not None:
+        qs = qs.filter(employee_id__in=list(employee_pks))
+
+    grouped: dict[int, dict] = {}
+    rows = qs.order_by().values_list("employee_id", "work_date", "hours_worked", "pto_hours")
+    for employee_pk, work_date, hours_worked, pto_hours in rows.iterator(chunk_size=5000):
+        grouped.setdefault(employee_pk, {})[work_date] = (hours_worked, pto_hours)
+    return grouped
+
+def _weekdays(period_start: date, period_end: date) -> int:
+    days = (period_end - period_start).days + 1
+    full_weeks, rest = divmod(days, 7)
+    return full_weeks * 5 + sum(1 for i in range(rest) if (period_start + timedelta(days=i)).weekday() < 5)
+
+def load_period_hours(employees, period_start: date, period_end: date) -> dict[int, tuple[Decimal, Decimal, Decimal]]:
+    """(regular, overtime, pto) hours per employee pk for the period.
+
+    When the period is made of whole ISO weeks the pre-aggregated WeeklyHours
+    rollup is read; otherwise every entry in the period is loaded in one query
+    and the day-by-day rules are applied. Both give identical results.
+    """
+    pks = [emp.pk for emp in employees] if len(employees) <= ENTRY_FILTER_MAX_IDS else None
+    hours = {}
+    if is_whole_weeks(period_start, period_end):
+        rollup = period_hours(period_start, period_end, pks)
+        salary_regular = Decimal(8 * _weekdays(period_start, period_end))
+        zero = Decimal("0")
+        for emp in employees:
+            regular, overtime, pto = rollup.get(emp.pk, (zero, zero, zero))
+            if emp.pay_type == PayType.SALARY:
+                # Salary is paid from the calendar; only PTO comes from entries.
+                regular, overtime = salary_regular, zero
+            hours[emp.pk] = (regular, overtime, pto)
+    else:
+        entries = load_period_entries(period_start, period_end, pks)
+        for emp in employees:
+            hours[emp.pk] = _hours_from_entries(emp.pay_type, entries.get(emp.pk, {}), period_start, period_end)
+    return hours
+
+def iter_active_employee_chunks(chunk_size: int, after_employee_id: str = ""):
+    """Yield active employees (with salary_profile) in employee_id order, `chunk_size` at a time.
+
+    Uses keyset pagination on employee_id, so every chunk is a cheap index
+    range read no matter how far into the workforce it is.
+    """
+    qs = (
+        Employee.objects.filter(status=EmployeeStatus.ACTIVE)
+        .select_related("salary_profile")
+        .order_by("employee_id")
+    )
+    while True:
+        chunk = list(qs.filter(employee_id__gt=after_employee_id)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        after_employee_id = chunk[-1].employee_id
+
+def compute_payroll_batch(
+    employees, period_start: date, period_end: date, profile: RunProfile | None = None
+) -> BatchResult:
+    """Compute breakdowns for many employees without per-employee queries.
+
+    `employees` should have `salary_profile` selected (select_related) so the
+    loop never touches the database. Employees that cannot be computed are
+    returned in `skipped` with the reason, mirroring the per-employee path.
+    """
+    employees = list(employees)
+    with phase(profile, "hours"):
+        hours = load_period_hours(employees, period_start, period_end)
+    with phase(profile, "tax_table"):
+        table = tax_table_for(period_end)
+        ytd = ytd_many([emp.pk for emp in employees], period_end.year) if table.has_wage_base else {}
+
+    result = BatchResult(breakdowns=[], skipped=[])
+    with phase(profile, "compute"):
+        for emp in employees:
+            try:
+                regular, overtime, _pto = hours[emp.pk]
+                ytd_taxable = ytd[emp.pk].taxable_wages if ytd else Decimal("0")
+                b = compute_breakdown(emp, regular, overtime, table, ytd_taxable)
+            except Exception as ex:
+                result.skipped.append((emp, str(ex)))
+                continue
+            result.breakdowns.append((emp, b))
+    return result
+
+def build_paycheck(run: PayrollRun, employee: Employee, b: PayrollBreakdown) -> Paycheck:
+    """Return an unsaved Paycheck for the breakdown."""
+    return Paycheck(
+        payroll_run=run,
+        employee=employee,
+        gross_pay=b.gross,
+        pretax_deductions=b.pretax,
+        taxable_wages=b.taxable,
+        state_tax_employee=b.state_emp,
+        federal_tax_employee=b.federal_emp,
+        social_security_employee=b.ss_emp,
+        medicare_employee=b.med_emp,
+        federal_tax_employer=b.federal_er,
+        social_security_employer=b.ss_er,
+        medicare_employer=b.med_er,
+        net_pay=b.net,
+        department=employee.department,
+        pay_type=employee.pay_type,
+    )
+
+def write_paychecks(run: PayrollRun, breakdowns, batch_size: int = PAYCHECK_BATCH_SIZE) -> int:
+    """Insert paychecks for (employee, breakdown) pairs in chunks, atomically."""
+    created = 0
+    with transaction.atomic():
+        for i in range(0, len(breakdowns), batch_size):
+            chunk = [build_paycheck(run, emp, b) for emp, b in breakdowns[i:i + batch_size]]
+            Paycheck.objects.bulk_create(chunk, batch_size=batch_size)
+            created += len(chunk)
+    return created
+
+def paycheck_totals(paychecks) -> dict:
+    """Paycheck count and the sum of every amount column, in one aggregate query."""
+    totals = paychecks.order_by().aggregate(
+        employees=Count("pk"), **{f: Sum(f) for f in PAYCHECK_MONEY_FIELDS}
+    )
+    for f in PAYCHECK_MONEY_FIELDS:
+        # SQLite hands back extra decimal places; NULL means no paychecks.
+        totals[f] = money(totals[f] or Decimal("0"))
+    return totals
+
+# --- Run summaries --------------------------------------------------------
+
+def summarize_run(run: PayrollRun) -> list[PayrollRunSummary]:
+    """(Re)write the PayrollRunSummary rows of `run` from its paychecks.
+
+    One GROUP BY query over the run's paychecks; the overall row is the sum of
+    the department/pay type rows.
+    """
+    groups = (
+        run.paychecks.order_by()
+        .values("department", "pay_type")
+        .annotate(employees=Count("pk"), **{f: Sum(f) for f in PAYCHECK_MONEY_FIELDS})
+    )
+    overall = PayrollRunSummary(payroll_run=run)
+    rows = [overall]
+    for g in groups:
+        row = PayrollRunSummary(
+            payroll_run=run,
+            department=g["department"],
+            pay_type=g["pay_type"],
+            employees=g["employees"],
+            **{f: money(g[f]) for f in PAYCHECK_MONEY_FIELDS},
+        )
+        rows.append(row)
+        overall.employees += row.employees
+        for f in PAYCHECK_MONEY_FIELDS:
+            setattr(overall, f, getattr(overall, f) + getattr(row, f))
+
+    with transaction.atomic():
+        run.summaries.all().delete()
+        PayrollRunSummary.objects.bulk_create(rows)
+    return rows
+
+def lock_period_entries(period_start: date, period_end: date) -> int:
+    """Lock time entries in the period so they can't be edited after calculation."""
+    return TimeEntry.objects.filter(work_date__gte=period_start, work_date__lte=period_end).update(locked=True)
+
+def lock_run(run: PayrollRun) -> None:
+    """Mark a computed run as final, materialize its totals and add it to YTD."""
+    with transaction.atomic():
+        # Conditional update: a run is only ever added to YTD once.
+        if not PayrollRun.objects.filter(pk=run.pk, locked=False).update(locked=True):
+            return
+        run.locked = True
+        summarize_run(run)
+        apply_run_to_ytd(run)
+
+def with_summary(runs):
+    """Prefetch each run's overall summary (read through PayrollRun.summary)."""
+    return runs.prefetch_related(Prefetch(
+        "summaries",
+        queryset=PayrollRunSummary.objects.filter(department="", pay_type=""),
+        to_attr="overall_summary",
+    ))
+
+def run_totals(run: PayrollRun, department: str = "", pay_type: str = "") -> dict:
+    """Totals for a run, optionally for one department and/or pay type.
+
+    Summarized runs are answered from PayrollRunSummary; anything else falls
+    back to aggregating paychecks. Both group by the department and pay type
+    stored on each paycheck, as the run's paycheck list filters by.
+    """
+    if run.locked and run.summary is not None:
+        if not department and not pay_type:
+            return run.summary.totals()
+        rows = run.summaries.exclude(department="", pay_type="")
+        if department:
+            rows = rows.filter(department=department)
+        if pay_type:
+            rows = rows.filter(pay_type=pay_type)
+        totals = rows.aggregate(employees=Sum("employees"), **{f: Sum(f) for f in PAYCHECK_MONEY_FIELDS})
+        totals["employees"] = totals["employees"] or 0
+        for f in PAYCHECK_MONEY_FIELDS:
+            totals[f] = money(totals[f] or Decimal("0"))
+        return totals
+
+    paychecks = run.paychecks.all()
+    if department:
+        paychecks = paychecks.filter(department=department)
+    if pay_type:
+        paychecks = paychecks.filter(pay_type=pay_type)
+    return paycheck_totals(paychecks)
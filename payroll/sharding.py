@@ -0,0 +1,137 @@
+"""Multi-process payroll computation.
+
+Active employees are split into shards of consecutive `employee_id`s, in the
+order the database sorts them, and each shard carries its employees' pks, so
+shards never overlap or leave gaps whatever the collation. Each shard is
+computed in a worker process with the regular batch engine
+(`services.compute_payroll_batch`) and the parent merges the results in shard
+order, so the output does not depend on which worker finishes first.
+
+Workers are started with the "spawn" method (safe inside a threaded web server
+and available on Windows) and call `django.setup()` once on start-up.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date
+
+import django
+from django.conf import settings
+
+from employees.models import Employee, EmployeeStatus
+from .services import BatchResult, compute_payroll_batch
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class Shard:
+    index: int
+    first_employee_id: str
+    last_employee_id: str
+    employee_pks: tuple[int, ...]
+
+@dataclass
+class ShardTiming:
+    index: int
+    first_employee_id: str
+    last_employee_id: str
+    employees: int
+    skipped: int
+    seconds: float
+    pid: int
+
+def default_workers() -> int:
+    return getattr(settings, "PAYROLL_SHARD_WORKERS", None) or os.cpu_count() or 1
+
+def default_shard_size() -> int:
+    return getattr(settings, "PAYROLL_SHARD_SIZE", 2000)
+
+def plan_shards(employees: list[tuple[int, str]], shard_size: int) -> list[Shard]:
+    """Split (pk, employee_id) pairs, already in database order, into shards of `shard_size`."""
+    if shard_size < 1:
+        raise ValueError("shard_size must be at least 1.")
+    shards = []
+    for n, i in enumerate(range(0, len(employees), shard_size)):
+        part = employees[i:i + shard_size]
+        shards.append(Shard(
+            index=n,
+            first_employee_id=part[0][1],
+            last_employee_id=part[-1][1],
+            employee_pks=tuple(pk for pk, _ in part),
+        ))
+    return shards
+
+def compute_shard(shard: Shard, period_start: date, period_end: date) -> tuple[BatchResult, ShardTiming]:
+    """Compute one shard. Runs in a worker process (or inline for a single shard)."""
+    t0 = time.perf_counter()
+    employees = (
+        Employee.objects.filter(status=EmployeeStatus.ACTIVE, pk__in=shard.employee_pks)
+        .select_related("salary_profile")
+        .order_by("employee_id")
+    )
+    result = compute_payroll_batch(employees, period_start, period_end)
+    timing = ShardTiming(
+        index=shard.index,
+        first_employee_id=shard.first_employee_id,
+        last_employee_id=shard.last_employee_id,
+        employees=len(result.breakdowns),
+        skipped=len(result.skipped),
+        seconds=time.perf_counter() - t0,
+        pid=os.getpid(),
+    )
+    return result, timing
+
+def compute_payroll_sharded(
+    period_start: date,
+    period_end: date,
+    workers: int | None = None,
+    shard_size: int | None = None,
+    on_shard_done=None,
+) -> tuple[BatchResult, list[ShardTiming]]:
+    """Compute breakdowns for all active employees across a process pool.
+
+    Returns the merged BatchResult (ordered by employee_id) and one
+    ShardTiming per shard. `on_shard_done(timing)` is called as each shard
+    finishes, in completion order.
+    """
+    workers = workers or default_workers()
+    shard_size = shard_size or default_shard_size()
+
+    employees = list(
+        Employee.objects.filter(status=EmployeeStatus.ACTIVE).order_by("employee_id").values_list("pk", "employee_id")
+    )
+    shards = plan_shards(employees, shard_size)
+
+    if workers == 1 or len(shards) <= 1:
+        outputs = []
+        for s in shards:
+            outputs.append(compute_shard(s, period_start, period_end))
+            if on_shard_done:
+                on_shard_done(outputs[-1][1])
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards)), mp_context=ctx, initializer=django.setup) as pool:
+            futures = [pool.submit(compute_shard, s, period_start, period_end) for s in shards]
+            if on_shard_done:
+                for f in as_completed(futures):
+                    on_shard_done(f.result()[1])
+            # Collect in submission (shard) order so the merge is deterministic.
+            outputs = [f.result() for f in futures]
+
+    merged = BatchResult(breakdowns=[], skipped=[])
+    timings = []
+    for result, timing in outputs:
+        merged.breakdowns.extend(result.breakdowns)
+        merged.skipped.extend(result.skipped)
+        timings.append(timing)
+        logger.info(
+            "Payroll shard %d (%s..%s): %d employees, %d skipped in %.3fs (pid %d)",
+            timing.index, timing.first_employee_id, timing.last_employee_id,
+            timing.employees, timing.skipped, timing.seconds, timing.pid,
+        )
+    return merged, timings
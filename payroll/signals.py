@@ -0,0 +1,74 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from employees.models import Employee, SalaryProfile
+from timeentry.models import TimeEntry
+from .models import TaxBracket, TaxRule
+from .recalculation import record_pay_input_changes
+from .taxes import clear_tax_tables
+
+
+def _deleting_employee(origin) -> bool:
+    """True when a delete cascades from an Employee (no journal row can point at it)."""
+    model = origin.model if hasattr(origin, "model") else type(origin)
+    return model is Employee
+
+
+@receiver(post_save, sender=TimeEntry)
+def journal_time_entry_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    changes = [(instance.employee_id, instance.work_date)]
+    # Set by timeentry's pre_save receiver when an existing entry is edited.
+    previous = getattr(instance, "_previous_entry_key", None)
+    if previous:
+        changes.append(previous)
+    record_pay_input_changes(changes)
+
+
+@receiver(post_delete, sender=TimeEntry)
+def journal_time_entry_delete(sender, instance, origin=None, **kwargs):
+    if _deleting_employee(origin):
+        return
+    record_pay_input_changes([(instance.employee_id, instance.work_date)])
+
+
+@receiver(post_save, sender=SalaryProfile)
+@receiver(post_delete, sender=SalaryProfile)
+def journal_salary_profile_change(sender, instance, raw=False, origin=None, **kwargs):
+    if raw or _deleting_employee(origin):
+        return
+    record_pay_input_changes([(instance.employee_id, None)])
+
+
+# Employee fields a paycheck depends on: status and pay type decide how (and
+# whether) the employee is paid; department is stored on the paycheck.
+PAY_EMPLOYEE_FIELDS = ("status", "pay_type", "department")
+
+
+@receiver(pre_save, sender=Employee)
+def remember_previous_pay_fields(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._previous_pay_fields = None
+    if raw or instance.pk is None or (update_fields is not None and not set(update_fields) & set(PAY_EMPLOYEE_FIELDS)):
+        return
+    instance._previous_pay_fields = Employee.objects.filter(pk=instance.pk).values_list(*PAY_EMPLOYEE_FIELDS).first()
+
+
+@receiver(post_save, sender=Employee)
+def journal_employee_change(sender, instance, created=False, raw=False, **kwargs):
+    """Pay-relevant fields affect every period (hires and terminations included);
+    edits to anything else (address, email, ...) are not journaled."""
+    if raw:
+        return
+    previous = getattr(instance, "_previous_pay_fields", None)
+    if not created and (previous is None or previous == tuple(getattr(instance, f) for f in PAY_EMPLOYEE_FIELDS)):
+        return
+    record_pay_input_changes([(instance.pk, None)])
+
+
+@receiver(post_save, sender=TaxRule)
+@receiver(post_delete, sender=TaxRule)
+@receiver(post_save, sender=TaxBracket)
+@receiver(post_delete, sender=TaxBracket)
+def forget_compiled_tax_tables(sender, **kwargs):
+    clear_tax_tables()
@@ -0,0 +1,131 @@
+"""Effective-dated tax rules, compiled once per pay period.
+
+HR maintains TaxRule rows in the admin: one per tax kind and effective date,
+each with progressive TaxBracket rows and an optional annual wage base (the
+Social Security cap). A kind with no rule in effect falls back to the
+built-in flat rate below, so an empty rule table reproduces the rates from
+the prompt exactly.
+
+`tax_table_for(day)` reads the rules in effect on `day` with one query and
+compiles them into an immutable TaxTable: per tax, the sorted bracket lower
+bounds, their rates and the tax accumulated below each bound, so a lookup is
+a bisect plus one multiply. Compiled tables are kept in a bounded LRU keyed by
+date (payroll uses the period end), so a whole run reads the rule tables at
+most once. The cache is per process, so it is cleared at the start of every
+run computation (jobs.execute_job, recalculation.recalculate_run): a rule
+edited in one web worker reaches runs computed in any other. payroll/signals.py
+also clears it when a rule changes in this process.
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass, fields
+from datetime import date
+from decimal import Decimal
+from functools import lru_cache
+
+from .models import TaxKind, TaxRule
+
+# Rates from prompt
+STATE_TAX_IN = Decimal("0.0315")
+
+FEDERAL_TAX = Decimal("0.0765")  # as specified in prompt
+SOCIAL_SECURITY = Decimal("0.062")
+MEDICARE = Decimal("0.0145")
+
+TAX_TABLE_CACHE_SIZE = 64
+
+ZERO = Decimal("0")
+
+@dataclass(frozen=True)
+class CompiledTax:
+    lower_bounds: tuple[Decimal, ...]
+    rates: tuple[Decimal, ...]
+    # Tax owed on wages up to each lower bound.
+    base_tax: tuple[Decimal, ...]
+    wage_base: Decimal | None = None
+    employer_matches: bool = False
+
+    @classmethod
+    def build(cls, brackets, wage_base: Decimal | None = None, employer_matches: bool = False) -> CompiledTax:
+        """Compile (lower_bound, rate) pairs. Wages below the lowest bound are untaxed."""
+        brackets = sorted(brackets)
+        if not brackets or brackets[0][0] > 0:
+            brackets.insert(0, (ZERO, ZERO))
+        base_tax = [ZERO]
+        for (lower, rate), (next_lower, _) in zip(brackets, brackets[1:]):
+            base_tax.append(base_tax[-1] + (next_lower - lower) * rate)
+        return cls(
+            tuple(lower for lower, _ in brackets),
+            tuple(rate for _, rate in brackets),
+            tuple(base_tax),
+            wage_base,
+            employer_matches,
+        )
+
+    @classmethod
+    def flat(cls, rate: Decimal, employer_matches: bool = False) -> CompiledTax:
+        return cls.build([(ZERO, rate)], employer_matches=employer_matches)
+
+    def subject_wages(self, taxable: Decimal, ytd_taxable: Decimal = ZERO) -> Decimal:
+        """The part of this period's taxable wages still under the annual wage base."""
+        if self.wage_base is None:
+            return taxable
+        return max(ZERO, min(taxable, self.wage_base - ytd_taxable))
+
+    def tax(self, wages: Decimal) -> Decimal:
+        """Unrounded tax on `wages`."""
+        if wages <= 0:
+            return ZERO
+        i = bisect_right(self.lower_bounds, wages) - 1
+        return self.base_tax[i] + (wages - self.lower_bounds[i]) * self.rates[i]
+
+@dataclass(frozen=True)
+class TaxTable:
+    state: CompiledTax
+    federal: CompiledTax
+    social_security: CompiledTax
+    medicare: CompiledTax
+
+    @property
+    def has_wage_base(self) -> bool:
+        """True when some tax is capped, so computing it needs year-to-date wages."""
+        return any(getattr(self, f.name).wage_base is not None for f in fields(self))
+
+DEFAULT_TAX_TABLE = TaxTable(
+    state=CompiledTax.flat(STATE_TAX_IN),
+    federal=CompiledTax.flat(FEDERAL_TAX, employer_matches=True),
+    social_security=CompiledTax.flat(SOCIAL_SECURITY, employer_matches=True),
+    medicare=CompiledTax.flat(MEDICARE, employer_matches=True),
+)
+
+@lru_cache(maxsize=TAX_TABLE_CACHE_SIZE)
+def tax_table_for(day: date) -> TaxTable:
+    """The rules in effect on `day`, compiled. One query per date not yet cached."""
+    rows = (
+        TaxRule.objects.filter(effective_from__lte=day)
+        .order_by("kind", "-effective_from")
+        .values_list("kind", "effective_from", "wage_base", "employer_matches",
+                     "brackets__lower_bound", "brackets__rate")
+    )
+    current, options, brackets = {}, {}, defaultdict(list)
+    for kind, effective_from, wage_base, employer_matches, lower_bound, rate in rows:
+        # Rows are newest first per kind; only the newest rule counts.
+        if current.setdefault(kind, effective_from) != effective_from:
+            continue
+        options[kind] = (wage_base, employer_matches)
+        if lower_bound is not None:
+            brackets[kind].append((lower_bound, rate))
+
+    compiled = {}
+    for kind in TaxKind.values:
+        name = kind.lower()
+        compiled[name] = (
+            CompiledTax.build(brackets[kind], *options[kind]) if kind in options
+            else getattr(DEFAULT_TAX_TABLE, name)
+        )
+    return TaxTable(**compiled)
+
+def clear_tax_tables() -> None:
+    tax_table_for.cache_clear()
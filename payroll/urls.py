@@ -5,5 +5,10 @@ urlpatterns = [
     path("", views.PayrollRunListView.as_view(), name="payroll_runs"),
     path("new/", views.create_payroll_run, name="payroll_run_new"),
     path("<int:pk>/", views.PayrollRunDetailView.as_view(), name="payroll_run_detail"),
+    path("<int:pk>/recalculate/", views.recalculate_payroll_run, name="payroll_run_recalculate"),
+    path("<int:pk>/lock/", views.lock_payroll_run, name="payroll_run_lock"),
+    path("<int:pk>/progress.json", views.payroll_run_progress, name="payroll_run_progress"),
+    path("<int:pk>/diff/", views.payroll_run_diff, name="payroll_run_diff"),
     path("<int:pk>/export.csv", views.export_payroll_csv, name="payroll_export_csv"),
+    path("<int:pk>/paychecks/<int:paycheck_pk>/stub.pdf", views.paycheck_stub_pdf, name="paycheck_stub_pdf"),
 ]
@@ -0,0 +1,223 @@
+"""Columnar (NumPy) payroll calculator.
+
+`compute_breakdown` in payroll.services does the tax math one employee at a
+time with Decimal. This module computes the same columns for a whole
+workforce at once using int64 NumPy arrays.
+
+Every intermediate value is kept as an exact fraction of a cent over a common
+denominator, and only the final columns are rounded (half-up, like `money()`).
+This gives cent-exact parity with the Decimal path; use the
+`check_vectorized_parity` management command to verify it on random inputs.
+
+Only the built-in flat rates (taxes.DEFAULT_TAX_TABLE) are implemented.
+Periods with tax rules in effect fall back to the Decimal batch engine.
+
+Requires NumPy.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from decimal import Decimal
+
+import numpy as np
+
+from employees.models import MedicalCoverage, PayType, SalaryProfile
+from .services import (
+    OVERTIME_MULTIPLIER,
+    BatchResult,
+    PayrollBreakdown,
+    compute_payroll_batch,
+    load_period_hours,
+)
+from .taxes import DEFAULT_TAX_TABLE, FEDERAL_TAX, MEDICARE, SOCIAL_SECURITY, STATE_TAX_IN, tax_table_for
+
+COLUMNS = (
+    "gross", "pretax", "taxable",
+    "state_emp", "federal_emp", "ss_emp", "med_emp",
+    "federal_er", "ss_er", "med_er",
+    "net",
+)
+
+# Benefit amounts come from SalaryProfile so the rules live in one place.
+STIPEND_PER_DEPENDENT = SalaryProfile(dependents=1).dependent_stipend()
+MEDICAL_DEDUCTION = {
+    MedicalCoverage.SINGLE: SalaryProfile(medical=MedicalCoverage.SINGLE).medical_deduction_per_pay_period(),
+    MedicalCoverage.FAMILY: SalaryProfile(medical=MedicalCoverage.FAMILY).medical_deduction_per_pay_period(),
+}
+
+WEEKS_PER_YEAR = 52
+
+def _scale(*values: Decimal) -> int:
+    """Smallest power of ten that turns every value into an integer."""
+    return 10 ** max(max(-v.as_tuple().exponent, 0) for v in values)
+
+# Overtime multiplier as a fraction (1.5 -> 3/2).
+_OT_NUM, _OT_DEN = OVERTIME_MULTIPLIER.as_integer_ratio()
+
+# Gross pay is held as cents / DENOM. Hourly pay needs 1/100 (hours are
+# stored in hundredths) times the overtime denominator; salary needs 1/52.
+DENOM = math.lcm(100 * _OT_DEN, WEEKS_PER_YEAR)
+
+# Tax rates as integers over RATE_SCALE (0.0315 -> 315 / 10000).
+RATE_SCALE = _scale(STATE_TAX_IN, FEDERAL_TAX, SOCIAL_SECURITY, MEDICARE)
+_STATE = int(STATE_TAX_IN * RATE_SCALE)
+_FEDERAL = int(FEDERAL_TAX * RATE_SCALE)
+_SS = int(SOCIAL_SECURITY * RATE_SCALE)
+_MED = int(MEDICARE * RATE_SCALE)
+_EMPLOYEE_RATE_SUM = _STATE + _FEDERAL + _SS + _MED
+
+# Keep every numerator (and 2*numerator + denominator when rounding) inside int64.
+_MAX_NUMERATOR = (2 ** 62) // (RATE_SCALE + _EMPLOYEE_RATE_SUM)
+
+@dataclass
+class VectorizedPayroll:
+    """Result columns, each an int64 array of cents aligned with the inputs."""
+    gross: np.ndarray
+    pretax: np.ndarray
+    taxable: np.ndarray
+    state_emp: np.ndarray
+    federal_emp: np.ndarray
+    ss_emp: np.ndarray
+    med_emp: np.ndarray
+    federal_er: np.ndarray
+    ss_er: np.ndarray
+    med_er: np.ndarray
+    net: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.gross)
+
+    def breakdown(self, i: int) -> PayrollBreakdown:
+        """Row `i` as a Decimal PayrollBreakdown (same shape as the Decimal path)."""
+        return PayrollBreakdown(**{
+            name: Decimal(int(getattr(self, name)[i])).scaleb(-2) for name in COLUMNS
+        })
+
+def to_fixed(values, places: int = 2) -> np.ndarray:
+    """Convert Decimals (or strings/ints) to int64 units of 10**-places.
+
+    Raises ValueError if a value has more precision than `places`.
+    """
+    out = np.empty(len(values), dtype=np.int64)
+    for i, v in enumerate(values):
+        scaled = Decimal(v).scaleb(places)
+        if scaled != scaled.to_integral_value():
+            raise ValueError(f"{v} has more than {places} decimal places.")
+        out[i] = int(scaled)
+    return out
+
+def _round_half_up(num: np.ndarray, den: int) -> np.ndarray:
+    """Round num/den to an integer, halves away from zero (ROUND_HALF_UP)."""
+    mag = (2 * np.abs(num) + den) // (2 * den)
+    return np.where(num < 0, -mag, mag)
+
+def compute_payroll_vectorized(
+    base_pay_cents,
+    pay_type,
+    regular_hundredths,
+    overtime_hundredths,
+    dependents,
+    medical,
+) -> VectorizedPayroll:
+    """Compute payroll columns for many employees at once.
+
+    Arguments are equal-length arrays:
+    - base_pay_cents: annual salary or hourly rate, in cents
+    - pay_type: PayType values
+    - regular_hundredths / overtime_hundredths: hours * 100
+    - dependents: dependent counts
+    - medical: MedicalCoverage values
+    """
+    base = np.asarray(base_pay_cents, dtype=np.int64)
+    is_salary = np.asarray(pay_type) == PayType.SALARY
+    regular = np.asarray(regular_hundredths, dtype=np.int64)
+    overtime = np.asarray(overtime_hundredths, dtype=np.int64)
+    deps = np.asarray(dependents, dtype=np.int64)
+    family = np.asarray(medical) == MedicalCoverage.FAMILY
+
+    n = len(base)
+    if not all(len(a) == n for a in (is_salary, regular, overtime, deps, family)):
+        raise ValueError("All input arrays must have the same length.")
+    if n == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return VectorizedPayroll(**{name: empty for name in COLUMNS})
+
+    # Guard against int64 overflow before doing any array math.
+    weighted_hours = int((regular * _OT_DEN + overtime * _OT_NUM).max())
+    hourly_bound = int(np.abs(base).max()) * max(weighted_hours, 1) * (DENOM // (100 * _OT_DEN))
+    salary_bound = int(np.abs(base).max()) * (DENOM // WEEKS_PER_YEAR)
+    extras_bound = (int(deps.max()) * STIPEND_PER_DEPENDENT + max(MEDICAL_DEDUCTION.values())) * 100 * DENOM
+    if max(hourly_bound, salary_bound) + extras_bound > _MAX_NUMERATOR:
+        raise ValueError("Inputs are too large for exact int64 payroll math.")
+
+    # Gross (cents * DENOM)
+    hourly_gross = base * (regular * _OT_DEN + overtime * _OT_NUM) * (DENOM // (100 * _OT_DEN))
+    salary_gross = base * (DENOM // WEEKS_PER_YEAR)
+    gross = np.where(is_salary, salary_gross, hourly_gross)
+    gross = gross + deps * (STIPEND_PER_DEPENDENT * 100 * DENOM)
+
+    pretax_cents = np.where(
+        family, MEDICAL_DEDUCTION[MedicalCoverage.FAMILY], MEDICAL_DEDUCTION[MedicalCoverage.SINGLE]
+    ) * 100
+    pretax = pretax_cents * DENOM
+
+    taxable = np.maximum(gross - pretax, 0)
+
+    tax_den = DENOM * RATE_SCALE
+    state_emp = _round_half_up(taxable * _STATE, tax_den)
+    federal = _round_half_up(taxable * _FEDERAL, tax_den)
+    ss = _round_half_up(taxable * _SS, tax_den)
+    med = _round_half_up(taxable * _MED, tax_den)
+
+    # Net is rounded once from the unrounded components, like the Decimal path.
+    net_num = (gross - pretax) * RATE_SCALE - taxable * _EMPLOYEE_RATE_SUM
+
+    return VectorizedPayroll(
+        gross=_round_half_up(gross, DENOM),
+        pretax=pretax_cents.astype(np.int64),
+        taxable=_round_half_up(taxable, DENOM),
+        state_emp=state_emp,
+        federal_emp=federal,
+        ss_emp=ss,
+        med_emp=med,
+        federal_er=federal.copy(),
+        ss_er=ss.copy(),
+        med_er=med.copy(),
+        net=_round_half_up(net_num, tax_den),
+    )
+
+def compute_payroll_batch_vectorized(employees, period_start, period_end) -> BatchResult:
+    """Drop-in alternative to services.compute_payroll_batch using NumPy math.
+
+    Hours come from services.load_period_hours; only the money math is
+    vectorized. Periods whose tax rules differ from the built-in flat rates
+    are computed by services.compute_payroll_batch instead.
+    """
+    if tax_table_for(period_end) != DEFAULT_TAX_TABLE:
+        return compute_payroll_batch(employees, period_start, period_end)
+    employees = list(employees)
+    hours = load_period_hours(employees, period_start, period_end)
+
+    result = BatchResult(breakdowns=[], skipped=[])
+    ok, base, pay_types, regular, overtime, deps, medical = [], [], [], [], [], [], []
+    for emp in employees:
+        if not hasattr(emp, "salary_profile"):
+            result.skipped.append((emp, f"Employee {emp.employee_id} is missing a SalaryProfile."))
+            continue
+        sp = emp.salary_profile
+        reg_h, ot_h, _pto = hours[emp.pk]
+        ok.append(emp)
+        base.append(sp.base_pay)
+        pay_types.append(emp.pay_type)
+        regular.append(reg_h)
+        overtime.append(ot_h)
+        deps.append(sp.dependents)
+        medical.append(sp.medical)
+
+    cols = compute_payroll_vectorized(
+        to_fixed(base), np.array(pay_types, dtype=object), to_fixed(regular), to_fixed(overtime),
+        np.array(deps, dtype=np.int64), np.array(medical, dtype=object),
+    )
+    result.breakdowns = [(emp, cols.breakdown(i)) for i, emp in enumerate(ok)]
+    return result
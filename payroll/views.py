@@ -1,20 +1,32 @@
 from __future__ import annotations
 
+import csv
 from datetime import date
+from decimal import Decimal, InvalidOperation
+from urllib.parse import urlencode
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse
+from django.core.paginator import Paginator
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import redirect, get_object_or_404, render
+from django.views.decorators.http import require_POST
 from django.views.generic import ListView, DetailView
 
 from accounts.decorators import hr_required
-from employees.models import Employee, EmployeeStatus
-from timeentry.models import TimeEntry
-from .models import PayrollRun, Paycheck
-from .services import compute_payroll_for_employee
+from employees.models import PayType
+from .archive import ArchivedPaychecks
+from .jobs import enqueue_payroll_run, start_thread_runner
+from .models import PAYCHECK_MONEY_FIELDS, JobState, Paycheck, PayrollJob, PayrollRun
+from .paystub_pdf import render_stub
+from .paystubs import stub_for_paycheck
+from .recalculation import dirty_employee_ids, finalize_run, recalculate_run
+from .run_diff import COLUMN_LABELS, diff_rows, diff_totals, row_status
+from .services import money, run_totals, with_summary
 
 class PayrollRunListView(ListView):
     model = PayrollRun
+    queryset = with_summary(PayrollRun.objects.select_related("calculated_by", "job"))
     template_name = "payroll/run_list.html"
     context_object_name = "runs"
     paginate_by = 20
@@ -25,9 +37,63 @@ class PayrollRunListView(ListView):
         return super().dispatch(request, *args, **kwargs)
 
 class PayrollRunDetailView(DetailView):
+    """One run: paginated paychecks, optional department/pay type filter, totals.
+
+    Totals of locked runs come from PayrollRunSummary; the paychecks of an
+    archived run are read from its archive file (payroll/archive.py).
+    """
     model = PayrollRun
+    queryset = with_summary(PayrollRun.objects.select_related("job"))
     template_name = "payroll/run_detail.html"
     context_object_name = "run"
+    paginate_by = 100
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        run = self.object
+        department = self.request.GET.get("department", "")
+        pay_type = self.request.GET.get("pay_type", "")
+        if pay_type not in PayType.values:
+            pay_type = ""
+
+        # Department and pay type are the ones stored on each paycheck, as in
+        # the totals, so an employee's later transfer doesn't move them.
+        if run.archived_at:
+            paychecks = ArchivedPaychecks(run, department, pay_type)
+            departments = run.summaries.exclude(department="").order_by("department").values_list(
+                "department", flat=True
+            ).distinct()
+        else:
+            paychecks = run.paychecks.select_related("employee").order_by("pk")
+            if department:
+                paychecks = paychecks.filter(department=department)
+            if pay_type:
+                paychecks = paychecks.filter(pay_type=pay_type)
+            departments = run.paychecks.order_by("department").values_list("department", flat=True).distinct()
+
+        totals = run_totals(run, department, pay_type)
+        paginator = Paginator(paychecks, self.paginate_by)
+        paginator.count = totals["employees"]  # already counted by the aggregate
+        page_number = self.request.GET.get("page")
+        if page_number == "last":
+            page_number = paginator.num_pages
+        page = paginator.get_page(page_number)
+
+        ctx.update({
+            "job": getattr(run, "job", None),
+            "is_draft": run.is_draft,
+            "dirty_count": len(dirty_employee_ids(run)) if run.is_draft else 0,
+            "paychecks": page,
+            "page_obj": page,
+            "totals": totals,
+            "departments": departments,
+            "pay_types": PayType.choices,
+            "department": department,
+            "pay_type": pay_type,
+            "filter_query": urlencode({k: v for k, v in (("department", department), ("pay_type", pay_type)) if v}),
+            "compare_runs": PayrollRun.objects.exclude(pk=run.pk).only("pk", "period_start", "period_end")[:20],
+        })
+        return ctx
 
     def dispatch(self, request, *args, **kwargs):
         if not request.user.is_authenticated or not request.user.is_staff:
@@ -36,7 +102,7 @@ class PayrollRunDetailView(DetailView):
 
 @hr_required
 def create_payroll_run(request):
-    """Create a payroll run and lock time entry for the period.
+    """Queue a payroll run; the calculation happens in a background job.
 
     For simplicity, this UI defaults to a 7-day pay period, but you can extend it
     to bi-weekly/monthly later.
@@ -44,73 +110,178 @@ def create_payroll_run(request):
     if request.method == "POST":
         period_start = date.fromisoformat(request.POST["period_start"])
         period_end = date.fromisoformat(request.POST["period_end"])
+        sharded = request.POST.get("mode") == "sharded"
+        draft = bool(request.POST.get("draft"))
 
-        run = PayrollRun.objects.create(
-            period_start=period_start,
-            period_end=period_end,
-            calculated_by=request.user,
-            locked=True,
-        )
+        job = enqueue_payroll_run(period_start, period_end, request.user, sharded=sharded, draft=draft)
 
-        # Lock time entries so they can't be edited after calculation.
-        TimeEntry.objects.filter(work_date__gte=period_start, work_date__lte=period_end).update(locked=True)
-
-        employees = Employee.objects.filter(status=EmployeeStatus.ACTIVE).select_related("salary_profile")
-        created = 0
-        for emp in employees:
-            try:
-                b = compute_payroll_for_employee(emp, period_start, period_end)
-            except Exception as ex:
-                messages.error(request, f"Skipped {emp.employee_id}: {ex}")
-                continue
-
-            Paycheck.objects.create(
-                payroll_run=run,
-                employee=emp,
-                gross_pay=b.gross,
-                pretax_deductions=b.pretax,
-                taxable_wages=b.taxable,
-                state_tax_employee=b.state_emp,
-                federal_tax_employee=b.federal_emp,
-                social_security_employee=b.ss_emp,
-                medicare_employee=b.med_emp,
-                federal_tax_employer=b.federal_er,
-                social_security_employer=b.ss_er,
-                medicare_employer=b.med_er,
-                net_pay=b.net,
-            )
-            created += 1
-
-        messages.success(request, f"Payroll calculated. Paychecks created: {created}.")
-        return redirect("payroll_run_detail", pk=run.pk)
+        if draft:
+            messages.success(request, "Draft payroll run queued. Time entries stay editable until you lock it.")
+        else:
+            messages.success(request, "Payroll run queued. Time entries for the period are locked once it starts.")
+        return redirect("payroll_run_detail", pk=job.payroll_run_id)
 
     return render(request, "payroll/run_new.html")
 
+def _draft_run_or_error(request, pk: int):
+    run = get_object_or_404(PayrollRun.objects.select_related("job"), pk=pk)
+    if not run.is_draft:
+        messages.error(request, "Only finished draft runs can be recalculated or locked.")
+        return run, False
+    return run, True
+
 @hr_required
-def export_payroll_csv(request, pk: int):
+@require_POST
+def recalculate_payroll_run(request, pk: int):
+    """Recompute only the employees whose pay inputs changed since the last calculation."""
+    run, ok = _draft_run_or_error(request, pk)
+    if ok:
+        result = recalculate_run(run)
+        messages.success(
+            request,
+            f"Recalculated {result.employees} changed employees ({result.written} paychecks written, "
+            f"{len(result.skipped)} skipped).",
+        )
+    return redirect("payroll_run_detail", pk=run.pk)
+
+@hr_required
+@require_POST
+def lock_payroll_run(request, pk: int):
+    """Bring a draft up to date, then lock its time entries and the run."""
+    run, ok = _draft_run_or_error(request, pk)
+    if ok:
+        result = finalize_run(run)
+        messages.success(request, f"Payroll run locked ({result.employees} late changes applied).")
+    return redirect("payroll_run_detail", pk=run.pk)
+
+@hr_required
+def payroll_run_progress(request, pk: int):
+    """Lightweight JSON progress for the run detail page to poll."""
     run = get_object_or_404(PayrollRun, pk=pk)
-    rows = run.paychecks.select_related("employee").all()
-
-    import csv
-    from io import StringIO
-    buf = StringIO()
-    w = csv.writer(buf)
-    w.writerow([
-        "employee_id","name","gross_pay","pretax_deductions","taxable_wages",
-        "state_tax_employee","federal_tax_employee","social_security_employee","medicare_employee",
-        "net_pay",
-        "federal_tax_employer","social_security_employer","medicare_employer"
-    ])
-    for p in rows:
-        w.writerow([
-            p.employee.employee_id,
-            f"{p.employee.last_name}, {p.employee.first_name}",
-            p.gross_pay, p.pretax_deductions, p.taxable_wages,
-            p.state_tax_employee, p.federal_tax_employee, p.social_security_employee, p.medicare_employee,
-            p.net_pay,
-            p.federal_tax_employer, p.social_security_employer, p.medicare_employer
+    job = PayrollJob.objects.filter(payroll_run=run).first()
+    if job is None:
+        # Runs created before background jobs existed are always complete.
+        return JsonResponse({"state": JobState.DONE, "locked": run.locked, "percent": 100})
+    if getattr(settings, "PAYROLL_JOB_RUNNER", "thread") == "thread" and (job.state == JobState.QUEUED or job.is_stale):
+        # Jobs queued (or left running) by a process that has since restarted.
+        start_thread_runner()
+    return JsonResponse({
+        "state": job.state,
+        "locked": run.locked,
+        "total": job.total,
+        "processed": job.processed,
+        "skipped": job.skipped,
+        "percent": job.percent,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "seconds": job.seconds,
+        "error": job.error,
+    })
+
+CSV_HEADER = [
+    "employee_id","name","gross_pay","pretax_deductions","taxable_wages",
+    "state_tax_employee","federal_tax_employee","social_security_employee","medicare_employee",
+    "net_pay",
+    "federal_tax_employer","social_security_employer","medicare_employer"
+]
+
+CSV_CHUNK_SIZE = 2000
+
+class _Echo:
+    """File-like object whose write() hands the line back to the caller."""
+    def write(self, value):
+        return value
+
+def _csv_lines(rows):
+    w = csv.writer(_Echo())
+    yield w.writerow(CSV_HEADER)
+    for (employee_id, last_name, first_name, gross, pretax, taxable,
+         state_emp, federal_emp, ss_emp, med_emp, net, federal_er, ss_er, med_er) in rows:
+        yield w.writerow([
+            employee_id,
+            f"{last_name}, {first_name}",
+            gross, pretax, taxable,
+            state_emp, federal_emp, ss_emp, med_emp,
+            net,
+            federal_er, ss_er, med_er
         ])
 
-    resp = HttpResponse(buf.getvalue(), content_type="text/csv")
+@hr_required
+def export_payroll_csv(request, pk: int):
+    """Stream the run as CSV; rows are read in chunks so memory stays flat."""
+    run = get_object_or_404(PayrollRun, pk=pk)
+    if run.archived_at:
+        rows = (
+            (p.employee.employee_id, p.employee.last_name, p.employee.first_name,
+             *(getattr(p, f) for f in CSV_HEADER[2:]))
+            for p in ArchivedPaychecks(run)
+        )
+    else:
+        rows = run.paychecks.order_by("pk").values_list(
+            "employee__employee_id", "employee__last_name", "employee__first_name",
+            "gross_pay", "pretax_deductions", "taxable_wages",
+            "state_tax_employee", "federal_tax_employee", "social_security_employee", "medicare_employee",
+            "net_pay",
+            "federal_tax_employer", "social_security_employer", "medicare_employer",
+        ).iterator(chunk_size=CSV_CHUNK_SIZE)
+
+    resp = StreamingHttpResponse(_csv_lines(rows), content_type="text/csv")
     resp["Content-Disposition"] = f'attachment; filename="payroll_{run.period_start}_{run.period_end}.csv"'
     return resp
+
+@hr_required
+def paycheck_stub_pdf(request, pk: int, paycheck_pk: int):
+    """One paycheck's pay stub, rendered on demand (see payroll/paystubs.py for batches)."""
+    run = get_object_or_404(PayrollRun, pk=pk)
+    if not run.locked:
+        raise Http404("Pay stubs are only issued for locked payroll runs.")
+    if run.archived_at:
+        paycheck = ArchivedPaychecks(run).get(paycheck_pk)
+        if paycheck is None:
+            raise Http404("No such paycheck in this run.")
+    else:
+        paycheck = get_object_or_404(Paycheck.objects.select_related("employee"), pk=paycheck_pk, payroll_run=run)
+        paycheck.payroll_run = run
+    stub = stub_for_paycheck(paycheck)
+    resp = HttpResponse(render_stub(stub), content_type="application/pdf")
+    resp["Content-Disposition"] = f'inline; filename="stub_{paycheck.payroll_run.period_end}_{stub.filename}"'
+    return resp
+
+@hr_required
+def payroll_run_diff(request, pk: int):
+    """Employees added, removed or changed between this run and `?other=<run id>`."""
+    base = get_object_or_404(PayrollRun, pk=pk)
+    other = get_object_or_404(PayrollRun, pk=request.GET.get("other") or 0)
+    if base.archived_at or other.archived_at:
+        messages.error(request, "Archived runs can't be compared; restore them with archive_payroll_runs --restore.")
+        return redirect("payroll_run_detail", pk=base.pk)
+    try:
+        threshold = max(Decimal(request.GET.get("threshold") or "0"), Decimal("0"))
+    except InvalidOperation:
+        threshold = Decimal("0")
+
+    page = Paginator(diff_rows(base, other, threshold), 100).get_page(request.GET.get("page"))
+    rows = [
+        {
+            "employee_id": r["employee__employee_id"],
+            "name": f"{r['employee__last_name']}, {r['employee__first_name']}",
+            "status": row_status(r),
+            "cells": [(r[f"{f}_base"], r[f"{f}_other"], r[f"{f}_delta"]) for f in PAYCHECK_MONEY_FIELDS],
+        }
+        for r in page
+    ]
+    totals = diff_totals(base, other)
+    return render(request, "payroll/run_diff.html", {
+        "base": base,
+        "other": other,
+        "threshold": threshold,
+        "labels": COLUMN_LABELS.values(),
+        "totals": [
+            (label, money(totals[f"{f}_base"]), money(totals[f"{f}_other"]), money(totals[f"{f}_delta"]))
+            for f, label in COLUMN_LABELS.items()
+        ],
+        "employees": (totals["in_base"], totals["in_other"]),
+        "rows": rows,
+        "page_obj": page,
+        "query": urlencode({"other": other.pk, "threshold": threshold}),
+    })
@@ -0,0 +1,133 @@
+"""Year-to-date ledger maintenance.
+
+`apply_run_to_ytd` adds a locked run's paychecks to each employee's
+YearToDate row (called from services.lock_run), so YTD reads are a single
+indexed lookup instead of a sum over every paycheck of the year.
+`rebuild_ytd` recreates the ledger from the paychecks of locked runs, hot or
+archived (backfill or repair); it is exposed as `python manage.py rebuild_ytd`.
+"""
+from __future__ import annotations
+
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractYear
+
+from .archive import archived_totals
+from .models import PAYCHECK_MONEY_FIELDS, Paycheck, PayrollRun, YearToDate
+
+# Bound the IN (...) lists sent to the database.
+YTD_BATCH = 1000
+
+def pay_year(run: PayrollRun) -> int:
+    """The year a run's pay counts toward (the year its period ends in)."""
+    return run.period_end.year
+
+def apply_run_to_ytd(run: PayrollRun) -> int:
+    """Add `run`'s paychecks to the ledger. Call once per run, when it is locked."""
+    year = pay_year(run)
+    paychecks = run.paychecks.order_by("employee_id").values_list("employee_id", *PAYCHECK_MONEY_FIELDS)
+    applied = 0
+    with transaction.atomic():
+        batch = []
+        for row in paychecks.iterator(chunk_size=YTD_BATCH):
+            batch.append(row)
+            if len(batch) == YTD_BATCH:
+                applied += _apply_batch(year, batch)
+                batch = []
+        if batch:
+            applied += _apply_batch(year, batch)
+    return applied
+
+def _apply_batch(year: int, rows) -> int:
+    """Add paycheck rows to the ledger with additive upserts.
+
+    `INSERT ... ON CONFLICT (employee_id, year) DO UPDATE SET col = col +
+    excluded.col` (SQLite and PostgreSQL) adds in the database, so the rows
+    are never read into Python and a concurrent lock_run adding to the same
+    employees can't overwrite this one's totals.
+    """
+    table = connection.ops.quote_name(YearToDate._meta.db_table)
+    names = ["employee_id", "year", "paychecks", *PAYCHECK_MONEY_FIELDS]
+    columns = [connection.ops.quote_name(YearToDate._meta.get_field(n).column) for n in names]
+    additive = ", ".join(f"{c} = {table}.{c} + excluded.{c}" for c in columns[2:])
+    per_statement = min(len(rows), (connection.features.max_query_params or YTD_BATCH * len(names)) // len(names))
+    with connection.cursor() as cursor:
+        for i in range(0, len(rows), per_statement):
+            chunk = rows[i:i + per_statement]
+            values = ", ".join(["(" + ", ".join(["%s"] * len(names)) + ")"] * len(chunk))
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES {values} "
+                f"ON CONFLICT ({columns[0]}, {columns[1]}) DO UPDATE SET {additive}",
+                [v for employee_id, *amounts in chunk for v in (employee_id, year, 1, *amounts)],
+            )
+    return len(rows)
+
+def rebuild_ytd(year: int | None = None) -> int:
+    """Recreate the ledger (one year, or all) from locked runs. Returns rows written.
+
+    Hot paychecks are summed in the database; archived runs are added from
+    their archive files.
+    """
+    runs = PayrollRun.objects.filter(locked=True)
+    paychecks = Paycheck.objects.filter(payroll_run__locked=True)
+    ledger = YearToDate.objects.all()
+    if year is not None:
+        runs = runs.filter(period_end__year=year)
+        paychecks = paychecks.filter(payroll_run__period_end__year=year)
+        ledger = ledger.filter(year=year)
+
+    archived = {}
+    for y in runs.filter(archived_at__isnull=False).dates("period_end", "year"):
+        for employee_id, totals in archived_totals(runs.filter(period_end__year=y.year)).items():
+            archived[(employee_id, y.year)] = totals
+
+    groups = (
+        paychecks.annotate(year=ExtractYear("payroll_run__period_end"))
+        .values("employee_id", "year")
+        .annotate(n=Count("pk"), **{f: Sum(f) for f in PAYCHECK_MONEY_FIELDS})
+        .order_by("employee_id", "year")
+    )
+    written = 0
+    with transaction.atomic():
+        ledger.delete()
+        batch = []
+
+        def add(row):
+            nonlocal batch, written
+            batch.append(row)
+            if len(batch) == YTD_BATCH:
+                YearToDate.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+
+        for g in groups.iterator(chunk_size=YTD_BATCH):
+            row = YearToDate(
+                employee_id=g["employee_id"], year=g["year"], paychecks=g["n"],
+                # SQLite sums come back with extra decimal places.
+                **{f: Decimal(g[f]).quantize(Decimal("0.01")) for f in PAYCHECK_MONEY_FIELDS},
+            )
+            extra = archived.pop((row.employee_id, row.year), None)
+            if extra:
+                row.paychecks += extra["paychecks"]
+                for f in PAYCHECK_MONEY_FIELDS:
+                    setattr(row, f, getattr(row, f) + extra[f])
+            add(row)
+        for (employee_id, y), extra in archived.items():
+            add(YearToDate(employee_id=employee_id, year=y, **extra))
+        YearToDate.objects.bulk_create(batch)
+        written += len(batch)
+    return written
+
+def ytd_for(employee_id: int, year: int) -> YearToDate:
+    """The employee's ledger row for `year` (an unsaved zero row if there is none)."""
+    return YearToDate.objects.filter(employee_id=employee_id, year=year).first() or YearToDate(
+        employee_id=employee_id, year=year
+    )
+
+def ytd_many(employee_ids, year: int) -> dict[int, YearToDate]:
+    """{employee pk: YearToDate} for many employees in one query; missing ones are zero rows."""
+    employee_ids = list(employee_ids)
+    found = {y.employee_id: y for y in YearToDate.objects.filter(year=year, employee_id__in=employee_ids)}
+    return {e: found.get(e) or YearToDate(employee_id=e, year=year) for e in employee_ids}
@@ -0,0 +1,70 @@
+"""Database profiles, selected with DJANGO_DB_PROFILE.
+
+- "sqlite" (default): the project's SQLite file, tuned for many concurrent
+  writers. WAL lets readers run alongside the single writer, synchronous=NORMAL
+  is durable under WAL while skipping an fsync per commit, busy_timeout makes
+  a blocked writer wait instead of failing with "database is locked", and
+  IMMEDIATE transactions take the write lock up front, so two transactions
+  can't deadlock while upgrading from read to write locks. Connections are
+  kept for CONN_MAX_AGE seconds instead of being opened per request.
+- "sqlite-default": SQLite with Django's stock settings (for comparison).
+- "postgres": PostgreSQL with persistent connections (CONN_MAX_AGE plus
+  health checks).
+- "postgres-pool": PostgreSQL through psycopg's connection pool. Needs
+  `pip install "psycopg[binary,pool]"`.
+
+Connection details come from the environment: DJANGO_DB_NAME (SQLite file
+or PostgreSQL database), DJANGO_DB_USER, DJANGO_DB_PASSWORD, DJANGO_DB_HOST,
+DJANGO_DB_PORT, DJANGO_CONN_MAX_AGE, DJANGO_DB_POOL_SIZE.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+PROFILES = ("sqlite", "sqlite-default", "postgres", "postgres-pool")
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 20000,  # ms
+    "cache_size": -32000,  # negative = KiB, i.e. 32 MB per connection
+    "temp_store": "MEMORY",
+}
+
+def database_config(profile: str, base_dir: Path, env=os.environ) -> dict:
+    """settings.DATABASES["default"] for `profile`."""
+    conn_max_age = int(env.get("DJANGO_CONN_MAX_AGE", "60"))
+
+    if profile in ("sqlite", "sqlite-default"):
+        config = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": env.get("DJANGO_DB_NAME") or base_dir / "db.sqlite3",
+        }
+        if profile == "sqlite":
+            config["CONN_MAX_AGE"] = conn_max_age
+            config["OPTIONS"] = {
+                "init_command": ";".join(f"PRAGMA {k}={v}" for k, v in SQLITE_PRAGMAS.items()),
+                "transaction_mode": "IMMEDIATE",
+            }
+        return config
+
+    if profile in ("postgres", "postgres-pool"):
+        config = {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": env.get("DJANGO_DB_NAME", "payroll"),
+            "USER": env.get("DJANGO_DB_USER", "payroll"),
+            "PASSWORD": env.get("DJANGO_DB_PASSWORD", ""),
+            "HOST": env.get("DJANGO_DB_HOST", "localhost"),
+            "PORT": env.get("DJANGO_DB_PORT", "5432"),
+        }
+        if profile == "postgres":
+            config["CONN_MAX_AGE"] = conn_max_age
+            config["CONN_HEALTH_CHECKS"] = True
+        else:
+            # The pool replaces persistent connections (Django requires CONN_MAX_AGE = 0).
+            pool_size = int(env.get("DJANGO_DB_POOL_SIZE", "10"))
+            config["OPTIONS"] = {"pool": {"min_size": 2, "max_size": pool_size, "timeout": 10}}
+        return config
+
+    raise ValueError(f"Unknown DJANGO_DB_PROFILE {profile!r} (use one of {', '.join(PROFILES)}).")
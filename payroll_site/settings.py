@@ -13,6 +13,8 @@ from pathlib import Path
 import os
 from dotenv import load_dotenv
 
+from payroll_site.database import database_config
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 # Load variables from .env file if present (local dev convenience).
@@ -72,6 +74,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "accounts.middleware.EmployeeMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -96,11 +99,9 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "payroll_site.wsgi.application"
 
+# See payroll_site/database.py for the profiles (SQLite tuned/stock, PostgreSQL persistent/pooled).
 DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+    "default": database_config(os.getenv("DJANGO_DB_PROFILE", "sqlite"), BASE_DIR),
 }
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -124,6 +125,32 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Sharded payroll runs (payroll/sharding.py). 0 workers = one per CPU core.
+PAYROLL_SHARD_WORKERS = int(os.getenv("PAYROLL_SHARD_WORKERS", "0")) or None
+PAYROLL_SHARD_SIZE = int(os.getenv("PAYROLL_SHARD_SIZE", "2000"))
+
+# Background payroll jobs (payroll/jobs.py): "thread" runs them inside the web
+# process; "command" leaves them for `python manage.py run_payroll_jobs`.
+PAYROLL_JOB_RUNNER = os.getenv("PAYROLL_JOB_RUNNER", "thread")
+# A RUNNING job with no progress committed for this many seconds is treated as
+# abandoned by its worker and may be resumed.
+PAYROLL_JOB_STALE_AFTER = int(os.getenv("PAYROLL_JOB_STALE_AFTER", "900"))
+
+# Cold archive (payroll/archive.py): `archive_payroll_runs` moves the paychecks
+# of locked runs that ended more than this many days ago into files here.
+PAYROLL_ARCHIVE_DIR = os.getenv("PAYROLL_ARCHIVE_DIR", str(BASE_DIR / "archive"))
+PAYROLL_ARCHIVE_AFTER_DAYS = int(os.getenv("PAYROLL_ARCHIVE_AFTER_DAYS", "730"))
+
+# Printed on pay stubs (payroll/paystubs.py).
+PAYSTUB_COMPANY_NAME = os.getenv("PAYSTUB_COMPANY_NAME", "ABC Company")
+
+# request.employee (accounts/middleware.py) is cached per user for this many
+# seconds; 0 looks it up once per request instead. Only enable it with a cache
+# shared by all workers: invalidation clears the entry in this process's cache,
+# and the default local-memory cache would keep serving a stale Employee
+# (used for authorization) in every other worker.
+EMPLOYEE_CACHE_TIMEOUT = int(os.getenv("EMPLOYEE_CACHE_TIMEOUT", "0"))
+
 LOGIN_URL = "login"
 LOGIN_REDIRECT_URL = "dashboard"
 LOGOUT_REDIRECT_URL = "login"
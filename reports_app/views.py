@@ -1,9 +1,44 @@
 from __future__ import annotations
+from django.db.models import Count, Sum
 from django.shortcuts import render
 from accounts.decorators import hr_required
-from payroll.models import PayrollRun
+from django.utils import timezone
+from payroll.models import PAYCHECK_MONEY_FIELDS, PayrollRun, PayrollRunSummary, YearToDate
+from payroll.services import with_summary
+from timeentry.models import WeeklyHours
 
 @hr_required
 def reports_home(request):
-    runs = PayrollRun.objects.all()[:10]
-    return render(request, "reports/reports_home.html", {"runs": runs})
+    # Run totals come from the summary rows written when each run was locked.
+    runs = with_summary(PayrollRun.objects.all())[:24]
+    latest = PayrollRun.objects.filter(locked=True, summaries__isnull=False).order_by("-calculated_at").first()
+    by_department = (
+        PayrollRunSummary.objects.filter(payroll_run=latest).exclude(department="")
+        .values("department")
+        .annotate(employees=Sum("employees"), gross=Sum("gross_pay"), net=Sum("net_pay"))
+        .order_by("department")
+    ) if latest else []
+    # Read the pre-aggregated rollup rather than scanning TimeEntry.
+    weekly_hours = (
+        WeeklyHours.objects.values("week_start")
+        .annotate(
+            employees=Count("employee"),
+            regular=Sum("regular_hours"),
+            overtime=Sum("overtime_hours"),
+            pto=Sum("pto_hours"),
+        )
+        .order_by("-week_start")[:8]
+    )
+    year = timezone.localdate().year
+    # Company-wide year to date, from the per-employee ledger.
+    ytd = YearToDate.objects.filter(year=year).aggregate(
+        employees=Count("pk"), **{f: Sum(f) for f in PAYCHECK_MONEY_FIELDS}
+    )
+    return render(request, "reports/reports_home.html", {
+        "year": year,
+        "ytd": ytd,
+        "runs": runs,
+        "latest": latest,
+        "by_department": by_department,
+        "weekly_hours": weekly_hours,
+    })
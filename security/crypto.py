@@ -1,22 +1,92 @@
+"""Field encryption helpers (Fernet).
+
+Keys come from the environment:
+- DJANGO_FERNET_KEYS: comma-separated keys, newest first. The first key
+  encrypts; every key can decrypt. This is how keys are rotated.
+- DJANGO_FERNET_KEY: a single key (used when DJANGO_FERNET_KEYS is unset).
+
+The key ring is built once and cached; call `reset_keyring()` after changing
+the environment.
+"""
 import os
-from cryptography.fernet import Fernet, InvalidToken
+from functools import lru_cache
+
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+
+def configured_keys() -> list[str]:
+    """Configured keys, newest (encrypting) first."""
+    keys = [k.strip() for k in os.getenv("DJANGO_FERNET_KEYS", "").split(",") if k.strip()]
+    if not keys and os.getenv("DJANGO_FERNET_KEY"):
+        keys = [os.getenv("DJANGO_FERNET_KEY")]
+    if not keys:
+        raise RuntimeError("DJANGO_FERNET_KEYS / DJANGO_FERNET_KEY is not set")
+    return keys
+
+@lru_cache(maxsize=1)
+def _keyring() -> tuple[MultiFernet, Fernet]:
+    """(ring of all keys, primary key)."""
+    fernets = [Fernet(k.encode()) for k in configured_keys()]
+    return MultiFernet(fernets), fernets[0]
 
-def _fernet() -> Fernet:
-    key = os.getenv("DJANGO_FERNET_KEY")
-    if not key:
-        raise RuntimeError("DJANGO_FERNET_KEY is not set")
-    return Fernet(key.encode())
+def reset_keyring() -> None:
+    _keyring.cache_clear()
 
 def encrypt_str(value: str) -> str:
     if value is None:
         return ""
-    return _fernet().encrypt(value.encode("utf-8")).decode("utf-8")
+    ring, _ = _keyring()
+    return ring.encrypt(value.encode("utf-8")).decode("utf-8")
 
 def decrypt_str(token: str) -> str:
     if not token:
         return ""
+    ring, _ = _keyring()
     try:
-        return _fernet().decrypt(token.encode("utf-8")).decode("utf-8")
+        return ring.decrypt(token.encode("utf-8")).decode("utf-8")
     except InvalidToken:
         # Don’t leak details
         return ""
+
+def encrypt_many(values) -> list[str]:
+    """encrypt_str for many values, sharing one key ring lookup."""
+    ring, _ = _keyring()
+    return ["" if v is None else ring.encrypt(v.encode("utf-8")).decode("utf-8") for v in values]
+
+def decrypt_many(tokens) -> list[str]:
+    """decrypt_str for many tokens; undecryptable tokens come back as ""."""
+    ring, _ = _keyring()
+    out = []
+    for token in tokens:
+        if not token:
+            out.append("")
+            continue
+        try:
+            out.append(ring.decrypt(token.encode("utf-8")).decode("utf-8"))
+        except InvalidToken:
+            out.append("")
+    return out
+
+def rotate_tokens(rows):
+    """Re-encrypt (key, token) pairs under the primary key.
+
+    Returns (updates, unreadable): `updates` is [(key, new_token)] for tokens
+    that were under an older key; tokens already under the primary key (or
+    empty) are left out; `unreadable` lists keys no key in the ring can
+    decrypt. Module-level so a process pool can call it.
+    """
+    ring, primary = _keyring()
+    updates, unreadable = [], []
+    for key, token in rows:
+        if not token:
+            continue
+        raw = token.encode("utf-8")
+        try:
+            primary.decrypt(raw)
+            continue
+        except InvalidToken:
+            pass
+        try:
+            updates.append((key, ring.rotate(raw).decode("utf-8")))
+        except InvalidToken:
+            unreadable.append(key)
+    return updates, unreadable
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from security.crypto import configured_keys, reset_keyring, rotate_tokens
+from security.models import EncryptedEmployeeNote
+
+class Command(BaseCommand):
+    help = (
+        "Re-encrypt every EncryptedEmployeeNote under the newest key. Put the new key first in "
+        "DJANGO_FERNET_KEYS and keep the old ones after it until this finishes. Notes are streamed "
+        "in pk order and committed per chunk; --checkpoint lets an interrupted run resume."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--workers", type=int, default=0,
+                            help="Re-encrypt in a process pool with this many workers (0 = in-process).")
+        parser.add_argument("--checkpoint", help="JSON file recording the last committed pk; resumes from it.")
+
+    def handle(self, *args, **opts):
+        reset_keyring()
+        try:
+            keys = configured_keys()
+        except RuntimeError as ex:
+            raise CommandError(str(ex))
+        if len(keys) < 2:
+            self.stdout.write(self.style.WARNING("Only one key configured; nothing older to rotate from."))
+
+        state = {"last_pk": 0, "rotated": 0, "unreadable": []}
+        path = opts["checkpoint"]
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as fh:
+                state.update(json.load(fh))
+            self.stdout.write(f"Resuming after pk {state['last_pk']}.")
+
+        chunk_size = opts["chunk_size"]
+        started = time.perf_counter()
+        scanned = 0
+
+        def chunks():
+            last_pk = state["last_pk"]
+            while True:
+                rows = list(
+                    EncryptedEmployeeNote.objects.filter(pk__gt=last_pk)
+                    .order_by("pk").values_list("pk", "note_encrypted")[:chunk_size]
+                )
+                if not rows:
+                    return
+                last_pk = rows[-1][0]
+                yield rows
+
+        def commit(rows, updates, unreadable):
+            nonlocal scanned
+            with transaction.atomic():
+                EncryptedEmployeeNote.objects.bulk_update(
+                    [EncryptedEmployeeNote(pk=pk, note_encrypted=token) for pk, token in updates],
+                    ["note_encrypted"], batch_size=chunk_size,
+                )
+            scanned += len(rows)
+            state["last_pk"] = rows[-1][0]
+            state["rotated"] += len(updates)
+            state["unreadable"].extend(unreadable)
+            if path:
+                with open(path, "w", encoding="utf-8") as fh:
+                    json.dump(state, fh)
+            self.stdout.write(f"  through pk {state['last_pk']}: {scanned} scanned, {state['rotated']} rotated")
+
+        if opts["workers"] > 0:
+            # Keep a bounded number of chunks in flight so memory stays flat,
+            # and commit them in pk order so the checkpoint is always safe.
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=opts["workers"], mp_context=ctx) as pool:
+                pending = deque()
+                for rows in chunks():
+                    pending.append((rows, pool.submit(rotate_tokens, rows)))
+                    if len(pending) >= 2 * opts["workers"]:
+                        rows, future = pending.popleft()
+                        commit(rows, *future.result())
+                while pending:
+                    rows, future = pending.popleft()
+                    commit(rows, *future.result())
+        else:
+            for rows in chunks():
+                commit(rows, *rotate_tokens(rows))
+
+        seconds = time.perf_counter() - started
+        if state["unreadable"]:
+            self.stdout.write(self.style.ERROR(
+                f"{len(state['unreadable'])} notes could not be decrypted with any configured key "
+                f"(pks: {', '.join(map(str, state['unreadable'][:20]))}{' ...' if len(state['unreadable']) > 20 else ''})."
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f"Rotated {state['rotated']} notes ({scanned} scanned this run) in {seconds:.1f}s."
+        ))
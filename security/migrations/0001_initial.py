@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('employees', '0004_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EncryptedEmployeeNote',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('note_encrypted', models.TextField(blank=True, default='')),
+                ('employee', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='secure_note', to='employees.employee')),
+            ],
+        ),
+    ]
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class TimeentryConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "timeentry"
+
+    def ready(self):
+        from . import signals  # noqa
@@ -0,0 +1,161 @@
+"""Bulk time entry import (CSV or JSON Lines).
+
+Clock exports arrive as one row per employee and day:
+
+    employee_id,work_date,hours_worked,pto_hours
+    E1001,2025-12-08,8.5,0
+
+Rows are read as a stream and processed in chunks. Each chunk resolves its
+employees and existing entries with one query each, applies the same rules as
+TimeEntry.clean (`entry_rule_error`), and upserts the valid rows with a single
+bulk_create(update_conflicts=True). Bad rows are collected in the report with
+their line number; they never abort the file.
+
+bulk_create skips model signals, so each chunk refreshes the WeeklyHours
+rollup and journals pay input changes itself.
+"""
+from __future__ import annotations
+
+import csv
+import json
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from employees.models import Employee
+from payroll.recalculation import record_pay_input_changes
+from .models import TimeEntry, entry_rule_error
+from .rollup import refresh_weekly_hours, week_start
+
+IMPORT_CHUNK_SIZE = 2000
+# TimeEntry hours are DecimalField(max_digits=5, decimal_places=2).
+MAX_HOURS = Decimal("1000")
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    # (line number, employee_id, message)
+    errors: list[tuple[int, str, str]] = field(default_factory=list)
+
+    @property
+    def imported(self) -> int:
+        return self.created + self.updated
+
+    def write_errors_csv(self, fh) -> None:
+        w = csv.writer(fh)
+        w.writerow(["line", "employee_id", "error"])
+        w.writerows(self.errors)
+
+def read_rows(fh, fmt: str):
+    """Yield (line number, row dict) from a text file of CSV (with header) or JSON Lines."""
+    if fmt == "csv":
+        reader = csv.DictReader(fh)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == "jsonl":
+        for line_no, line in enumerate(fh, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_no, row if isinstance(row, dict) else {"_error": "Not a JSON object."}
+    else:
+        raise ValueError(f"Unknown import format {fmt!r} (use csv or jsonl).")
+
+def _parse(row: dict):
+    """(employee_id, work_date, hours_worked, pto_hours) or raise ValueError."""
+    if "_error" in row:
+        raise ValueError(row["_error"])
+    employee_id = str(row.get("employee_id") or "").strip()
+    if not employee_id:
+        raise ValueError("employee_id is required.")
+    try:
+        work_date = date.fromisoformat(str(row.get("work_date") or "").strip())
+    except ValueError:
+        raise ValueError("work_date must be YYYY-MM-DD.")
+    try:
+        hours = Decimal(str(row.get("hours_worked") or "0").strip())
+        pto = Decimal(str(row.get("pto_hours") or "0").strip())
+    except InvalidOperation:
+        raise ValueError("hours_worked and pto_hours must be numbers.")
+    for value in (hours, pto):
+        # Bound first: rounding a huge value raises InvalidOperation, not ValueError.
+        if not value.is_finite() or abs(value) >= MAX_HOURS:
+            raise ValueError(f"Hours must be numbers below {MAX_HOURS}.")
+        if value != round(value, 2):
+            raise ValueError("Hours must have at most 2 decimal places.")
+    return employee_id, work_date, hours, pto
+
+def import_time_entries(rows, chunk_size: int = IMPORT_CHUNK_SIZE, submitted: bool = False) -> ImportReport:
+    """Import (line number, row dict) pairs; see read_rows."""
+    report = ImportReport()
+    chunk = []
+    for line_no, row in rows:
+        report.rows += 1
+        try:
+            chunk.append((line_no, *_parse(row)))
+        except ValueError as ex:
+            report.errors.append((line_no, str((row or {}).get("employee_id", "")), str(ex)))
+        if len(chunk) >= chunk_size:
+            _import_chunk(chunk, report, submitted)
+            chunk = []
+    if chunk:
+        _import_chunk(chunk, report, submitted)
+    report.errors.sort()
+    return report
+
+def _import_chunk(chunk, report: ImportReport, submitted: bool) -> None:
+    employees = {
+        emp_id: (pk, pay_type)
+        for emp_id, pk, pay_type in Employee.objects.filter(
+            employee_id__in={c[1] for c in chunk}
+        ).values_list("employee_id", "pk", "pay_type")
+    }
+
+    with transaction.atomic():
+        pks = {employees[c[1]][0] for c in chunk if c[1] in employees}
+        dates = {c[2] for c in chunk}
+        # Lock existing rows so payroll can't lock them between the check and the upsert.
+        existing = {
+            (e, d): locked
+            for e, d, locked in TimeEntry.objects.select_for_update()
+            .filter(employee_id__in=pks, work_date__in=dates)
+            .values_list("employee_id", "work_date", "locked")
+        }
+
+        # Later rows for the same employee and day win.
+        valid = {}
+        for line_no, emp_id, work_date, hours, pto in chunk:
+            if emp_id not in employees:
+                report.errors.append((line_no, emp_id, "Unknown employee_id."))
+                continue
+            pk, pay_type = employees[emp_id]
+            error = entry_rule_error(pay_type, hours, pto, existing.get((pk, work_date), False))
+            if error:
+                report.errors.append((line_no, emp_id, error))
+                continue
+            valid[(pk, work_date)] = TimeEntry(
+                employee_id=pk, work_date=work_date, hours_worked=hours, pto_hours=pto, submitted=submitted
+            )
+
+        if not valid:
+            return
+        # Without --submitted, existing entries keep their submitted flag.
+        TimeEntry.objects.bulk_create(
+            valid.values(),
+            update_conflicts=True,
+            unique_fields=["employee", "work_date"],
+            update_fields=["hours_worked", "pto_hours", *(["submitted"] if submitted else [])],
+        )
+        refresh_weekly_hours({(pk, week_start(d)) for pk, d in valid})
+        record_pay_input_changes(valid.keys())
+
+    updated = sum(1 for key in valid if key in existing)
+    report.updated += updated
+    report.created += len(valid) - updated
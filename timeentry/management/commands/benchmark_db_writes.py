@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connection, connections
+
+from employees.models import Employee
+from employees.synthetic import delete_synthetic, generate_synthetic
+from payroll_site.database import PROFILES
+from timeentry.models import TimeEntry
+
+BENCH_PREFIX = "DBW"
+FIRST_WEEK = date(2002, 1, 7)
+
+class Command(BaseCommand):
+    help = (
+        "Measure concurrent TimeEntry save throughput under each database profile "
+        "(payroll_site/database.py). Each profile runs in its own process. SQLite profiles use a "
+        "fresh temporary database; PostgreSQL profiles use the configured database, so point "
+        "DJANGO_DB_* at a scratch one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profiles", default="sqlite-default,sqlite",
+                            help=f"Comma-separated profiles ({', '.join(PROFILES)}).")
+        parser.add_argument("--writers", type=int, default=8, help="Concurrent writer threads.")
+        parser.add_argument("--saves", type=int, default=200, help="TimeEntry saves per writer.")
+        parser.add_argument("--output", help="Also write the results as JSON to this file.")
+        parser.add_argument("--worker", action="store_true", help="(internal) run one profile in this process.")
+
+    def handle(self, *args, **opts):
+        if opts["worker"]:
+            self.stdout.write(json.dumps(self._run_writers(opts["writers"], opts["saves"])))
+            return
+
+        results = []
+        for profile in [p.strip() for p in opts["profiles"].split(",") if p.strip()]:
+            if profile not in PROFILES:
+                raise CommandError(f"Unknown profile {profile!r}.")
+            self.stderr.write(f"{profile}: {opts['writers']} writers x {opts['saves']} saves...")
+            with tempfile.TemporaryDirectory() as tmp:
+                env = dict(os.environ, DJANGO_DB_PROFILE=profile)
+                if profile.startswith("sqlite"):
+                    env["DJANGO_DB_NAME"] = os.path.join(tmp, "bench.sqlite3")
+                proc = subprocess.run(
+                    [sys.executable, str(settings.BASE_DIR / "manage.py"), "benchmark_db_writes", "--worker",
+                     "--writers", str(opts["writers"]), "--saves", str(opts["saves"])],
+                    env=env, capture_output=True, text=True,
+                )
+            if proc.returncode != 0:
+                raise CommandError(f"{profile} failed:\n{proc.stderr}")
+            result = {"profile": profile, **json.loads(proc.stdout.strip().splitlines()[-1])}
+            results.append(result)
+
+        self.stdout.write(f"{'profile':<16}{'writers':>8}{'saved':>8}{'errors':>8}{'seconds':>10}{'saves/s':>10}")
+        for r in results:
+            self.stdout.write(
+                f"{r['profile']:<16}{r['writers']:>8}{r['saved']:>8}{r['errors']:>8}"
+                f"{r['seconds']:>10.2f}{r['saves_per_second']:>10.1f}"
+            )
+        if opts["output"]:
+            with open(opts["output"], "w", encoding="utf-8") as fh:
+                json.dump(results, fh, indent=2)
+
+    def _run_writers(self, writers: int, saves: int) -> dict:
+        """Run in the worker process: `writers` threads each saving `saves` entries."""
+        if connection.vendor == "sqlite":
+            call_command("migrate", run_syncdb=True, verbosity=0)
+        delete_synthetic(BENCH_PREFIX)
+        generate_synthetic(writers, 1, FIRST_WEEK, prefix=BENCH_PREFIX, dob_pool=1)
+        employees = list(Employee.objects.filter(employee_id__startswith=BENCH_PREFIX).order_by("employee_id"))
+        connections.close_all()
+
+        start = threading.Barrier(writers + 1)
+        saved, errors = [0] * writers, [0] * writers
+
+        def writer(i: int) -> None:
+            # Each writer is one user saving one day at a time, like the time entry form;
+            # each save is one "request", so the connection is handled as at request end.
+            emp = employees[i]
+            start.wait()
+            try:
+                for k in range(saves):
+                    entry = TimeEntry(
+                        employee=emp,
+                        work_date=FIRST_WEEK + timedelta(days=7 + k),
+                        hours_worked=Decimal("0") if emp.pay_type == "SALARY" else Decimal("8"),
+                        pto_hours=Decimal("8") if emp.pay_type == "SALARY" else Decimal("0"),
+                    )
+                    try:
+                        entry.save()
+                        saved[i] += 1
+                    except OperationalError:
+                        # "database is locked" and friends; the request would have failed.
+                        errors[i] += 1
+                    close_old_connections()
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+        for t in threads:
+            t.start()
+        start.wait()
+        t0 = time.perf_counter()
+        for t in threads:
+            t.join()
+        seconds = time.perf_counter() - t0
+
+        delete_synthetic(BENCH_PREFIX)
+        return {
+            "writers": writers,
+            "saved": sum(saved),
+            "errors": sum(errors),
+            "seconds": round(seconds, 3),
+            "saves_per_second": round(sum(saved) / seconds, 1) if seconds else 0.0,
+            "settings": {k: v for k, v in connection.settings_dict.items() if k in ("CONN_MAX_AGE", "OPTIONS")},
+        }
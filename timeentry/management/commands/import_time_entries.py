@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from timeentry.importer import IMPORT_CHUNK_SIZE, import_time_entries, read_rows
+
+class Command(BaseCommand):
+    help = (
+        "Import time entries from a CSV (employee_id,work_date,hours_worked,pto_hours) or JSON Lines "
+        "file. Existing entries for the same employee and day are updated; invalid rows are reported."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - for stdin.")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Default: from the file extension.")
+        parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+        parser.add_argument("--submitted", action="store_true", help="Mark imported entries as submitted.")
+        parser.add_argument("--errors", help="Write rejected rows to this CSV file.")
+
+    def handle(self, *args, **opts):
+        path = opts["path"]
+        fmt = opts["format"] or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+
+        t0 = time.perf_counter()
+        try:
+            fh = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8-sig")
+        except OSError as ex:
+            raise CommandError(str(ex))
+        with fh:
+            report = import_time_entries(
+                read_rows(fh, fmt), chunk_size=opts["chunk_size"], submitted=opts["submitted"]
+            )
+        seconds = time.perf_counter() - t0
+
+        if opts["errors"]:
+            with open(opts["errors"], "w", newline="", encoding="utf-8") as out:
+                report.write_errors_csv(out)
+        else:
+            for line_no, employee_id, message in report.errors[:50]:
+                self.stdout.write(self.style.ERROR(f"  line {line_no} ({employee_id or '?'}): {message}"))
+            if len(report.errors) > 50:
+                self.stdout.write(f"  ... {len(report.errors) - 50} more (use --errors FILE for all).")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{report.rows} rows: {report.created} created, {report.updated} updated, "
+            f"{len(report.errors)} rejected in {seconds:.1f}s ({report.rows / max(seconds, 1e-9):.0f} rows/s)."
+        ))
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from timeentry.rollup import rebuild_weekly_hours
+
+class Command(BaseCommand):
+    help = "Rebuild the WeeklyHours rollup table from all time entries (backfill/repair)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Rows read and written per batch.")
+
+    def handle(self, *args, **opts):
+        t0 = time.perf_counter()
+        written = rebuild_weekly_hours(chunk_size=opts["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {written} weekly rollup rows in {time.perf_counter() - t0:.1f}s."
+        ))
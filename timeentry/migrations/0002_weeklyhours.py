@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:02
+
+from datetime import timedelta
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_weekly_hours(apps, schema_editor):
+    # The overtime rules as of this migration (timeentry.rollup), inlined so
+    # later changes to the live code don't change what this backfill writes.
+    TimeEntry = apps.get_model("timeentry", "TimeEntry")
+    WeeklyHours = apps.get_model("timeentry", "WeeklyHours")
+    zero, eight = Decimal("0"), Decimal("8")
+    totals = {}
+    rows = TimeEntry.objects.order_by().values_list("employee_id", "work_date", "hours_worked", "pto_hours")
+    for employee_id, work_date, hours_worked, pto_hours in rows.iterator():
+        week_start = work_date - timedelta(days=work_date.weekday())
+        t = totals.setdefault((employee_id, week_start), [zero, zero, zero])
+        if work_date.weekday() == 5:  # any hours on Saturday are overtime
+            regular, overtime = zero, hours_worked
+        elif hours_worked > eight:
+            regular, overtime = eight, hours_worked - eight
+        else:
+            regular, overtime = hours_worked, zero
+        t[0] += regular
+        t[1] += overtime
+        t[2] += pto_hours
+    WeeklyHours.objects.bulk_create(
+        [
+            WeeklyHours(employee_id=e, week_start=ws, regular_hours=r, overtime_hours=o, pto_hours=p)
+            for (e, ws), (r, o, p) in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0002_alter_employee_first_name_alter_employee_last_name'),
+        ('timeentry', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeeklyHours',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week_start', models.DateField(help_text='Monday of the ISO week.')),
+                ('regular_hours', models.DecimalField(decimal_places=2, default=0, max_digits=7)),
+                ('overtime_hours', models.DecimalField(decimal_places=2, default=0, max_digits=7)),
+                ('pto_hours', models.DecimalField(decimal_places=2, default=0, max_digits=7)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weekly_hours', to='employees.employee')),
+            ],
+            options={
+                'ordering': ['-week_start'],
+                'unique_together': {('employee', 'week_start')},
+            },
+        ),
+        migrations.RunPython(backfill_weekly_hours, migrations.RunPython.noop),
+    ]
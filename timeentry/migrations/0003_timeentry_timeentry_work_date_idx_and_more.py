@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0003_employee_employee_name_idx'),
+        ('timeentry', '0002_weeklyhours'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='timeentry',
+            index=models.Index(fields=['work_date'], name='timeentry_work_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='weeklyhours',
+            index=models.Index(fields=['week_start'], name='weeklyhours_week_start_idx'),
+        ),
+    ]
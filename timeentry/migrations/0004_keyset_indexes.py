@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0004_keyset_indexes'),
+        ('timeentry', '0003_timeentry_timeentry_work_date_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='timeentry',
+            name='timeentry_work_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='timeentry',
+            index=models.Index(fields=['work_date', 'id'], name='timeentry_work_date_id_idx'),
+        ),
+    ]
@@ -9,6 +9,7 @@ The locking requirement ("no updates after payroll is calculated") is handled by
 - PayrollRun.locked flag (see payroll app)
 - TimeEntry.locked flag, set when a PayrollRun is created
 
+WeeklyHours is an incrementally maintained rollup of TimeEntry per ISO week.
 """
 from __future__ import annotations
 from datetime import date
@@ -17,6 +18,33 @@ from django.core.exceptions import ValidationError
 from django.db import models
 from employees.models import Employee, PayType
 
+def entry_rule_error(pay_type: str, hours_worked: Decimal, pto_hours: Decimal, locked: bool = False) -> str | None:
+    """The first time entry rule a day's hours break, or None if they are valid.
+
+    Shared by TimeEntry.clean and the bulk importer (timeentry/importer.py).
+    """
+    if locked:
+        return "This time entry is locked (payroll already calculated)."
+
+    if hours_worked < 0 or pto_hours < 0:
+        return "Hours cannot be negative."
+
+    # Basic sanity check as suggested in the prompt (e.g. 80 hours in a week looks unusual).
+    if hours_worked > 24:
+        return "Hours for a single day cannot exceed 24."
+
+    # Enforce salary/hourly rules.
+    if pay_type == PayType.SALARY:
+        if hours_worked != 0:
+            return "Salary employees should not enter daily hours. Only PTO is allowed."
+        if pto_hours > 8:
+            return "PTO hours per day should not exceed 8."
+    else:
+        # Hourly: PTO allowed, but total should still be reasonable.
+        if hours_worked + pto_hours > 24:
+            return "Total hours (worked + PTO) cannot exceed 24 in a day."
+    return None
+
 class TimeEntry(models.Model):
     employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="time_entries")
     work_date = models.DateField()
@@ -29,28 +57,39 @@ class TimeEntry(models.Model):
     class Meta:
         unique_together = ("employee", "work_date")
         ordering = ["-work_date"]
+        indexes = [
+            # Period scans (payroll lock UPDATE, batch hour loads) and the keyset-paginated list.
+            models.Index(fields=["work_date", "id"], name="timeentry_work_date_id_idx"),
+        ]
 
     def clean(self):
-        if self.locked:
-            raise ValidationError("This time entry is locked (payroll already calculated).")
-
-        if self.hours_worked < 0 or self.pto_hours < 0:
-            raise ValidationError("Hours cannot be negative.")
-
-        # Basic sanity check as suggested in the prompt (e.g. 80 hours in a week looks unusual).
-        if self.hours_worked > 24:
-            raise ValidationError("Hours for a single day cannot exceed 24.")
-
-        # Enforce salary/hourly rules.
-        if self.employee.pay_type == PayType.SALARY:
-            if self.hours_worked != 0:
-                raise ValidationError("Salary employees should not enter daily hours. Only PTO is allowed.")
-            if self.pto_hours > 8:
-                raise ValidationError("PTO hours per day should not exceed 8.")
-        else:
-            # Hourly: PTO allowed, but total should still be reasonable.
-            if self.hours_worked + self.pto_hours > 24:
-                raise ValidationError("Total hours (worked + PTO) cannot exceed 24 in a day.")
+        error = entry_rule_error(self.employee.pay_type, self.hours_worked, self.pto_hours, self.locked)
+        if error:
+            raise ValidationError(error)
 
     def __str__(self) -> str:
         return f"{self.employee.employee_id} {self.work_date}"
+
+class WeeklyHours(models.Model):
+    """Per-employee, per-ISO-week hour totals (a rollup of TimeEntry).
+
+    Kept current by signals on TimeEntry (see timeentry/rollup.py) so payroll
+    and reports can read a few pre-aggregated rows instead of every entry.
+    Totals use the hourly rules (>8h/day and Saturday are overtime); salary
+    pay is derived from the calendar, so only its PTO is used.
+    """
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="weekly_hours")
+    week_start = models.DateField(help_text="Monday of the ISO week.")
+    regular_hours = models.DecimalField(max_digits=7, decimal_places=2, default=0)
+    overtime_hours = models.DecimalField(max_digits=7, decimal_places=2, default=0)
+    pto_hours = models.DecimalField(max_digits=7, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ("employee", "week_start")
+        ordering = ["-week_start"]
+        indexes = [
+            models.Index(fields=["week_start"], name="weeklyhours_week_start_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.employee_id} week of {self.week_start}"
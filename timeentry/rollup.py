@@ -0,0 +1,143 @@
+"""WeeklyHours rollup maintenance.
+
+Every TimeEntry save/delete refreshes the one (employee, ISO week) row it
+belongs to (see signals.py), so the rollup stays current without rescans.
+Code that writes entries in bulk (bulk_create / queryset.update of hours)
+bypasses signals and must call `refresh_weekly_hours` itself.
+
+`rebuild_weekly_hours` recreates the whole table from TimeEntry (backfill or
+repair); it is exposed as `python manage.py rebuild_weekly_hours`.
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import TimeEntry, WeeklyHours
+
+ZERO = Decimal("0")
+EIGHT = Decimal("8")
+
+# Bound the IN (...) lists sent to the database.
+REFRESH_BATCH = 500
+
+def week_start(d: date) -> date:
+    """Monday of the ISO week containing `d`."""
+    return d - timedelta(days=d.weekday())
+
+def split_day_hours(work_date: date, hours_worked: Decimal) -> tuple[Decimal, Decimal]:
+    """Split one day's worked hours into (regular, overtime) using the hourly rules.
+
+    - any hours on Saturday are overtime
+    - > 8 hours in a day is overtime
+    """
+    if work_date.weekday() == 5:  # Mon=0 ... Sat=5
+        return ZERO, hours_worked
+    if hours_worked > 8:
+        return EIGHT, hours_worked - EIGHT
+    return hours_worked, ZERO
+
+def week_totals(rows) -> dict[tuple[int, date], list[Decimal]]:
+    """Aggregate (employee_id, work_date, hours_worked, pto_hours) rows.
+
+    Returns {(employee_id, week_start): [regular, overtime, pto]}.
+    """
+    totals: dict[tuple[int, date], list[Decimal]] = {}
+    for employee_id, work_date, hours_worked, pto_hours in rows:
+        t = totals.setdefault((employee_id, week_start(work_date)), [ZERO, ZERO, ZERO])
+        regular, overtime = split_day_hours(work_date, hours_worked)
+        t[0] += regular
+        t[1] += overtime
+        t[2] += pto_hours
+    return totals
+
+def _rollup_rows(totals):
+    return [
+        WeeklyHours(
+            employee_id=employee_id,
+            week_start=ws,
+            regular_hours=regular,
+            overtime_hours=overtime,
+            pto_hours=pto,
+        )
+        for (employee_id, ws), (regular, overtime, pto) in totals.items()
+    ]
+
+def refresh_weekly_hours(keys) -> None:
+    """Recompute the rollup rows for the given (employee_id, week_start) keys."""
+    keys = sorted(set(keys))
+    for i in range(0, len(keys), REFRESH_BATCH):
+        batch = set(keys[i:i + REFRESH_BATCH])
+        employee_ids = {e for e, _ws in batch}
+        first = min(ws for _e, ws in batch)
+        last = max(ws for _e, ws in batch) + timedelta(days=6)
+
+        rows = (
+            TimeEntry.objects.filter(employee_id__in=employee_ids, work_date__gte=first, work_date__lte=last)
+            .order_by()
+            .values_list("employee_id", "work_date", "hours_worked", "pto_hours")
+        )
+        totals = {k: v for k, v in week_totals(rows).items() if k in batch}
+
+        with transaction.atomic():
+            if totals:
+                WeeklyHours.objects.bulk_create(
+                    _rollup_rows(totals),
+                    update_conflicts=True,
+                    unique_fields=["employee", "week_start"],
+                    update_fields=["regular_hours", "overtime_hours", "pto_hours"],
+                )
+            emptied = batch - totals.keys()
+            if emptied:
+                cond = Q()
+                for employee_id, ws in emptied:
+                    cond |= Q(employee_id=employee_id, week_start=ws)
+                WeeklyHours.objects.filter(cond).delete()
+
+def rebuild_weekly_hours(chunk_size: int = 5000) -> int:
+    """Recreate the whole rollup from TimeEntry. Returns the number of rows written."""
+    written = 0
+    with transaction.atomic():
+        WeeklyHours.objects.all().delete()
+        rows = (
+            TimeEntry.objects.order_by("employee_id", "work_date")
+            .values_list("employee_id", "work_date", "hours_worked", "pto_hours")
+            .iterator(chunk_size=chunk_size)
+        )
+        pending: list = []
+        current = None
+        for row in rows:
+            # Flush only on an employee boundary so no week is split across flushes.
+            if row[0] != current and len(pending) >= chunk_size:
+                written += len(WeeklyHours.objects.bulk_create(_rollup_rows(week_totals(pending))))
+                pending = []
+            current = row[0]
+            pending.append(row)
+        if pending:
+            written += len(WeeklyHours.objects.bulk_create(_rollup_rows(week_totals(pending))))
+    return written
+
+def is_whole_weeks(period_start: date, period_end: date) -> bool:
+    """True when the period is one or more complete ISO weeks (Mon..Sun)."""
+    return period_start <= period_end and period_start.weekday() == 0 and period_end.weekday() == 6
+
+def period_hours(period_start: date, period_end: date, employee_ids=None) -> dict[int, tuple[Decimal, Decimal, Decimal]]:
+    """Sum the rollup over a whole-week period: {employee_id: (regular, overtime, pto)}."""
+    if not is_whole_weeks(period_start, period_end):
+        raise ValueError("period_hours needs a period made of whole ISO weeks (Mon..Sun).")
+
+    qs = WeeklyHours.objects.filter(week_start__gte=period_start, week_start__lte=period_end)
+    if employee_ids is not None:
+        qs = qs.filter(employee_id__in=list(employee_ids))
+
+    out: dict[int, list[Decimal]] = {}
+    rows = qs.order_by().values_list("employee_id", "regular_hours", "overtime_hours", "pto_hours")
+    for employee_id, regular, overtime, pto in rows:
+        t = out.setdefault(employee_id, [ZERO, ZERO, ZERO])
+        t[0] += regular
+        t[1] += overtime
+        t[2] += pto
+    return {k: tuple(v) for k, v in out.items()}
@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import TimeEntry
+from .rollup import refresh_weekly_hours, week_start
+
+
+@receiver(pre_save, sender=TimeEntry)
+def remember_previous_week(sender, instance, raw=False, **kwargs):
+    """
+    An edit can move an entry to another employee/date; remember the week it
+    came from so that week's rollup row is refreshed too. The previous
+    (employee_id, work_date) is kept on the instance for other receivers
+    (payroll journals it as a pay input change).
+    """
+    instance._previous_rollup_key = None
+    instance._previous_entry_key = None
+    if raw or instance.pk is None:
+        return
+    previous = TimeEntry.objects.filter(pk=instance.pk).values_list("employee_id", "work_date").first()
+    if previous:
+        instance._previous_entry_key = previous
+        instance._previous_rollup_key = (previous[0], week_start(previous[1]))
+
+
+@receiver(post_save, sender=TimeEntry)
+def refresh_rollup_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    keys = {(instance.employee_id, week_start(instance.work_date))}
+    if getattr(instance, "_previous_rollup_key", None):
+        keys.add(instance._previous_rollup_key)
+    refresh_weekly_hours(keys)
+
+
+@receiver(post_delete, sender=TimeEntry)
+def refresh_rollup_on_delete(sender, instance, **kwargs):
+    refresh_weekly_hours([(instance.employee_id, week_start(instance.work_date))])
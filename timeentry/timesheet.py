@@ -0,0 +1,98 @@
+"""Weekly timesheet: read, save and submit an employee's seven days at once.
+
+`save_week` validates every day with the TimeEntry rules and writes all
+changed days with one bulk upsert inside one transaction (one rollup refresh,
+one change-journal insert). `submit_week` marks the week submitted with a
+single UPDATE.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+
+from employees.models import Employee
+from payroll.recalculation import record_pay_input_changes
+from .models import TimeEntry, entry_rule_error
+from .rollup import refresh_weekly_hours, week_start
+
+ZERO = Decimal("0")
+
+@dataclass
+class Day:
+    work_date: date
+    hours_worked: Decimal = ZERO
+    pto_hours: Decimal = ZERO
+    submitted: bool = False
+    locked: bool = False
+    exists: bool = False
+
+def week_days(employee: Employee, any_day: date) -> list[Day]:
+    """The seven days (Mon..Sun) of the week containing `any_day`, with one query."""
+    monday = week_start(any_day)
+    days = {monday + timedelta(days=i): Day(monday + timedelta(days=i)) for i in range(7)}
+    rows = TimeEntry.objects.filter(
+        employee=employee, work_date__gte=monday, work_date__lte=monday + timedelta(days=6)
+    ).values_list("work_date", "hours_worked", "pto_hours", "submitted", "locked")
+    for work_date, hours, pto, submitted, locked in rows:
+        days[work_date] = Day(work_date, hours, pto, submitted, locked, exists=True)
+    return list(days.values())
+
+def validate_week(employee: Employee, days: list[Day], hours: dict) -> dict[date, str]:
+    """Check {work_date: (hours_worked, pto_hours)} against the rules. Returns {work_date: error}."""
+    errors = {}
+    for day in days:
+        if day.work_date not in hours:
+            continue
+        new_hours, new_pto = hours[day.work_date]
+        if day.locked and (new_hours, new_pto) != (day.hours_worked, day.pto_hours):
+            errors[day.work_date] = "This time entry is locked (payroll already calculated)."
+            continue
+        error = entry_rule_error(employee.pay_type, new_hours, new_pto)
+        if error:
+            errors[day.work_date] = error
+    return errors
+
+def save_week(employee: Employee, days: list[Day], hours: dict, submit: bool = False) -> int:
+    """Upsert the changed days in one transaction; optionally submit the week. Returns days written.
+
+    Call validate_week first. Days with no entry and no hours are not created.
+    Raises ValueError if one of the changed days was locked in the meantime.
+    """
+    changed = [
+        TimeEntry(employee=employee, work_date=d.work_date, hours_worked=hours[d.work_date][0],
+                  pto_hours=hours[d.work_date][1])
+        for d in days
+        if d.work_date in hours and not d.locked
+        and (d.hours_worked, d.pto_hours) != hours[d.work_date]
+        and (d.exists or hours[d.work_date] != (ZERO, ZERO))
+    ]
+    with transaction.atomic():
+        if changed:
+            # Payroll may have locked a day since the grid was read.
+            if TimeEntry.objects.select_for_update().filter(
+                employee=employee, work_date__in=[e.work_date for e in changed], locked=True
+            ).exists():
+                raise ValueError("Payroll was calculated for this week meanwhile; reload the timesheet.")
+            TimeEntry.objects.bulk_create(
+                changed,
+                update_conflicts=True,
+                unique_fields=["employee", "work_date"],
+                update_fields=["hours_worked", "pto_hours"],
+            )
+            # bulk_create skips the TimeEntry signals.
+            refresh_weekly_hours([(employee.pk, days[0].work_date)])
+            record_pay_input_changes((employee.pk, e.work_date) for e in changed)
+        if submit:
+            submit_week(employee, days[0].work_date)
+    return len(changed)
+
+def submit_week(employee: Employee, any_day: date) -> int:
+    """Mark the week's unlocked entries submitted with one UPDATE. Returns rows updated."""
+    monday = week_start(any_day)
+    return TimeEntry.objects.filter(
+        employee=employee, work_date__gte=monday, work_date__lte=monday + timedelta(days=6),
+        locked=False, submitted=False,
+    ).update(submitted=True)
@@ -4,6 +4,8 @@ from . import views
 urlpatterns = [
     path("", views.MyTimeEntryListView.as_view(), name="my_time_entries"),
     path("new/", views.TimeEntryCreateView.as_view(), name="timeentry_new"),
+    path("week/", views.week_timesheet, name="timeentry_week"),
+    path("import/", views.import_time_entries_view, name="timeentry_import"),
     path("<int:pk>/edit/", views.TimeEntryUpdateView.as_view(), name="timeentry_edit"),
     path("<int:pk>/submit/", views.submit_timeentry, name="timeentry_submit"),
 ]
@@ -1,34 +1,96 @@
 from __future__ import annotations
 
+import io
+from datetime import date, timedelta
+from decimal import Decimal
+
 from django.contrib import messages
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import PermissionDenied
+from django import forms
 from django.forms import ModelForm
-from django.shortcuts import redirect, get_object_or_404
+from django.shortcuts import redirect, get_object_or_404, render
 from django.views.generic import ListView, CreateView, UpdateView
 
-from employees.models import Employee
+from accounts.decorators import hr_required
+from accounts.pagination import KeysetPaginationMixin
+from .importer import import_time_entries, read_rows
 from .models import TimeEntry
+from .timesheet import save_week, validate_week, week_days
 
 class TimeEntryForm(ModelForm):
     class Meta:
         model = TimeEntry
         fields = ["work_date", "hours_worked", "pto_hours"]
 
-class MyTimeEntryListView(LoginRequiredMixin, ListView):
+class WeekForm(forms.Form):
+    """Hours and PTO for each of the seven days in `days` (timesheet.Day)."""
+
+    def __init__(self, *args, employee, days, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.employee = employee
+        self.days = days
+        for day in days:
+            for name, value in (("hours", day.hours_worked), ("pto", day.pto_hours)):
+                self.fields[f"{name}_{day.work_date.isoformat()}"] = forms.DecimalField(
+                    max_digits=5, decimal_places=2, min_value=0, required=False,
+                    initial=value, disabled=day.locked,
+                )
+
+    def rows(self):
+        """(day, hours field, pto field) for the template."""
+        for day in self.days:
+            iso = day.work_date.isoformat()
+            yield day, self[f"hours_{iso}"], self[f"pto_{iso}"]
+
+    def hours(self) -> dict:
+        zero = Decimal("0")
+        return {
+            d.work_date: (
+                self.cleaned_data.get(f"hours_{d.work_date.isoformat()}") or zero,
+                self.cleaned_data.get(f"pto_{d.work_date.isoformat()}") or zero,
+            )
+            for d in self.days
+        }
+
+    def clean(self):
+        cleaned = super().clean()
+        if not self.errors:
+            for work_date, error in validate_week(self.employee, self.days, self.hours()).items():
+                self.add_error(f"hours_{work_date.isoformat()}", error)
+        return cleaned
+
+class MyTimeEntryListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = TimeEntry
     template_name = "timeentry/my_timeentry_list.html"
     context_object_name = "entries"
     paginate_by = 31
+    keyset_ordering = ("-work_date", "-id")
+    # Counting a multi-million-row table on every page is the slow part; ?count=1 opts in.
+    count_total = False
 
     def get_queryset(self):
         if self.request.user.is_staff:
             # HR can view all time entries (adjust as needed).
-            return TimeEntry.objects.select_related("employee").all()
-        emp = Employee.objects.filter(user=self.request.user).first()
-        if not emp:
-            return TimeEntry.objects.none()
-        return TimeEntry.objects.filter(employee=emp)
+            qs = TimeEntry.objects.select_related("employee").all()
+            employee_id = self.request.GET.get("employee", "").strip()
+            department = self.request.GET.get("department", "").strip()
+            if employee_id:
+                qs = qs.filter(employee__employee_id=employee_id)
+            if department:
+                qs = qs.filter(employee__department=department)
+        else:
+            if not self.request.employee:
+                return TimeEntry.objects.none()
+            qs = TimeEntry.objects.filter(employee_id=self.request.employee.pk)
+
+        for param, lookup in (("date_from", "work_date__gte"), ("date_to", "work_date__lte")):
+            try:
+                qs = qs.filter(**{lookup: date.fromisoformat(self.request.GET.get(param, ""))})
+            except ValueError:
+                pass
+        return qs
 
 class TimeEntryCreateView(LoginRequiredMixin, CreateView):
     model = TimeEntry
@@ -38,10 +100,9 @@ class TimeEntryCreateView(LoginRequiredMixin, CreateView):
     def form_valid(self, form):
         if self.request.user.is_staff:
             raise PermissionDenied("HR should use admin tools for adjustments (or extend this view).")
-        emp = Employee.objects.filter(user=self.request.user).first()
-        if not emp:
+        if not self.request.employee:
             raise PermissionDenied("No employee profile is linked to this account.")
-        form.instance.employee = emp
+        form.instance.employee_id = self.request.employee.pk
         return super().form_valid(form)
 
     def get_success_url(self):
@@ -56,15 +117,16 @@ class TimeEntryUpdateView(LoginRequiredMixin, UpdateView):
         qs = super().get_queryset()
         if self.request.user.is_staff:
             return qs
-        emp = Employee.objects.filter(user=self.request.user).first()
-        return qs.filter(employee=emp)
+        if not self.request.employee:
+            return qs.none()
+        return qs.filter(employee_id=self.request.employee.pk)
 
     def get_success_url(self):
         return redirect("my_time_entries").url
 
 def submit_timeentry(request, pk: int):
     entry = get_object_or_404(TimeEntry, pk=pk)
-    if not request.user.is_staff and entry.employee.user_id != request.user.id:
+    if not request.user.is_staff and (not request.employee or entry.employee_id != request.employee.pk):
         raise PermissionDenied()
     if entry.locked:
         messages.error(request, "This entry is locked; payroll has already been calculated.")
@@ -73,3 +135,66 @@ def submit_timeentry(request, pk: int):
     entry.save()
     messages.success(request, "Submitted.")
     return redirect("my_time_entries")
+
+@login_required
+def week_timesheet(request):
+    """Seven days in one grid; saved (and optionally submitted) in one transaction."""
+    emp = request.employee or None
+    if not emp:
+        raise PermissionDenied("No employee profile is linked to this account.")
+    try:
+        any_day = date.fromisoformat(request.GET.get("week", ""))
+    except ValueError:
+        any_day = date.today()
+
+    days = week_days(emp, any_day)
+    if request.method == "POST":
+        form = WeekForm(request.POST, employee=emp, days=days)
+        if form.is_valid():
+            submit = "submit" in request.POST
+            try:
+                written = save_week(emp, days, form.hours(), submit=submit)
+            except ValueError as ex:
+                messages.error(request, str(ex))
+            else:
+                messages.success(request, f"Saved {written} day{'s' if written != 1 else ''}" + (" and submitted the week." if submit else "."))
+            return redirect(f"{request.path}?week={days[0].work_date.isoformat()}")
+    else:
+        form = WeekForm(employee=emp, days=days)
+
+    monday = days[0].work_date
+    return render(request, "timeentry/week.html", {
+        "form": form,
+        "employee": emp,
+        "monday": monday,
+        "sunday": days[-1].work_date,
+        "previous_week": (monday - timedelta(days=7)).isoformat(),
+        "next_week": (monday + timedelta(days=7)).isoformat(),
+        "all_submitted": all(d.submitted or not d.exists for d in days) and any(d.exists for d in days),
+    })
+
+IMPORT_ERRORS_SHOWN = 200
+
+@hr_required
+def import_time_entries_view(request):
+    """HR upload of a clock export (CSV or JSON Lines); see timeentry/importer.py."""
+    report = None
+    if request.method == "POST" and request.FILES.get("file"):
+        upload = request.FILES["file"]
+        fmt = "jsonl" if upload.name.lower().endswith((".jsonl", ".ndjson")) else "csv"
+        # Stream the upload as text; large files stay on disk in a temp file.
+        text = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        try:
+            report = import_time_entries(read_rows(text, fmt), submitted=bool(request.POST.get("submitted")))
+        except UnicodeDecodeError:
+            messages.error(request, "The file is not UTF-8 text.")
+        else:
+            messages.success(
+                request,
+                f"{report.rows} rows: {report.created} created, {report.updated} updated, "
+                f"{len(report.errors)} rejected.",
+            )
+    return render(request, "timeentry/import.html", {
+        "report": report,
+        "errors": report.errors[:IMPORT_ERRORS_SHOWN] if report else [],
+    })